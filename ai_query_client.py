@@ -1,9 +1,16 @@
 from dotenv import load_dotenv
-import requests
-import time
+from concurrent.futures import ThreadPoolExecutor
+import httpx
 import json
 import asyncio
-from mcp_server import search_profiles, find_top_experts, get_geo_density, get_skill_distribution
+import functools
+import time
+from cache import TTLCache
+from mcp_server import (search_profiles, find_top_experts, get_geo_density, get_skill_distribution,
+                        profiles_version, tool_cache)
+from resilience import (CircuitBreaker, CircuitOpenError, ResilienceMetrics, RetryError,
+                        RetryPolicy, retry_async)
+from summarizer import TOOL_RESULT_TOKEN_BUDGET, summarize_result
 import os
 
 load_dotenv()
@@ -11,99 +18,265 @@ load_dotenv()
 API_KEY = os.getenv("GEMINI_API_KEY")
 
 MODEL_NAME = "gemini-2.5-flash-preview-09-2025"
+GEMINI_BASE_URL = os.getenv(
+    "GEMINI_BASE_URL", "https://generativelanguage.googleapis.com/v1beta")
+
+TOOL_DECLARATIONS = [{
+    "function_declarations": [
+        {
+            "name": "search_profiles",
+            "description": "Find specific people by text query. Set substring to true only for partial-word matches. Results are compact profile cards unless fields lists the dotted fields to return. Pass next_cursor back as cursor for the next page.",
+            "parameters": {"type": "OBJECT", "properties": {"query": {"type": "STRING"}, "substring": {"type": "BOOLEAN"}, "fields": {"type": "ARRAY", "items": {"type": "STRING"}}, "cursor": {"type": "STRING"}}, "required": ["query"]}
+        },
+        {
+            "name": "find_top_experts",
+            "description": "Identifies highly-qualified professionals for a specific tech skill. Results are compact profile cards unless fields lists the dotted fields to return. Pass next_cursor back as cursor for the next page.",
+            "parameters": {"type": "OBJECT", "properties": {"skill": {"type": "STRING"}, "fields": {"type": "ARRAY", "items": {"type": "STRING"}}, "cursor": {"type": "STRING"}}, "required": ["skill"]}
+        },
+        {
+            "name": "get_geo_density",
+            "description": "Analyzes tech talent concentration in a location.",
+            "parameters": {"type": "OBJECT", "properties": {"location": {"type": "STRING"}}, "required": ["location"]}
+        },
+        {
+            "name": "get_skill_distribution",
+            "description": "Returns most common skills across the entire database."
+        }
+    ]
+}]
+
+TOOLS = {
+    "search_profiles": search_profiles,
+    "find_top_experts": find_top_experts,
+    "get_geo_density": get_geo_density,
+    "get_skill_distribution": get_skill_distribution
+}
+
+GEMINI_RETRY = RetryPolicy(
+    max_attempts=int(os.getenv("GEMINI_MAX_ATTEMPTS", 5)),
+    deadline=float(os.getenv("GEMINI_DEADLINE_SECONDS", 90)),
+    base=0.5, cap=20.0, exceptions=(httpx.HTTPError,))
+gemini_metrics = ResilienceMetrics()
+gemini_breaker = CircuitBreaker(
+    failure_threshold=int(os.getenv("GEMINI_BREAKER_THRESHOLD", 5)),
+    reset_timeout=float(os.getenv("GEMINI_BREAKER_RESET_SECONDS", 30)),
+    metrics=gemini_metrics)
 
+TOOL_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.getenv("TOOL_WORKERS", 4)), thread_name_prefix="tool")
 
-def call_gemini(prompt, include_tools=True):
-    url = f"https://generativelanguage.googleapis.com/v1beta/models/{MODEL_NAME}:generateContent?key={API_KEY}"
 
-    payload = {
-        "contents": [{"parts": [{"text": prompt}]}]
-    }
+def make_client():
+    return httpx.AsyncClient(
+        base_url=GEMINI_BASE_URL,
+        headers={"x-goog-api-key": API_KEY or ""},
+        timeout=httpx.Timeout(
+            float(os.getenv("GEMINI_TIMEOUT_SECONDS", 30)),
+            connect=float(os.getenv("GEMINI_CONNECT_TIMEOUT_SECONDS", 5))),
+        limits=httpx.Limits(max_connections=10, max_keepalive_connections=10)
+    )
+
+
+async def call_gemini(client, contents, include_tools=True, stats=None):
+    url = f"/models/{MODEL_NAME}:generateContent"
+
+    if isinstance(contents, str):
+        contents = [{"role": "user", "parts": [{"text": contents}]}]
+    payload = {"contents": contents}
 
     if include_tools:
-        payload["tools"] = [{
-            "function_declarations": [
-                {
-                    "name": "search_profiles",
-                    "description": "Find specific people by text query.",
-                    "parameters": {"type": "OBJECT", "properties": {"query": {"type": "STRING"}}, "required": ["query"]}
-                },
-                {
-                    "name": "find_top_experts",
-                    "description": "Identifies highly-qualified professionals for a specific tech skill.",
-                    "parameters": {"type": "OBJECT", "properties": {"skill": {"type": "STRING"}}, "required": ["skill"]}
-                },
-                {
-                    "name": "get_geo_density",
-                    "description": "Analyzes tech talent concentration in a location.",
-                    "parameters": {"type": "OBJECT", "properties": {"location": {"type": "STRING"}}, "required": ["location"]}
-                },
-                {
-                    "name": "get_skill_distribution",
-                    "description": "Returns most common skills across the entire database."
-                }
-            ]
-        }]
-
-    for attempt in range(5):
-        try:
-            response = requests.post(url, json=payload)
-            if response.status_code == 200:
-                return response.json()
-            if response.status_code == 429:
-                time.sleep(2**attempt)
-        except:
-            time.sleep(1)
-    return None
+        payload["tools"] = TOOL_DECLARATIONS
 
+    body = json.dumps(payload, separators=(',', ':')).encode()
+    if stats is not None:
+        stats["llm_calls"] += 1
+        stats["payload_bytes"] += len(body)
+
+    async def send():
+        return await client.post(
+            url, content=body, headers={"Content-Type": "application/json"})
 
-def extract_text(resp):
     try:
-        return resp['candidates'][0]['content']['parts'][0]['text']
-    except:
+        response = await retry_async(send, GEMINI_RETRY, gemini_breaker, gemini_metrics)
+    except (RetryError, CircuitOpenError) as e:
+        print(f"Gemini request failed: {e}")
+        return None
+    if response.status_code != 200:
+        print(f"Gemini request failed: HTTP {response.status_code}")
+        return None
+    try:
+        return response.json()
+    except ValueError:
+        return None
+
+
+def candidate_parts(resp):
+    # None when the model returned no candidate at all, e.g. a blocked prompt.
+    candidates = resp.get('candidates') or []
+    if not candidates:
         return None
+    return (candidates[0].get('content') or {}).get('parts') or []
+
 
+def block_reason(resp):
+    feedback = resp.get('promptFeedback') or {}
+    reason = feedback.get('blockReason')
+    if reason and feedback.get('blockReasonMessage'):
+        reason = f"{reason}: {feedback['blockReasonMessage']}"
+    return reason or "no candidates returned"
 
-def process_tool_calls(resp):
-    parts = resp.get('candidates', [{}])[0].get('content', {}).get('parts', [])
-    for part in parts:
-        if 'functionCall' in part:
-            fc = part['functionCall']
-            name, args = fc['name'], fc['args']
-            print(f"AI executing tool: {name}")
 
-            if name == "search_profiles":
-                return search_profiles(**args)
-            if name == "find_top_experts":
-                return find_top_experts(**args)
-            if name == "get_geo_density":
-                return get_geo_density(**args)
-            if name == "get_skill_distribution":
-                return get_skill_distribution()
-    return extract_text(resp)
+def extract_text(resp):
+    texts = [part['text'] for part in candidate_parts(resp) or [] if 'text' in part]
+    return "".join(texts) if texts else None
+
+
+def function_calls(resp):
+    return [part['functionCall'] for part in candidate_parts(resp) or [] if 'functionCall' in part]
+
+
+async def run_tool(name, args):
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+    call = {"name": name, "args": args}
+    try:
+        if name not in TOOLS:
+            raise ValueError(f"Unknown tool: {name}")
+        # Tools hit Mongo synchronously; keep them off the event loop.
+        call["result"] = await loop.run_in_executor(
+            TOOL_EXECUTOR, functools.partial(TOOLS[name], **args))
+    except Exception as e:
+        call["error"] = str(e)
+    call["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    print(f"AI executed tool: {name} in {call['elapsed_ms']} ms")
+    return call
+
+
+def call_key(name, args):
+    return json.dumps([name, args], sort_keys=True, separators=(',', ':'))
+
+
+def describe_result(result):
+    # `result` is what was sent to the model, i.e. summarize_result output.
+    if isinstance(result, dict) and "report" in result:
+        report = result["report"]
+        summary = {"rows": report["rows_total"]}
+        if report["rows_kept"] != report["rows_total"]:
+            summary["rows_sent"] = report["rows_kept"]
+        if result.get("next_cursor"):
+            summary["next_cursor"] = result["next_cursor"]
+        return summary
+    if isinstance(result, list):
+        return {"rows": len(result)}
+    return {"type": type(result).__name__}
+
+
+class Conversation:
+    def __init__(self, max_tool_rounds=int(os.getenv("MAX_TOOL_ROUNDS", 4))):
+        self.max_tool_rounds = max_tool_rounds
+        self.contents = []
+        # Reused results follow the tool cache's staleness window and are
+        # dropped as soon as the profiles collection version moves.
+        self.results = TTLCache(
+            maxsize=int(os.getenv("CONVERSATION_MAX_RESULTS", 64)), ttl=tool_cache.ttl)
+        self.stats = {"llm_calls": 0, "payload_bytes": 0, "tool_calls": 0, "reused_results": 0}
+
+    async def run_calls(self, calls):
+        version = await asyncio.to_thread(profiles_version.current)
+        results = {}
+        pending = {}
+        for fc in calls:
+            key = call_key(fc['name'], fc.get('args', {}))
+            if key in results or key in pending:
+                continue
+            hit, value = self.results.get(key, version)
+            if hit:
+                results[key] = value
+            else:
+                pending[key] = run_tool(fc['name'], fc.get('args', {}))
+        self.stats["tool_calls"] += len(pending)
+        self.stats["reused_results"] += len(calls) - len(pending)
+
+        fresh = dict(zip(pending, await asyncio.gather(*pending.values())))
+        for key, call in fresh.items():
+            if "error" not in call:
+                results[key] = call["result"]
+                self.results.set(key, version, call["result"])
+
+        # The token budget is shared by every result sent back in this round.
+        budget = TOOL_RESULT_TOKEN_BUDGET // max(len(calls), 1)
+        parts = []
+        for fc in calls:
+            key = call_key(fc['name'], fc.get('args', {}))
+            if key in results:
+                response = {"ref": key, "result": summarize_result(results[key], budget)}
+            else:
+                response = {"ref": key, "error": fresh[key]["error"]}
+            parts.append({"functionResponse": {"name": fc['name'], "response": response}})
+        return parts
+
+    def compact(self):
+        # Earlier payloads stay in self.results; the history only keeps a
+        # reference, so follow-up turns don't resend them.
+        for content in self.contents:
+            for part in content.get("parts", []):
+                response = part.get("functionResponse", {}).get("response", {})
+                if "result" in response:
+                    response["summary"] = describe_result(response.pop("result"))
+
+    async def ask(self, client, user_input):
+        start = len(self.contents)
+        self.contents.append({"role": "user", "parts": [{"text": user_input}]})
+        try:
+            for _ in range(self.max_tool_rounds):
+                resp = await call_gemini(client, self.contents, stats=self.stats)
+                if resp is None:
+                    del self.contents[start:]
+                    return None
+                parts = candidate_parts(resp)
+                if parts is None:
+                    print(f"Gemini returned no answer ({block_reason(resp)})")
+                    del self.contents[start:]
+                    return None
+                self.contents.append({"role": "model", "parts": parts})
+                calls = function_calls(resp)
+                if not calls:
+                    return extract_text(resp)
+                self.contents.append({"role": "user", "parts": await self.run_calls(calls)})
+
+            resp = await call_gemini(client, self.contents, include_tools=False, stats=self.stats)
+            parts = candidate_parts(resp) if resp is not None else None
+            if parts is None:
+                if resp is not None:
+                    print(f"Gemini returned no answer ({block_reason(resp)})")
+                del self.contents[start:]
+                return None
+            self.contents.append({"role": "model", "parts": parts})
+            return extract_text(resp)
+        finally:
+            self.compact()
 
 
 async def chat_loop():
     print("=== AI Profile Analyst  ===")
     print("Ready to analyze 10,000+ tech profiles.")
 
-    while True:
-        user_input = input("\nWhat would You Like to know About The Profiles: ")
-        if user_input.lower() in ['exit', 'quit']:
-            break
-
-        resp = call_gemini(user_input, include_tools=True)
-        data_result = process_tool_calls(resp)
-
-        if isinstance(data_result, (list, dict)):
-            final_prompt = (
-                f"I found this data in the profiles database:\n{json.dumps(data_result, indent=2)}\n\n"
-                f"Use this data to answer: {user_input}"
-            )
-            summary_resp = call_gemini(final_prompt, include_tools=False)
-            print(f"\nAI: {extract_text(summary_resp)}")
-        else:
-            print(f"\nAI: {data_result}")
+    conversation = Conversation()
+    async with make_client() as client:
+        while True:
+            user_input = await asyncio.to_thread(
+                input, "\nWhat would You Like to know About The Profiles: ")
+            if user_input.lower() in ['exit', 'quit']:
+                break
+
+            answer = await conversation.ask(client, user_input)
+            if answer is None:
+                print("\nAI: No response from the model, please try again.")
+            else:
+                print(f"\nAI: {answer}")
+
+    print(f"\nSession stats: {conversation.stats}")
+    print(f"Gemini requests: {gemini_metrics.snapshot()} (breaker {gemini_breaker.state})")
 
 if __name__ == "__main__":
     asyncio.run(chat_loop())
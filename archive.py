@@ -0,0 +1,99 @@
+import atexit
+import glob
+import gzip
+import io
+import json
+import os
+import threading
+from datetime import datetime, timezone
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+SEGMENT_BYTES = int(os.getenv("RAW_ARCHIVE_SEGMENT_BYTES", 64 * 1024 * 1024))
+SEGMENT_SUFFIXES = (".jsonl.gz", ".jsonl.zst")
+
+
+def open_segment(path, mode):
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError(f"{path} needs the zstandard package")
+        if mode == "w":
+            stream = zstandard.ZstdCompressor().stream_writer(open(path, "wb"))
+        else:
+            stream = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"))
+        return io.TextIOWrapper(stream, encoding="utf-8")
+    return gzip.open(path, mode + "t", encoding="utf-8")
+
+
+class RawArchive:
+    # Append-only: every process writes its own segments and rotates them once
+    # they pass SEGMENT_BYTES, so concurrent scrapers never share a file.
+    def __init__(self, root, compression=None, segment_bytes=SEGMENT_BYTES):
+        self.root = root
+        self.compression = compression or ("zstd" if zstandard else "gzip")
+        self.segment_bytes = segment_bytes
+        self.lock = threading.Lock()
+        self.segments = {}
+
+    def segment_path(self, platform):
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+        suffix = ".jsonl.zst" if self.compression == "zstd" else ".jsonl.gz"
+        directory = os.path.join(self.root, platform)
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, f"{stamp}-{os.getpid()}{suffix}")
+
+    def record(self, platform, source_id, payload, **extra):
+        line = json.dumps({
+            "platform": platform, "source_id": source_id,
+            "fetched_at": datetime.now(timezone.utc).isoformat(),
+            **extra, "payload": payload
+        }, separators=(',', ':')) + "\n"
+        with self.lock:
+            segment = self.segments.get(platform)
+            if segment is None or segment[1] >= self.segment_bytes:
+                if segment:
+                    segment[0].close()
+                segment = [open_segment(self.segment_path(platform), "w"), 0]
+                self.segments[platform] = segment
+            segment[0].write(line)
+            segment[1] += len(line)
+
+    def close(self):
+        with self.lock:
+            for stream, _ in self.segments.values():
+                stream.close()
+            self.segments = {}
+
+
+def iter_records(root, platforms=None):
+    for platform in sorted(platforms or os.listdir(root)):
+        paths = [p for p in glob.glob(os.path.join(root, platform, "*"))
+                 if p.endswith(SEGMENT_SUFFIXES)]
+        for path in sorted(paths):
+            with open_segment(path, "r") as stream:
+                try:
+                    for line in stream:
+                        if line.endswith("\n"):
+                            yield json.loads(line)
+                except (EOFError, zstandard.ZstdError if zstandard else EOFError):
+                    # A segment cut short by a crash still replays up to the tear.
+                    continue
+
+
+_archive = None
+_archive_lock = threading.Lock()
+
+
+def archive_from_env():
+    global _archive
+    root = os.getenv("RAW_ARCHIVE_DIR")
+    if not root:
+        return None
+    with _archive_lock:
+        if _archive is None:
+            _archive = RawArchive(root, compression=os.getenv("RAW_ARCHIVE_COMPRESSION"))
+            atexit.register(_archive.close)
+        return _archive
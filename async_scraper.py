@@ -0,0 +1,270 @@
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlparse
+import httpx
+from db_manager import DBManager
+from geo import normalize_location
+from scraper import (BaseScraper, GitHubScraper, ORCIDScraper, KaggleScraper,
+                     fetch_meta, kaggle_profile, orcid_profile)
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+HOST_LIMITS = {
+    "api.github.com": (8, 0.1),
+    "pub.orcid.org": (4, 0.5),
+    "www.kaggle.com": (2, 4.0),
+}
+DEFAULT_HOST_LIMIT = (2, 1.0)
+
+
+class HostLimiter:
+    def __init__(self, concurrency, delay):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.delay = delay
+        self.next_slot = 0.0
+        self.lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        await self.semaphore.acquire()
+        async with self.lock:
+            now = time.monotonic()
+            wait = self.next_slot - now
+            self.next_slot = max(now, self.next_slot) + self.delay
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.semaphore.release()
+
+
+class HostLimits:
+    def __init__(self, limits=None):
+        self.limits = dict(HOST_LIMITS if limits is None else limits)
+        self.limiters = {}
+
+    def for_url(self, url):
+        host = urlparse(url).netloc
+        if host not in self.limiters:
+            concurrency, delay = self.limits.get(host, DEFAULT_HOST_LIMIT)
+            self.limiters[host] = HostLimiter(concurrency, delay)
+        return self.limiters[host]
+
+
+class AsyncBaseScraper(BaseScraper):
+    def __init__(self, db_collection, client, host_limits):
+        super().__init__(db_collection)
+        self.client = client
+        self.host_limits = host_limits
+
+    async def get(self, url, **kwargs):
+        async with self.host_limits.for_url(url):
+            return await self.client.get(url, **kwargs)
+
+    async def handle_rate_limit(self, response):
+        wait_time = self.rate_limit_wait(response)
+        if wait_time is None:
+            return False
+        await asyncio.sleep(wait_time)
+        return True
+
+    def save_to_db(self, doc):
+        doc.setdefault("geo", normalize_location(doc["basics"].get("location")))
+        with self.write_lock:
+            self.write_buffer.append(doc)
+        return True
+
+    async def aflush(self):
+        return await asyncio.to_thread(self.flush)
+
+    async def fetch_claimed(self, fetch, keys):
+        if self.stop_event.is_set():
+            return
+        results = await asyncio.gather(*(fetch(key) for key in keys), return_exceptions=True)
+        await asyncio.to_thread(lambda: [
+            self.state.finish(key, result is True) for key, result in zip(keys, results)])
+
+    async def run_stages(self, fetch, parse, keys, pool=None):
+        # The same fetch / parse / write split as pipeline.Pipeline: the event
+        # loop does the fetching, parsing goes to `pool` when given, and
+        # write_profile buffers the doc and settles its frontier entry.
+        loop = asyncio.get_running_loop()
+
+        async def one(key):
+            if self.stop_event.is_set():
+                return
+            doc = None
+            try:
+                raw = await fetch(key)
+                if raw is not None:
+                    doc = (await loop.run_in_executor(pool, parse, key, raw) if pool
+                           else parse(key, raw))
+            except Exception as e:
+                if str(e) == "Rate Limit Exceeded":
+                    self.stop_event.set()
+                logger.error(f"{self.SOURCE_PLATFORM}: {key} failed: {e}")
+            await asyncio.to_thread(self.write_profile, key, doc)
+
+        await asyncio.gather(*(one(key) for key in keys))
+
+
+class AsyncGitHubScraper(AsyncBaseScraper, GitHubScraper):
+    async def discover_active_users(self, target=5000):
+        await self.fetch_claimed(
+            self.fetch_user_detail, await asyncio.to_thread(self.state.pending, max(0, target)))
+        await self.aflush()
+        # topic_searches checkpoints to Mongo, so it is stepped off the loop.
+        searches = self.topic_searches(target)
+        topic = await asyncio.to_thread(self.advance, searches)
+        while topic is not None:
+            done = await self.search_topic(topic, target)
+            topic = await asyncio.to_thread(self.advance, searches, done)
+        await self.aflush()
+
+    async def search_topic(self, topic, target):
+        try:
+            resp = await self.get(
+                self.topic_search_url(topic), headers=self.api_headers("https://github.com/search"))
+            if await self.handle_rate_limit(resp) or resp.status_code != 200:
+                return False
+            urls = await asyncio.to_thread(self.new_owner_urls, resp.json().get('items', []), target)
+            await self.fetch_claimed(self.fetch_user_detail, urls)
+            await self.aflush()
+            return True
+        except Exception as e:
+            if str(e) == "Rate Limit Exceeded":
+                return None
+            logger.error(f"GitHub Search failed: {e}")
+            return False
+
+    async def fetch_user_detail(self, url):
+        headers = self.api_headers("https://github.com/")
+        for _ in range(self.MAX_FETCH_ATTEMPTS):
+            wait = self.rate_limiter.try_acquire()
+            while wait > 0:
+                await asyncio.sleep(min(wait, 60))
+                wait = self.rate_limiter.try_acquire()
+            try:
+                resp = await self.get(url, headers=headers)
+            except httpx.HTTPError:
+                return False
+            self.rate_limiter.update(resp)
+            if resp.status_code == 200:
+                return self.normalize_and_save(resp.json(), fetch_meta(resp, url))
+            if resp.status_code not in (403, 429):
+                return False
+            logger.warning(
+                f"GitHub rate limited (Status {resp.status_code}) on {url}. Retrying after reset.")
+        return False
+
+
+class AsyncORCIDScraper(AsyncBaseScraper, ORCIDScraper):
+    async def scrape_by_keywords(self, target=2000):
+        await self.run_stages(
+            self.fetch_record, orcid_profile,
+            await asyncio.to_thread(self.state.pending, max(0, target)))
+        await self.aflush()
+        searches = self.keyword_searches(target)
+        search = await asyncio.to_thread(self.advance, searches)
+        while search is not None:
+            results = await self.search_page(*search)
+            search = await asyncio.to_thread(self.advance, searches, results)
+        await self.aflush()
+
+    async def search_page(self, kw, start):
+        params = {"q": kw, "rows": 50, "start": start}
+        try:
+            while True:
+                resp = await self.get(self.search_url, headers=self.get_headers(), params=params)
+                if not await self.handle_rate_limit(resp):
+                    break
+                if self.stop_event.is_set():
+                    return None
+
+            results = resp.json().get('result') or []
+            if results:
+                ids = await asyncio.to_thread(self.claim_results, results)
+                await self.run_stages(self.fetch_record, orcid_profile, ids)
+                page_new_count, _ = await self.aflush()
+                if page_new_count == 0:
+                    logger.info("ORCID: Page contained only duplicates.")
+            return results
+        except Exception as e:
+            if str(e) != "Rate Limit Exceeded":
+                logger.error(f"ORCID Error: {e}")
+            return None
+
+    async def fetch_record(self, orcid_id):
+        headers = self.get_headers(referer="https://orcid.org/")
+        headers['Accept'] = 'application/json'
+        resp = await self.get(f"{self.base_url}/{orcid_id}", headers=headers)
+        if resp.status_code == 200:
+            raw = resp.json()
+            self.archive_raw(orcid_id, raw)
+            return raw
+        await self.handle_rate_limit(resp)
+        return None
+
+
+class AsyncKaggleScraper(AsyncBaseScraper, KaggleScraper):
+    async def discover_and_scrape(self, limit=500):
+        logger.info("Kaggle: Discovering users...")
+        try:
+            resp = await self.get("https://www.kaggle.com/code",
+                                  headers=self.get_headers(referer="https://www.google.com"))
+            if await self.handle_rate_limit(resp):
+                return
+
+            users = await asyncio.to_thread(self.state.pending, max(0, limit))
+            users += await asyncio.to_thread(
+                self.claim_new, {u: u for u in self.extract_usernames(resp.text)})
+            users = users[:limit]
+            # The host limiter spaces Kaggle requests for the whole source.
+            with ProcessPoolExecutor(int(os.getenv("PIPELINE_PARSE_WORKERS", 2))) as pool:
+                for i in range(0, len(users), self.WRITE_BATCH_SIZE):
+                    if self.check_duplicate_stop():
+                        break
+                    batch = users[i:i + self.WRITE_BATCH_SIZE]
+                    await self.run_stages(self.fetch_profile_html, kaggle_profile, batch, pool)
+                    await self.aflush()
+        except Exception as e:
+            if str(e) != "Rate Limit Exceeded":
+                logger.error(f"Kaggle Error: {e}")
+        await self.aflush()
+
+    async def fetch_profile_html(self, username):
+        resp = await self.get(f"https://www.kaggle.com/{username}", headers=self.get_headers())
+        if resp.status_code == 200:
+            self.archive_raw(username, resp.text)
+            return resp.text
+        await self.handle_rate_limit(resp)
+        return None
+
+
+async def run_all(col, targets=None, host_limits=None):
+    targets = targets or {"github": 5000, "orcid": 2000, "kaggle": 500}
+    host_limits = host_limits or HostLimits()
+    limits = httpx.Limits(max_connections=32, max_keepalive_connections=16)
+    async with httpx.AsyncClient(timeout=30, follow_redirects=True, limits=limits) as client:
+        jobs = {
+            "github": AsyncGitHubScraper(col, client, host_limits).discover_active_users(targets["github"]),
+            "orcid": AsyncORCIDScraper(col, client, host_limits).scrape_by_keywords(targets["orcid"]),
+            "kaggle": AsyncKaggleScraper(col, client, host_limits).discover_and_scrape(targets["kaggle"]),
+        }
+        started = time.monotonic()
+        results = await asyncio.gather(*jobs.values(), return_exceptions=True)
+        for name, result in zip(jobs, results):
+            if isinstance(result, Exception):
+                logger.error(f"{name} scraper failed: {result}")
+        logger.info(f"Async scrape finished in {time.monotonic() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    db = DBManager().connect()
+    print("=== STARTING ASYNC INTEGRATED MASS SCRAPE ===")
+    asyncio.run(run_all(db['profiles']))
+    print("=== ASYNC MASS SCRAPE COMPLETE ===")
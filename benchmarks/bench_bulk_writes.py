@@ -0,0 +1,119 @@
+# Database round trips and wall time for ingesting profiles: the old
+# find_one + update_one per profile vs BaseScraper's buffered bulk upserts.
+# Runs against mongomock by default, or a real server with --mongo-uri.
+# mongomock scans collections linearly, so it defaults to 1,000 profiles;
+# the round-trip counts scale linearly either way.
+#
+#   python benchmarks/bench_bulk_writes.py [--profiles N] [--mongo-uri mongodb://...]
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scraper import StackOverflowScraper  # noqa: E402
+
+DB_METHODS = {"find", "find_one", "update_one", "update_many", "insert_one", "insert_many",
+              "bulk_write", "delete_one", "delete_many", "aggregate", "count_documents"}
+
+
+class CountingDatabase:
+    # Counts every collection call that goes to the server.
+    def __init__(self, db):
+        self.db = db
+        self.calls = 0
+
+    def __getitem__(self, name):
+        return CountingCollection(self, self.db[name])
+
+    def __getattr__(self, name):
+        return self[name]
+
+
+class CountingCollection:
+    def __init__(self, database, collection):
+        self.database = database
+        self.collection = collection
+        self.name = collection.name
+
+    def __getattr__(self, name):
+        attr = getattr(self.collection, name)
+        if name not in DB_METHODS:
+            return attr
+
+        def call(*args, **kwargs):
+            self.database.calls += 1
+            return attr(*args, **kwargs)
+        return call
+
+
+def old_save(col, doc):
+    # What every scraper's save_to_db did before the shared writer.
+    key = {'source_platform': doc['source_platform'], 'source_id': doc['source_id']}
+    if col.find_one(key):
+        return False
+    col.update_one(key, {'$set': doc}, upsert=True)
+    return True
+
+
+def run_old(db, docs):
+    col = db["profiles"]
+    new = sum(old_save(col, dict(doc)) for doc in docs)
+    return new, len(docs) - new
+
+
+def run_new(db, docs):
+    scraper = StackOverflowScraper(db["profiles"])
+    scraper.archive = None
+    for doc in docs:
+        scraper.save_to_db(dict(doc))
+    scraper.flush()
+    return scraper.inserted_count, scraper.matched_count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--profiles", type=int)
+    parser.add_argument("--mongo-uri")
+    args = parser.parse_args(argv)
+    if args.profiles is None:
+        args.profiles = 10000 if args.mongo_uri else 1000
+
+    if args.mongo_uri:
+        from pymongo import MongoClient
+        client = MongoClient(args.mongo_uri)
+    else:
+        import mongomock
+        client = mongomock.MongoClient()
+
+    normalizer = StackOverflowScraper.__new__(StackOverflowScraper)
+    docs = [normalizer.normalize({"user_id": i, "display_name": f"user {i}", "reputation": i,
+                                  "location": "Berlin"}) for i in range(args.profiles)]
+
+    rows = []
+    for label, run in [("find + upsert", run_old), ("bulk upsert", run_new)]:
+        name = f"bench_{uuid.uuid4().hex[:8]}"
+        db = CountingDatabase(client[name])
+        db.db["profiles"].create_index([("source_platform", 1), ("source_id", 1)], unique=True)
+        try:
+            for phase in ("fresh", "re-ingest"):
+                db.calls = 0
+                started = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    new, dupes = run(db, docs)
+                rows.append((label, phase, new, dupes, db.calls, time.perf_counter() - started))
+        finally:
+            client.drop_database(name)
+
+    print(f"{'writer':<15}{'phase':<11}{'new':>8}{'dupes':>8}{'round trips':>13}{'seconds':>9}")
+    for label, phase, new, dupes, calls, seconds in rows:
+        print(f"{label:<15}{phase:<11}{new:>8}{dupes:>8}{calls:>13}{seconds:>9.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+# Bytes per result, serialization time and prompt size for find_top_experts
+# results: full documents through json_util.dumps + json.loads and an
+# indent=2 prompt (the old path) vs projected cards through to_json_safe and
+# compact JSON. Runs against mongomock with synthetic GitHub profiles.
+#
+#   python benchmarks/bench_cards.py [--profiles 200] [--repeat 200]
+import argparse
+import copy
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mongomock  # noqa: E402
+from bson import json_util  # noqa: E402
+
+from mcp_server import TOP_EXPERTS_SORT, build_projection, to_cards  # noqa: E402
+from scraper import GitHubScraper  # noqa: E402
+from summarizer import BYTES_PER_TOKEN  # noqa: E402
+
+BIOS = ["Python and Rust engineer building data platforms on AWS",
+        "Machine Learning researcher, PyTorch and TensorFlow, previously at a startup",
+        "Full-stack JavaScript / TypeScript developer working with React and Node.js",
+        "DevOps: Kubernetes, Docker, Terraform and Ansible in production"]
+
+
+def profiles(count, rng):
+    normalizer = GitHubScraper.__new__(GitHubScraper)
+    for i in range(count):
+        doc = normalizer.normalize({
+            "id": i, "login": f"user{i}", "name": f"User {i}", "bio": rng.choice(BIOS),
+            "location": rng.choice(["Berlin, Germany", "Lagos", "San Francisco, CA"]),
+            "company": "@example", "blog": f"https://user{i}.example.com",
+            "followers": rng.randint(0, 5000), "following": rng.randint(0, 300),
+            "public_repos": rng.randint(0, 200)})
+        doc["fetch_meta"] = {"last_fetched_at": datetime.now(timezone.utc), "etag": f'W/"{i:040x}"'}
+        yield doc
+
+
+def old_path(docs):
+    results = json.loads(json_util.dumps(docs))
+    return f"I found this data in the profiles database:\n{json.dumps(results, indent=2)}"
+
+
+def new_path(docs):
+    results = to_cards(docs, None)
+    return f"I found this data in the profiles database:\n{json.dumps(results, separators=(',', ':'))}"
+
+
+def measure(label, docs, serialize, repeat):
+    prompt_bytes = len(serialize(copy.deepcopy(docs)).encode())
+    elapsed = 0.0
+    for _ in range(repeat):
+        batch = copy.deepcopy(docs)
+        started = time.perf_counter()
+        serialize(batch)
+        elapsed += time.perf_counter() - started
+    return (label, len(docs), prompt_bytes // len(docs), prompt_bytes,
+            prompt_bytes // BYTES_PER_TOKEN, elapsed / repeat * 1e6)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--profiles", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    col = mongomock.MongoClient()["bench"]["profiles"]
+    col.insert_many(list(profiles(args.profiles, random.Random(11))))
+    query = {"skill_keys": {"$exists": True}}
+
+    rows = []
+    for limit in (5, 20, 50):
+        full = list(col.find(query).sort(TOP_EXPERTS_SORT).limit(limit))
+        cards = list(col.find(query, build_projection(None, TOP_EXPERTS_SORT)).sort(
+            TOP_EXPERTS_SORT).limit(limit))
+        rows.append(measure("full docs", full, old_path, args.repeat))
+        rows.append(measure("cards", cards, new_path, args.repeat))
+
+    print(f"{'result':<11}{'rows':>6}{'bytes/row':>11}{'prompt bytes':>14}{'~tokens':>9}{'serialize us':>14}")
+    for label, count, per_row, total, tokens, micros in rows:
+        print(f"{label:<11}{count:>6}{per_row:>11}{total:>14}{tokens:>9}{micros:>14.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
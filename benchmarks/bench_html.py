@@ -0,0 +1,137 @@
+# Parse time and peak memory per page: a full BeautifulSoup(html.parser) tree
+# (the old Kaggle/LinkedIn/feed code) vs html_extract's targeted lookups on
+# every installed backend. Uses synthetic pages shaped like the real ones, or
+# saved pages from --html-dir (*.html; a page is used for every task it has a
+# match for). Peak memory comes from tracemalloc, which only sees Python
+# allocations, so it understates the lxml and selectolax trees.
+#
+#   python benchmarks/bench_html.py [--repeat 20] [--html-dir DIR]
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import html_extract  # noqa: E402
+
+try:
+    from bs4 import BeautifulSoup
+except ImportError:
+    BeautifulSoup = None
+
+
+def body(blocks):
+    # Mostly layout markup, as on the real pages.
+    return "".join(
+        f'<div class="card row-{i}"><span class="label">Item {i}</span>'
+        f'<ul><li><a class="btn" data-id="{i}">More</a></li><li>{"text " * 20}</li></ul>'
+        f'<img src="/static/{i}.png" alt=""></div>' for i in range(blocks))
+
+
+def kaggle_page():
+    profile = {"@type": "Person", "name": "Ada", "jobTitle": "Data Scientist",
+               "address": {"addressLocality": "Lagos"}}
+    return (f'<!DOCTYPE html><html><head><title>Ada | Kaggle</title>'
+            f'{"<link rel=stylesheet href=/s.css>" * 20}'
+            f'<script type="application/ld+json">{json.dumps(profile)}</script></head>'
+            f'<body>{body(1500)}</body></html>')
+
+
+def linkedin_page():
+    return (f'<!DOCTYPE html><html><head>{"<meta name=x content=y>" * 30}'
+            f'<meta property="og:title" content="Ada Lovelace - Engineer"></head>'
+            f'<body>{body(3000)}</body></html>')
+
+
+def feed_page():
+    links = "".join(f'<li><a href="https://www.kaggle.com/user{i}">user{i}</a></li>' for i in range(200))
+    return f'<html><body>{body(500)}<ul>{links}</ul>{body(500)}</body></html>'
+
+
+def soup_json_ld(html):
+    node = BeautifulSoup(html, 'html.parser').find('script', {'type': 'application/ld+json'})
+    return node.string if node else None
+
+
+def soup_og_title(html):
+    node = BeautifulSoup(html, 'html.parser').find('meta', property='og:title')
+    return node['content'] if node else None
+
+
+def soup_links(html):
+    return [a['href'] for a in BeautifulSoup(html, 'html.parser').find_all('a', href=True)]
+
+
+TASKS = {
+    "kaggle json-ld": (soup_json_ld, html_extract.script_json_ld),
+    "linkedin og:title": (soup_og_title, lambda html, backend: html_extract.meta_property(
+        html, "og:title", backend)),
+    "feed links": (soup_links, html_extract.link_hrefs),
+}
+
+
+def synthetic_pages():
+    return {"kaggle json-ld": [kaggle_page()], "linkedin og:title": [linkedin_page()],
+            "feed links": [feed_page()]}
+
+
+def saved_pages(directory):
+    pages = {task: [] for task in TASKS}
+    for path in sorted(glob.glob(os.path.join(directory, "*.html"))):
+        with open(path, encoding="utf-8", errors="replace") as f:
+            html = f.read()
+        for task, (_, targeted) in TASKS.items():
+            if targeted(html, "stdlib"):
+                pages[task].append(html)
+    return pages
+
+
+def measure(parse, pages, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for html in pages:
+            parse(html)
+    elapsed = (time.perf_counter() - started) / (repeat * len(pages))
+
+    peak = 0
+    for html in pages:
+        tracemalloc.start()
+        parse(html)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return elapsed * 1000, peak / 1024
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--html-dir")
+    args = parser.parse_args(argv)
+
+    pages = saved_pages(args.html_dir) if args.html_dir else synthetic_pages()
+    if BeautifulSoup is None:
+        print("bs4 is not installed; the full-tree baseline is skipped")
+
+    rows = []
+    for task, (full, targeted) in TASKS.items():
+        if not pages[task]:
+            continue
+        kb = sum(len(html) for html in pages[task]) / len(pages[task]) / 1024
+        if BeautifulSoup is not None:
+            rows.append((task, len(pages[task]), kb, "bs4 full tree", *measure(full, pages[task], args.repeat)))
+        for backend in html_extract.AVAILABLE_BACKENDS:
+            rows.append((task, len(pages[task]), kb, f"{backend} targeted", *measure(
+                lambda html: targeted(html, backend), pages[task], args.repeat)))
+
+    print(f"{'task':<19}{'pages':>6}{'KB/page':>9}  {'parser':<20}{'ms/page':>9}{'peak KB':>10}")
+    for task, count, kb, label, ms, peak in rows:
+        print(f"{task:<19}{count:>6}{kb:>9.0f}  {label:<20}{ms:>9.2f}{peak:>10.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+# Tool-call latency and thread count: a new MongoClient per call (the old
+# mcp_server.get_db) vs the shared, pooled DBManager client. Needs a running
+# MongoDB at MONGO_URI; the profiles it queries go to a scratch database.
+#
+#   python benchmarks/bench_mongo_client.py [--calls 1000]
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pymongo import MongoClient  # noqa: E402
+from pymongo.errors import PyMongoError  # noqa: E402
+
+from db_manager import DBManager  # noqa: E402
+
+
+def tool_call(col):
+    return list(col.find({"skill_keys": "python"}, {"_id": 0, "basics.name": 1}).limit(5))
+
+
+def run(label, get_collection, calls):
+    threads_before = threading.active_count()
+    latencies = []
+    for _ in range(calls):
+        started = time.perf_counter()
+        tool_call(get_collection())
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    return {
+        "mode": label, "calls": calls,
+        "mean_ms": statistics.mean(latencies),
+        "p50_ms": latencies[len(latencies) // 2],
+        "p95_ms": latencies[int(len(latencies) * 0.95)],
+        "threads_added": threading.active_count() - threads_before,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    manager = DBManager()
+    manager.db_name = f"bench_{uuid.uuid4().hex[:8]}"
+    try:
+        db = manager.connect()
+    except PyMongoError as e:
+        print(f"MongoDB not reachable at {manager.uri}: {e}")
+        return 2
+
+    db.profiles.insert_many([
+        {"source_platform": "GitHub", "source_id": str(i), "skill_keys": ["python"],
+         "basics": {"name": f"dev {i}"}} for i in range(200)])
+    leaked = []
+
+    def per_call():
+        # What get_db() used to do: a fresh client on every call, never closed.
+        client = MongoClient(manager.uri)
+        leaked.append(client)
+        return client[manager.db_name]["profiles"]
+
+    try:
+        rows = [run("client per call", per_call, args.calls)]
+        for client in leaked:
+            client.close()
+        time.sleep(1)
+        rows.append(run("shared client", lambda: manager.get_collection("profiles"), args.calls))
+    finally:
+        manager.client.drop_database(manager.db_name)
+        manager.close()
+
+    print(f"{'mode':<18}{'calls':>7}{'mean ms':>10}{'p50 ms':>9}{'p95 ms':>9}{'threads +':>11}")
+    for row in rows:
+        print(f"{row['mode']:<18}{row['calls']:>7}{row['mean_ms']:>10.2f}{row['p50_ms']:>9.2f}"
+              f"{row['p95_ms']:>9.2f}{row['threads_added']:>11}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+# Old per-keyword regex loop vs the single-pass skill extractor, over
+# synthetic bios and LinkedIn-sized HTML pages. Exits non-zero if the two
+# disagree on any input.
+#
+#   python benchmarks/bench_skills.py [--profiles 2000] [--pages 50]
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from skills import compile_skill_pattern, skill_key  # noqa: E402
+
+# The vocabulary and loop Normalizer.extract_skills used before the taxonomy.
+BASELINE_KEYWORDS = [
+    "Python", "JavaScript", "TypeScript", "React", "Node.js", "Go", "Rust", "C++", "Java", "Kotlin",
+    "Machine Learning", "AI", "Deep Learning", "TensorFlow", "PyTorch", "AWS", "Azure", "GCP",
+    "Docker", "Kubernetes", "SQL", "NoSQL", "MongoDB", "PostgreSQL", "Solidity", "Blockchain",
+    "Data Science", "DevOps", "Cybersecurity", "Terraform", "Ansible", "Vue", "Angular", "Swift"
+]
+BASELINE_PATTERN = compile_skill_pattern(BASELINE_KEYWORDS)
+BASELINE_NAMES = {skill_key(kw): kw for kw in BASELINE_KEYWORDS}
+
+FILLER = ["engineer", "building", "teams", "at", "scale", "open source", "maintainer of",
+          "previously", "startup", "cloud-native", "platform", "and", "with", "passionate about",
+          "Google", "gopher", "JavaScripter", "Javanese", "reactor", "nosql-ish", "C", "Go-to"]
+
+
+def old_extract(text):
+    if not text:
+        return []
+    found = []
+    for kw in BASELINE_KEYWORDS:
+        if re.search(rf'\b{re.escape(kw)}\b', text, re.IGNORECASE):
+            found.append(kw)
+    return list(set(found))
+
+
+def new_extract(text):
+    if not text:
+        return []
+    return list({BASELINE_NAMES[m.group(0)] for m in BASELINE_PATTERN.finditer(text.lower())})
+
+
+def bio(rng):
+    words = rng.choices(FILLER, k=rng.randint(8, 30))
+    # C++ is left out: the old \bC\+\+\b never matched it before a space.
+    words += rng.sample([kw for kw in BASELINE_KEYWORDS if kw != "C++"], rng.randint(0, 6))
+    rng.shuffle(words)
+    text = " ".join(words)
+    return text.upper() if rng.random() < 0.1 else text
+
+
+def page(rng):
+    # Mostly markup, as on a LinkedIn profile: one headline and about section.
+    blocks = []
+    for i in range(400):
+        blocks.append(
+            f'<div class="ml-auto pv-entity__{i} artdeco-card"><span data-id="{rng.random()}">'
+            f'{" ".join(rng.choices(FILLER, k=6))}</span>'
+            f'<script src="/static/js/chunk-{i}.js"></script></div>')
+    blocks.insert(rng.randrange(len(blocks)), f'<section class="about"><p>{bio(rng)}</p></section>')
+    return "<html><head><style>.ml-2{margin:0}</style></head><body>" + "".join(blocks) + "</body></html>"
+
+
+def timed(extract, texts):
+    started = time.perf_counter()
+    results = [sorted(extract(text)) for text in texts]
+    return time.perf_counter() - started, results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--profiles", type=int, default=2000)
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    corpora = {"bios": [bio(rng) for _ in range(args.profiles)],
+               "html pages": [page(rng) for _ in range(args.pages)]}
+    print(f"{'corpus':<12}{'inputs':>8}{'old s':>10}{'new s':>10}{'speedup':>9}  diffs")
+    failed = False
+    for name, texts in corpora.items():
+        old_seconds, old_results = timed(old_extract, texts)
+        new_seconds, new_results = timed(new_extract, texts)
+        diffs = sum(a != b for a, b in zip(old_results, new_results))
+        failed |= bool(diffs)
+        print(f"{name:<12}{len(texts):>8}{old_seconds:>10.3f}{new_seconds:>10.3f}"
+              f"{old_seconds / new_seconds:>8.1f}x  {diffs}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+# Prompt size and end-to-end turn latency: tool output pasted into the
+# follow-up prompt with json.dumps(indent=2) (the old chat_loop) vs the
+# Conversation turn, which sends summarize_result output. The model is a
+# local stub server that answers with one function call and then text; it
+# charges --ms-per-1k-tokens of "prefill" per request, so prompt size shows
+# up in latency the way it does with a hosted model.
+#
+#   python benchmarks/bench_turns.py [--turns 20] [--ms-per-1k-tokens 20]
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import logging
+import os
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx  # noqa: E402
+import mongomock  # noqa: E402
+
+import ai_query_client  # noqa: E402
+import mcp_server  # noqa: E402
+from summarizer import BYTES_PER_TOKEN  # noqa: E402
+
+
+class StubModel(BaseHTTPRequestHandler):
+    # Set by main(): the function call to answer the first request with.
+    call = None
+    ms_per_1k_tokens = 0.0
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        payload = json.loads(body)
+        time.sleep(len(body) / BYTES_PER_TOKEN / 1000 * self.ms_per_1k_tokens / 1000)
+        last = payload["contents"][-1]["parts"][-1]
+        if "tools" in payload and "text" in last:
+            part = {"functionCall": self.call}
+        else:
+            part = {"text": "Here is what I found."}
+        reply = json.dumps({"candidates": [{"content": {"role": "model", "parts": [part]}}]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(reply)))
+        self.end_headers()
+        self.wfile.write(reply)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def card(i):
+    return {"source_platform": "GitHub", "source_id": str(i),
+            "basics": {"name": f"User {i}", "location": "Berlin, Germany",
+                       "headline": "Python and Rust engineer building data platforms on AWS, "
+                                   "previously infrastructure at a payments startup"},
+            "skills": ["Python", "Rust", "AWS", "Docker"],
+            "metrics": {"reputation_score": 5000 - i, "contribution_count": 120, "followers": 300}}
+
+
+SCENARIOS = {
+    "experts, 5 cards": ("find_top_experts", {"results": [card(i) for i in range(5)],
+                                               "next_cursor": "c" * 40}),
+    "experts, 50 cards": ("find_top_experts", {"results": [card(i) for i in range(50)],
+                                                "next_cursor": "c" * 40}),
+    "experts, 200 cards": ("find_top_experts", {"results": [card(i) for i in range(200)],
+                                                 "next_cursor": "c" * 40}),
+    "skills, 400 buckets": ("get_skill_distribution",
+                            [{"_id": f"skill-{i}", "count": 1000 - i} for i in range(400)]),
+}
+
+
+async def old_turn(client, question, stats):
+    # The pre-summarizer chat_loop: one tool round, result pasted as indent=2.
+    resp = await ai_query_client.call_gemini(client, question, stats=stats)
+    fc = ai_query_client.function_calls(resp)[0]
+    data_result = (await ai_query_client.run_tool(fc["name"], fc.get("args", {})))["result"]
+    final_prompt = (
+        f"I found this data in the profiles database:\n{json.dumps(data_result, indent=2)}\n\n"
+        f"Use this data to answer: {question}"
+    )
+    resp = await ai_query_client.call_gemini(client, final_prompt, include_tools=False, stats=stats)
+    return ai_query_client.extract_text(resp)
+
+
+async def new_turn(client, question, stats):
+    conversation = ai_query_client.Conversation()
+    answer = await conversation.ask(client, question)
+    stats.update({k: stats[k] + conversation.stats[k] for k in ("llm_calls", "payload_bytes")})
+    return answer
+
+
+async def run(base_url, turn, turns):
+    stats = {"llm_calls": 0, "payload_bytes": 0}
+    latencies = []
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        for _ in range(turns):
+            started = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                assert await turn(client, "Who are the top Python experts?", stats)
+            latencies.append((time.perf_counter() - started) * 1000)
+    # Both requests of a turn count, tool declarations included.
+    return stats["payload_bytes"] / turns, statistics.median(latencies)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--ms-per-1k-tokens", type=float, default=20.0)
+    args = parser.parse_args(argv)
+
+    # Conversation checks the profiles version before reusing results.
+    mcp_server.db_manager.db = mongomock.MongoClient()["bench"]
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    StubModel.ms_per_1k_tokens = args.ms_per_1k_tokens
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubModel)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    rows = []
+    try:
+        for scenario, (tool, result) in SCENARIOS.items():
+            StubModel.call = {"name": tool, "args": {}}
+            ai_query_client.TOOLS[tool] = lambda result=result: json.loads(json.dumps(result))
+            for label, turn in [("indent=2 prompt", old_turn), ("summarized", new_turn)]:
+                payload, latency = asyncio.run(run(base_url, turn, args.turns))
+                rows.append((scenario, label, payload, payload / BYTES_PER_TOKEN, latency))
+    finally:
+        server.shutdown()
+
+    print(f"{'scenario':<21}{'mode':<17}{'bytes/turn':>11}{'~tokens':>9}{'p50 ms':>9}")
+    for scenario, label, payload, tokens, latency in rows:
+        print(f"{scenario:<21}{label:<17}{payload:>11.0f}{tokens:>9.0f}{latency:>9.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+import copy
+import functools
+import inspect
+import os
+import threading
+import time
+from collections import OrderedDict
+
+META_COLLECTION = "meta"
+
+
+def bump_version(db, name):
+    db[META_COLLECTION].update_one(
+        {"_id": name}, {"$inc": {"version": 1}}, upsert=True)
+
+
+class CollectionVersion:
+    def __init__(self, get_meta_collection, name, check_interval=1.0):
+        self.get_meta_collection = get_meta_collection
+        self.name = name
+        self.check_interval = check_interval
+        self.version = None
+        self.checked_at = 0.0
+        self.lock = threading.Lock()
+
+    def current(self):
+        now = time.monotonic()
+        with self.lock:
+            if self.version is not None and now - self.checked_at < self.check_interval:
+                return self.version
+        doc = self.get_meta_collection().find_one({"_id": self.name})
+        with self.lock:
+            self.version = doc.get("version", 0) if doc else 0
+            self.checked_at = now
+            return self.version
+
+
+class TTLCache:
+    def __init__(self, maxsize=256, ttl=60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, version):
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                expires_at, entry_version, value = entry
+                if expires_at > now and entry_version == version:
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                del self.entries[key]
+            self.misses += 1
+            return False, None
+
+    def set(self, key, version, value):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, version, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries), "maxsize": self.maxsize, "ttl_seconds": self.ttl,
+                "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+
+def normalize_arg(value, fold_case=True):
+    if isinstance(value, str):
+        return " ".join(value.lower().split()) if fold_case else value
+    if isinstance(value, (list, tuple)):
+        return tuple(normalize_arg(v, fold_case) for v in value)
+    return value
+
+
+def cached_tool(cache, version_source, verbatim=()):
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = (func.__name__,) + tuple(
+                (name, normalize_arg(value, fold_case=name not in verbatim))
+                for name, value in bound.arguments.items())
+            version = version_source.current()
+            hit, value = cache.get(key, version)
+            if hit:
+                return copy.deepcopy(value)
+            value = func(*args, **kwargs)
+            # Callers trim and reshape results, so the cache keeps its own copy
+            # and hands out fresh ones.
+            cache.set(key, version, copy.deepcopy(value))
+            return value
+        return wrapper
+    return decorator
+
+
+def cache_from_env():
+    return TTLCache(
+        maxsize=int(os.getenv("TOOL_CACHE_MAX_ENTRIES", 256)),
+        ttl=float(os.getenv("TOOL_CACHE_TTL_SECONDS", 60)))
@@ -1,5 +1,6 @@
 import os
 import logging
+import threading
 from pymongo import MongoClient
 from pymongo.errors import ConnectionFailure
 from dotenv import load_dotenv
@@ -14,19 +15,33 @@ class DBManager:
     def __init__(self):
         self.uri = os.getenv("MONGO_URI", "mongodb://localhost:27017/")
         self.db_name = os.getenv("DB_NAME", "profile_scrapers")
+        self.pool_options = {
+            "maxPoolSize": int(os.getenv("MONGO_MAX_POOL_SIZE", 50)),
+            "minPoolSize": int(os.getenv("MONGO_MIN_POOL_SIZE", 0)),
+            "maxIdleTimeMS": int(os.getenv("MONGO_MAX_IDLE_TIME_MS", 300000)),
+            "serverSelectionTimeoutMS": int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", 5000)),
+            "connectTimeoutMS": int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", 5000)),
+            "socketTimeoutMS": int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", 30000)),
+        }
         self.client = None
         self.db = None
+        self._lock = threading.Lock()
 
     def connect(self):
-        try:
-            self.client = MongoClient(self.uri, serverSelectionTimeoutMS=5000)
-            self.client.admin.command('ping')
-            self.db = self.client[self.db_name]
-            logger.info(f"Successfully connected to database: {self.db_name}")
-            return self.db
-        except ConnectionFailure as e:
-            logger.error(f"Could not connect to MongoDB: {e}")
-            raise
+        with self._lock:
+            if self.db is not None:
+                return self.db
+            try:
+                self.client = MongoClient(self.uri, **self.pool_options)
+                self.client.admin.command('ping')
+                self.db = self.client[self.db_name]
+                logger.info(f"Successfully connected to database: {self.db_name}")
+                return self.db
+            except ConnectionFailure as e:
+                logger.error(f"Could not connect to MongoDB: {e}")
+                self.client.close()
+                self.client = None
+                raise
 
     def get_collection(self, collection_name):
         if self.db is None:
@@ -34,6 +49,9 @@ class DBManager:
         return self.db[collection_name]
 
     def close(self):
-        if self.client:
-            self.client.close()
-            logger.info("MongoDB connection closed.")
+        with self._lock:
+            if self.client:
+                self.client.close()
+                self.client = None
+                self.db = None
+                logger.info("MongoDB connection closed.")
@@ -1,6 +1,24 @@
-from pymongo import ASCENDING, TEXT
+from pymongo import ASCENDING, DESCENDING, TEXT, UpdateOne
 from pymongo.errors import OperationFailure
 from db_manager import DBManager
+from frontier import create_frontier_indexes
+from geo import GEO_FIELDS, normalize_location
+from rollups import create_rollup_indexes, refresh_rollups
+
+SEARCH_INDEX_FIELDS = [
+    ("basics.headline", TEXT),
+    ("skills", TEXT),
+    ("basics.name", TEXT),
+    ("basics.location", TEXT)
+]
+
+TOP_EXPERTS_INDEX_FIELDS = [
+    ("skill_keys", ASCENDING),
+    ("metrics.reputation_score", DESCENDING),
+    ("metrics.contribution_count", DESCENDING),
+    ("metrics.followers", DESCENDING),
+    ("_id", DESCENDING)
+]
 
 
 def create_validation_schemas(db):
@@ -27,6 +45,19 @@ def create_validation_schemas(db):
                         "bsonType": "array",
                         "items": {"bsonType": "string"}
                     },
+                    "skill_keys": {
+                        "bsonType": "array",
+                        "items": {"bsonType": "string"}
+                    },
+                    "geo": {
+                        "bsonType": "object",
+                        "properties": {
+                            "city": {"bsonType": "string"},
+                            "region": {"bsonType": "string"},
+                            "country": {"bsonType": "string"},
+                            "raw": {"bsonType": "string"}
+                        }
+                    },
                     "metrics": {"bsonType": "object"},
                     "source_id": {"bsonType": "string"},
                     "source_platform": {"bsonType": "string"}
@@ -49,30 +80,67 @@ def create_indexes(db):
         print(
             f"Unique email index exists or conflict: {e.details.get('errmsg')}")
 
+    if "top_experts_index" in db.profiles.index_information():
+        db.profiles.drop_index("top_experts_index")
+    db.profiles.create_index(
+        TOP_EXPERTS_INDEX_FIELDS, name="top_experts_keyset_index")
+
     try:
         print("Applying 'search_index'...")
-        db.profiles.create_index([
-            ("basics.headline", TEXT),
-            ("skills", TEXT),
-            ("basics.name", TEXT)
-        ], name="search_index")
+        db.profiles.create_index(SEARCH_INDEX_FIELDS, name="search_index")
     except OperationFailure as e:
         if e.code == 85:
             print(
                 "🔄 Index conflict detected. Dropping old 'search_index' and recreating...")
             db.profiles.drop_index("search_index")
-            db.profiles.create_index([
-                ("basics.headline", TEXT),
-                ("skills", TEXT),
-                ("basics.name", TEXT)
-            ], name="search_index")
+            db.profiles.create_index(
+                SEARCH_INDEX_FIELDS, name="search_index")
             print("'search_index' updated successfully.")
         else:
             print(f"Failed to create text index: {e}")
 
+    for field in GEO_FIELDS:
+        db.profiles.create_index([(f"geo.{field}", ASCENDING)])
+
+    db.profiles.create_index([
+        ("source_platform", ASCENDING), ("fetch_meta.last_fetched_at", ASCENDING)])
+
+    create_rollup_indexes(db)
+    create_frontier_indexes(db)
+
     print("All indexes verified and applied.")
 
 
+def backfill_skill_keys(db):
+    result = db.profiles.update_many(
+        {"skill_keys": {"$exists": False}},
+        [{"$set": {"skill_keys": {"$map": {
+            "input": {"$ifNull": ["$skills", []]},
+            "in": {"$toLower": {"$trim": {"input": "$$this"}}}
+        }}}}]
+    )
+    print(f"Backfilled skill_keys on {result.modified_count} profiles.")
+
+
+def backfill_geo(db, batch_size=500):
+    # The gazetteer lives in Python, so this can't be a pipeline update. Every
+    # profile is re-resolved so gazetteer changes reach existing data; only the
+    # ones that resolve differently are rewritten.
+    updated = 0
+    ops = []
+    for doc in db.profiles.find({}, {"basics.location": 1, "geo": 1}):
+        geo = normalize_location(doc.get("basics", {}).get("location"))
+        if doc.get("geo") == geo:
+            continue
+        ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"geo": geo}}))
+        if len(ops) >= batch_size:
+            updated += db.profiles.bulk_write(ops, ordered=False).modified_count
+            ops = []
+    if ops:
+        updated += db.profiles.bulk_write(ops, ordered=False).modified_count
+    print(f"Backfilled geo on {updated} profiles.")
+
+
 if __name__ == "__main__":
     manager = DBManager()
     db = manager.connect()
@@ -80,4 +148,7 @@ if __name__ == "__main__":
     print("--- STARTING DATABASE SETUP ---")
     create_validation_schemas(db)
     create_indexes(db)
+    backfill_skill_keys(db)
+    backfill_geo(db)
+    refresh_rollups(db)
     print("--- SETUP COMPLETE ---")
@@ -0,0 +1,75 @@
+import os
+from datetime import datetime, timezone
+from pymongo import ASCENDING
+from pymongo.errors import BulkWriteError
+
+CRAWL_STATE = "crawl_state"
+CRAWL_FRONTIER = "crawl_frontier"
+MAX_FRONTIER_ATTEMPTS = int(os.getenv("MAX_FRONTIER_ATTEMPTS", 3))
+
+
+def create_frontier_indexes(db):
+    db[CRAWL_FRONTIER].create_index(
+        [("source", ASCENDING), ("status", ASCENDING), ("queued_at", ASCENDING)])
+
+
+class CrawlState:
+    def __init__(self, db, source):
+        self.source = source
+        self.checkpoints = db[CRAWL_STATE]
+        self.frontier = db[CRAWL_FRONTIER]
+
+    def entry_id(self, key):
+        return f"{self.source}:{key}"
+
+    def load(self):
+        doc = self.checkpoints.find_one({"_id": self.source})
+        return doc.get("cursor", {}) if doc else {}
+
+    def save(self, **cursor):
+        self.checkpoints.update_one(
+            {"_id": self.source},
+            {"$set": {**{f"cursor.{k}": v for k, v in cursor.items()},
+                      "updated_at": datetime.now(timezone.utc)}},
+            upsert=True)
+
+    def reset(self):
+        self.checkpoints.delete_one({"_id": self.source})
+
+    def claim(self, keys):
+        # Returns the keys never seen before and queues them; anything already
+        # queued, visited or given up on is filtered out before it is fetched.
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return []
+        known = {doc["key"] for doc in self.frontier.find(
+            {"_id": {"$in": [self.entry_id(k) for k in keys]}}, {"key": 1})}
+        fresh = [k for k in keys if k not in known]
+        if fresh:
+            now = datetime.now(timezone.utc)
+            try:
+                self.frontier.insert_many([
+                    {"_id": self.entry_id(k), "source": self.source, "key": k,
+                     "status": "queued", "attempts": 0, "queued_at": now}
+                    for k in fresh
+                ], ordered=False)
+            except BulkWriteError as e:
+                # Another worker claimed some of them in the meantime.
+                taken = {err["op"]["key"] for err in e.details.get("writeErrors", [])}
+                fresh = [k for k in fresh if k not in taken]
+        return fresh
+
+    def pending(self, limit=0):
+        cursor = self.frontier.find(
+            {"source": self.source, "status": "queued",
+             "attempts": {"$lt": MAX_FRONTIER_ATTEMPTS}},
+            {"key": 1}).sort("queued_at", ASCENDING).limit(limit)
+        return [doc["key"] for doc in cursor]
+
+    def finish(self, key, ok):
+        update = {"$set": {"updated_at": datetime.now(timezone.utc)}}
+        if ok:
+            update["$set"]["status"] = "done"
+        else:
+            update["$inc"] = {"attempts": 1}
+        self.frontier.update_one({"_id": self.entry_id(key)}, update)
@@ -0,0 +1,114 @@
+import json
+import os
+import re
+
+GAZETTEER_PATH = os.getenv(
+    "GAZETTEER_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "gazetteer.json"))
+
+GEO_FIELDS = ("city", "region", "country")
+SPLIT_PATTERN = re.compile(r"\s*(?:[,/|;()·]|\s-\s)\s*")
+REGEX_SPECIALS = re.compile(r"([.^$*+?{}\[\]\\|()])")
+
+
+def place_key(text):
+    return " ".join(str(text).lower().split())
+
+
+def load_gazetteer(path=GAZETTEER_PATH):
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+
+    # An alias can name several places ("london" in England and in Ontario);
+    # the first one listed is the default when nothing else disambiguates it.
+    places = {}
+
+    def add(entry, place):
+        for alias in [entry["name"]] + entry.get("aliases", []):
+            options = places.setdefault(place_key(alias), [])
+            if place not in options:
+                options.append(place)
+
+    for entry in data.get("countries", []):
+        add(entry, {"city": "", "region": "", "country": entry["name"]})
+    for entry in data.get("regions", []):
+        add(entry, {"city": "", "region": entry["name"],
+                    "country": entry.get("country", "")})
+    for entry in data.get("cities", []):
+        add(entry, {"city": entry["name"], "region": entry.get("region", ""),
+                    "country": entry.get("country", "")})
+    return places
+
+
+def compile_place_pattern(aliases):
+    # Two-letter codes (CA, LA, ON) are only trusted as a whole comma-separated
+    # part, never when scanning free text.
+    alternation = "|".join(
+        re.escape(a) for a in sorted(aliases, key=len, reverse=True) if len(a) > 2)
+    return re.compile(rf"(?<!\w)(?:{alternation})(?!\w)")
+
+
+PLACES = load_gazetteer()
+PLACE_PATTERN = compile_place_pattern(PLACES)
+
+
+def agreement(place, other):
+    score = 0
+    for field in ("region", "country"):
+        if place[field] and other[field]:
+            score += 1 if place[field] == other[field] else -1
+    return score
+
+
+def conflicts(geo, place):
+    return any(geo[field] and place[field] and geo[field] != place[field]
+               for field in ("region", "country"))
+
+
+def resolve(options_per_part):
+    # For each part pick the option that best agrees with the other parts, so
+    # "London, Ontario" lands on the Ontario entry rather than the default.
+    chosen = []
+    for i, options in enumerate(options_per_part):
+        others = [o for j, opts in enumerate(options_per_part) if j != i for o in opts]
+        chosen.append(max(options, key=lambda p: sum(agreement(p, o) for o in others)))
+    return chosen
+
+
+def normalize_location(text):
+    raw = place_key(text or "")
+    geo = {"city": "", "region": "", "country": "", "raw": raw}
+    if not raw:
+        return geo
+
+    if raw in PLACES:
+        matches = [PLACES[raw]]
+    else:
+        matches = [PLACES[part] for part in SPLIT_PATTERN.split(raw) if part in PLACES]
+    if not matches:
+        matches = [PLACES[m.group(0)] for m in PLACE_PATTERN.finditer(raw)]
+
+    chosen = resolve(matches)
+    # Explicit regions and countries are applied first; a city that still
+    # disagrees with them only contributes its name.
+    for place in sorted(chosen, key=lambda p: bool(p["city"])):
+        if conflicts(geo, place):
+            if place["city"] and not geo["city"]:
+                geo["city"] = place["city"]
+            continue
+        for field in GEO_FIELDS:
+            if not geo[field] and place[field]:
+                geo[field] = place[field]
+    return geo
+
+
+def geo_filter(location):
+    geo = normalize_location(location)
+    # Match every resolved field so same-named cities in different countries
+    # stay apart.
+    resolved = {field: geo[field] for field in GEO_FIELDS if geo[field]}
+    if resolved:
+        return resolved
+    # Escape only regex metacharacters so Mongo still sees a plain prefix
+    # and can bound the index scan.
+    return {"raw": {"$regex": "^" + REGEX_SPECIALS.sub(r"\\\1", geo["raw"])}}
@@ -0,0 +1,107 @@
+import os
+from html.parser import HTMLParser
+
+try:
+    from selectolax.parser import HTMLParser as LexborParser
+except ImportError:
+    LexborParser = None
+
+try:
+    import lxml.html
+except ImportError:
+    lxml = None
+
+AVAILABLE_BACKENDS = [name for name, module in
+                      [("selectolax", LexborParser), ("lxml", lxml), ("stdlib", HTMLParser)] if module]
+HTML_BACKEND = os.getenv("HTML_PARSER_BACKEND") or AVAILABLE_BACKENDS[0]
+if HTML_BACKEND not in AVAILABLE_BACKENDS:
+    raise ValueError(
+        f"HTML_PARSER_BACKEND={HTML_BACKEND} is not installed, choose from {AVAILABLE_BACKENDS}")
+
+
+class StopScan(Exception):
+    pass
+
+
+class TagScanner(HTMLParser):
+    # Streams through the markup without building a tree and bails out as soon
+    # as the wanted node has been seen.
+    def __init__(self, tag, attrs=None, want_text=False, first_only=True):
+        super().__init__(convert_charrefs=True)
+        self.tag = tag
+        self.attrs = attrs or {}
+        self.want_text = want_text
+        self.first_only = first_only
+        self.matches = []
+        self.capturing = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag != self.tag:
+            return
+        attrs = dict(attrs)
+        if any(attrs.get(k) != v for k, v in self.attrs.items()):
+            return
+        if self.want_text:
+            self.capturing = []
+            return
+        self.matches.append(attrs)
+        if self.first_only:
+            raise StopScan
+
+    def handle_startendtag(self, tag, attrs):
+        if not self.want_text:
+            self.handle_starttag(tag, attrs)
+
+    def handle_data(self, data):
+        if self.capturing is not None:
+            self.capturing.append(data)
+
+    def handle_endtag(self, tag):
+        if tag == self.tag and self.capturing is not None:
+            self.matches.append("".join(self.capturing))
+            self.capturing = None
+            if self.first_only:
+                raise StopScan
+
+    def scan(self, html):
+        try:
+            self.feed(html)
+            self.close()
+        except StopScan:
+            pass
+        return self.matches
+
+
+def script_json_ld(html, backend=None):
+    backend = backend or HTML_BACKEND
+    if backend == "selectolax":
+        node = LexborParser(html).css_first('script[type="application/ld+json"]')
+        return node.text() if node else None
+    if backend == "lxml":
+        nodes = lxml.html.fromstring(html).xpath('//script[@type="application/ld+json"][1]/text()')
+        return nodes[0] if nodes else None
+    matches = TagScanner("script", {"type": "application/ld+json"}, want_text=True).scan(html)
+    return matches[0] if matches else None
+
+
+def meta_property(html, prop, backend=None):
+    backend = backend or HTML_BACKEND
+    if backend == "selectolax":
+        node = LexborParser(html).css_first(f'meta[property="{prop}"]')
+        return node.attributes.get("content") if node else None
+    if backend == "lxml":
+        nodes = lxml.html.fromstring(html).xpath('//meta[@property=$prop][1]/@content', prop=prop)
+        return nodes[0] if nodes else None
+    matches = TagScanner("meta", {"property": prop}).scan(html)
+    return matches[0].get("content") if matches else None
+
+
+def link_hrefs(html, backend=None):
+    backend = backend or HTML_BACKEND
+    if backend == "selectolax":
+        hrefs = [node.attributes.get("href") for node in LexborParser(html).css("a[href]")]
+    elif backend == "lxml":
+        hrefs = lxml.html.fromstring(html).xpath("//a/@href")
+    else:
+        hrefs = [attrs.get("href") for attrs in TagScanner("a", first_only=False).scan(html)]
+    return [href for href in hrefs if href]
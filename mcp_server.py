@@ -1,75 +1,192 @@
+import atexit
 import os
 from mcp.server.fastmcp import FastMCP
-from pymongo import MongoClient
-from bson import json_util
-import json
+import re
+from typing import List, Optional
+from cache import META_COLLECTION, CollectionVersion, cache_from_env, cached_tool
+from db_manager import DBManager
+from geo import geo_filter
+from pagination import decode_cursor, encode_cursor, keyset_filter
+from rollups import GEO_ROLLUP, SKILL_ROLLUP, check_rollups
+from serialization import to_json_safe
+from skills import KNOWN_SKILL_KEYS, canonical_skill_key, skill_category, skill_label
 
 mcp = FastMCP("TechProfileAnalytics")
 
+TOP_EXPERTS_SORT = [
+    ("metrics.reputation_score", -1),
+    ("metrics.contribution_count", -1),
+    ("metrics.followers", -1),
+    ("_id", -1)
+]
+TEXT_SORT = [("score", -1), ("_id", -1)]
+SUBSTRING_SORT = [("_id", -1)]
+# Larger result sets are paged through next_cursor rather than built in one list.
+MAX_PAGE_SIZE = int(os.getenv("TOOL_MAX_PAGE_SIZE", 50))
+
+CARD_FIELDS = [
+    "source_platform", "source_id",
+    "basics.name", "basics.headline", "basics.location",
+    "skills",
+    "metrics.reputation_score", "metrics.contribution_count", "metrics.followers"
+]
+
+db_manager = DBManager()
+atexit.register(db_manager.close)
+
+tool_cache = cache_from_env()
+profiles_version = CollectionVersion(
+    lambda: db_manager.get_collection(META_COLLECTION), 'profiles',
+    check_interval=float(os.getenv("TOOL_CACHE_VERSION_CHECK_SECONDS", 1)))
+
 
 def get_db():
-    client = MongoClient(os.getenv("MONGO_URI", "mongodb://localhost:27017"))
-    db = client['profile_scraper']
-    return db['profiles']
+    return db_manager.get_collection('profiles')
 
 
-@mcp.tool()
-def search_profiles(query: str, limit: int = 5):
-    col = get_db()
-    search_filter = {
+def build_projection(fields=None, sort=()):
+    fields = sorted(set(fields or CARD_FIELDS) | {field for field, _ in sort})
+    projection = {"_id": 1 if "_id" in fields else 0}
+    for field in fields:
+        if field != "_id" and not any(field.startswith(f"{other}.") for other in fields):
+            projection[field] = 1
+    return projection
+
+
+def search_filter(query, substring):
+    if not substring:
+        return {"$text": {"$search": query}}
+    pattern = re.escape(query)
+    return {
         "$or": [
-            {"basics.name": {"$regex": query, "$options": "i"}},
-            {"basics.headline": {"$regex": query, "$options": "i"}},
-            {"basics.location": {"$regex": query, "$options": "i"}},
-            {"skills": {"$regex": query, "$options": "i"}}
+            {"basics.name": {"$regex": pattern, "$options": "i"}},
+            {"basics.headline": {"$regex": pattern, "$options": "i"}},
+            {"basics.location": {"$regex": pattern, "$options": "i"}},
+            {"skills": {"$regex": pattern, "$options": "i"}}
         ]
     }
-    results = list(col.find(search_filter).limit(limit))
-    return json.loads(json_util.dumps(results))
 
 
-@mcp.tool()
-def find_top_experts(skill: str, limit: int = 5):
-    col = get_db()
-    query = {
+def experts_filter(skill):
+    key = canonical_skill_key(skill)
+    if key in KNOWN_SKILL_KEYS:
+        return {"skill_keys": key}
+    pattern = re.escape(skill)
+    return {
         "$or": [
-            {"skills": {"$regex": skill, "$options": "i"}},
-            {"basics.headline": {"$regex": skill, "$options": "i"}}
+            {"skills": {"$regex": pattern, "$options": "i"}},
+            {"basics.headline": {"$regex": pattern, "$options": "i"}}
         ]
     }
-    results = list(col.find(query).sort([
-        ("metrics.reputation_score", -1),
-        ("metrics.contribution_count", -1),
-        ("metrics.followers", -1)
-    ]).limit(limit))
-    return json.loads(json_util.dumps(results))
+
+
+def to_cards(docs, fields):
+    if not fields or "_id" not in fields:
+        for doc in docs:
+            doc.pop("_id", None)
+    return to_json_safe(docs)
+
+
+def page_size(limit):
+    return max(1, min(int(limit), MAX_PAGE_SIZE))
+
+
+def build_page(docs, limit, kind, sort, fields):
+    next_cursor = None
+    if docs and len(docs) == limit:
+        next_cursor = encode_cursor(kind, docs[-1], sort)
+    return {"results": to_cards(docs, fields), "next_cursor": next_cursor}
 
 
 @mcp.tool()
-def get_geo_density(location: str):
+@cached_tool(tool_cache, profiles_version, verbatim=("fields", "cursor"))
+def search_profiles(query: str, limit: int = 5, substring: bool = False,
+                    fields: Optional[List[str]] = None, cursor: Optional[str] = None):
+    col = get_db()
+    limit = page_size(limit)
+    if substring:
+        match = search_filter(query, True)
+        if cursor:
+            match = {"$and": [match, keyset_filter(
+                SUBSTRING_SORT, decode_cursor(cursor, "substring", SUBSTRING_SORT))]}
+        docs = list(col.find(match, build_projection(fields, SUBSTRING_SORT)).sort(
+            SUBSTRING_SORT).limit(limit))
+        return build_page(docs, limit, "substring", SUBSTRING_SORT, fields)
+
+    pipeline = [
+        {"$match": search_filter(query, False)},
+        {"$addFields": {"score": {"$meta": "textScore"}}}
+    ]
+    if cursor:
+        pipeline.append({"$match": keyset_filter(
+            TEXT_SORT, decode_cursor(cursor, "text", TEXT_SORT))})
+    pipeline += [
+        {"$sort": dict(TEXT_SORT)},
+        {"$limit": limit},
+        {"$project": build_projection(fields, TEXT_SORT)}
+    ]
+    docs = list(col.aggregate(pipeline))
+    return build_page(docs, limit, "text", TEXT_SORT, fields)
+
+
+@mcp.tool()
+@cached_tool(tool_cache, profiles_version, verbatim=("fields", "cursor"))
+def find_top_experts(skill: str, limit: int = 5, fields: Optional[List[str]] = None,
+                     cursor: Optional[str] = None):
     col = get_db()
+    limit = page_size(limit)
+    query = experts_filter(skill)
+    if cursor:
+        query = {"$and": [query, keyset_filter(
+            TOP_EXPERTS_SORT, decode_cursor(cursor, "experts", TOP_EXPERTS_SORT))]}
+    docs = list(col.find(query, build_projection(fields, TOP_EXPERTS_SORT)).sort(
+        TOP_EXPERTS_SORT).limit(limit))
+    return build_page(docs, limit, "experts", TOP_EXPERTS_SORT, fields)
+
+
+@mcp.tool()
+@cached_tool(tool_cache, profiles_version)
+def get_geo_density(location: str):
+    rollup = db_manager.get_collection(GEO_ROLLUP)
     pipeline = [
-        {"$match": {"basics.location": {"$regex": location, "$options": "i"}}},
+        {"$match": geo_filter(location)},
         {"$group": {
-            "_id": "$source_platform",
-            "total_count": {"$sum": 1},
-            "avg_reputation": {"$avg": "$metrics.reputation_score"}
+            "_id": "$platform",
+            "total_count": {"$sum": "$count"},
+            "reputation_sum": {"$sum": "$reputation_sum"},
+            "reputation_count": {"$sum": "$reputation_count"}
         }}
     ]
-    return list(col.aggregate(pipeline))
+    return [
+        {"_id": row["_id"], "total_count": row["total_count"],
+         "avg_reputation": row["reputation_sum"] / row["reputation_count"] if row["reputation_count"] else None}
+        for row in rollup.aggregate(pipeline)
+    ]
 
 
 @mcp.tool()
+@cached_tool(tool_cache, profiles_version)
 def get_skill_distribution():
-    col = get_db()
-    pipeline = [
-        {"$unwind": "$skills"},
-        {"$group": {"_id": "$skills", "count": {"$sum": 1}}},
-        {"$sort": {"count": -1}},
-        {"$limit": 20}
+    rollup = db_manager.get_collection(SKILL_ROLLUP)
+    return [
+        {"_id": skill_label(row["_id"]), "count": row["count"],
+         "category": skill_category(row["_id"])}
+        for row in rollup.find({"count": {"$gt": 0}}).sort("count", -1).limit(20)
     ]
-    return list(col.aggregate(pipeline))
+
+
+@mcp.tool()
+def check_rollup_consistency():
+    return to_json_safe(check_rollups(get_db().database))
+
+
+@mcp.tool()
+def get_cache_stats():
+    return tool_cache.stats()
 
 
 if __name__ == "__main__":
-    mcp.run()
+    try:
+        mcp.run()
+    finally:
+        db_manager.close()
@@ -0,0 +1,166 @@
+import json
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+from db_manager import DBManager
+from scraper import (GitHubScraper, KaggleScraper, LinkedInScraper, ORCIDScraper,
+                     StackOverflowScraper, replay_archive)
+
+logger = logging.getLogger(__name__)
+
+LINKEDIN_KEYWORDS = ["Python", "Data Science", "React", "DevOps"]
+
+SOURCES = {
+    "github": (GitHubScraper, lambda s, cfg: s.discover_active_users(cfg["target"])),
+    "stackoverflow": (StackOverflowScraper, lambda s, cfg: s.scrape_n_users(cfg["target"])),
+    "orcid": (ORCIDScraper, lambda s, cfg: s.scrape_by_keywords(cfg["target"])),
+    "kaggle": (KaggleScraper, lambda s, cfg: s.discover_and_scrape(cfg["target"])),
+    "linkedin": (LinkedInScraper, lambda s, cfg: s.search_and_scrape(
+        cfg.get("keywords", LINKEDIN_KEYWORDS), limit=cfg["target"])),
+}
+
+
+def default_config():
+    return {
+        "github": {"target": 5000},
+        "stackoverflow": {"target": 3000, "enabled": False},
+        "orcid": {"target": 2000},
+        "kaggle": {"target": 500},
+        "linkedin": {"target": 50, "enabled": bool(os.getenv("LINKEDIN_COOKIE"))},
+    }
+
+
+def load_config(path=None):
+    config = default_config()
+    path = path or os.getenv("SCRAPE_CONFIG")
+    if path:
+        with open(path, encoding="utf-8") as f:
+            for name, overrides in json.load(f).items():
+                if name not in SOURCES:
+                    raise ValueError(f"Unknown source '{name}' in {path}")
+                config.setdefault(name, {}).update(overrides)
+    return config
+
+
+class SourceRun:
+    def __init__(self, name, col, cfg):
+        self.name = name
+        self.cfg = cfg
+        scraper_class, self.job = SOURCES[name]
+        self.scraper = scraper_class(col)
+        self.thread = threading.Thread(target=self.run, name=f"scrape-{name}", daemon=True)
+        self.error = None
+        self.wall_seconds = 0.0
+        self.timed_out = False
+
+    def stop(self):
+        self.scraper.stop_event.set()
+
+    def budget_expired(self):
+        self.timed_out = True
+        logger.warning(f"{self.name}: time budget of {self.cfg['time_budget_seconds']}s spent, stopping.")
+        self.stop()
+
+    def run(self):
+        timer = None
+        if self.cfg.get("time_budget_seconds"):
+            timer = threading.Timer(self.cfg["time_budget_seconds"], self.budget_expired)
+            timer.daemon = True
+            timer.start()
+        started = time.monotonic()
+        try:
+            self.job(self.scraper, self.cfg)
+        except Exception as e:
+            self.error = e
+            logger.error(f"{self.name} scraper failed: {e}")
+        finally:
+            self.scraper.flush()
+            self.wall_seconds = time.monotonic() - started
+            if timer:
+                timer.cancel()
+
+    def summary(self):
+        s = self.scraper
+        return {
+            "source": self.name, "requests": s.request_count,
+            "new": s.inserted_count, "duplicates": s.matched_count, "failed": s.failed_count,
+            "requests_per_second": round(s.request_count / self.wall_seconds, 2) if self.wall_seconds else 0.0,
+            "wall_seconds": round(self.wall_seconds, 1),
+            "status": "failed" if self.error else "budget" if self.timed_out else
+                      "stopped" if s.stop_event.is_set() else "done"
+        }
+
+
+def run_sources(col, config):
+    runs = [SourceRun(name, col, cfg) for name, cfg in config.items()
+            if cfg.get("enabled", True)]
+
+    # Counted here rather than read off the scrapers' stop events, which a
+    # spent time budget also sets.
+    interrupts = []
+
+    def shutdown(signum, frame):
+        interrupts.append(signum)
+        if len(interrupts) > 1:
+            raise KeyboardInterrupt
+        logger.warning("Interrupt received, letting scrapers flush and stop. Press Ctrl+C again to abort.")
+        for run in runs:
+            run.stop()
+
+    previous = signal.signal(signal.SIGINT, shutdown)
+    try:
+        for run in runs:
+            run.thread.start()
+        # Join with a timeout so the main thread keeps handling SIGINT.
+        while any(run.thread.is_alive() for run in runs):
+            for run in runs:
+                run.thread.join(timeout=0.5)
+    finally:
+        signal.signal(signal.SIGINT, previous)
+    return [run.summary() for run in runs]
+
+
+def print_summary(summaries):
+    print(f"{'source':<14}{'requests':>10}{'new':>8}{'dupes':>8}{'failed':>8}{'req/s':>8}{'wall s':>9}  status")
+    for row in summaries:
+        print(f"{row['source']:<14}{row['requests']:>10}{row['new']:>8}{row['duplicates']:>8}{row['failed']:>8}"
+              f"{row['requests_per_second']:>8}{row['wall_seconds']:>9}  {row['status']}")
+
+
+def refresh(col, sources):
+    max_age_hours = float(os.getenv("REFRESH_MAX_AGE_HOURS", 24))
+    if "github" in sources:
+        print("=== STARTING INCREMENTAL GITHUB REFRESH ===")
+        GitHubScraper(col).refresh_profiles(max_age_hours=max_age_hours)
+    if "stackoverflow" in sources:
+        print("=== STARTING STACKOVERFLOW BATCH REFRESH ===")
+        StackOverflowScraper(col).refresh_users(max_age_hours=max_age_hours)
+
+
+def main(argv=None, col=None):
+    # python orchestrator.py                    full scrape from SCRAPE_CONFIG
+    # python orchestrator.py refresh [sources]  re-crawl stale profiles (default: github)
+    # python orchestrator.py replay [platforms] re-ingest the raw response archive
+    argv = sys.argv[1:] if argv is None else argv
+    if col is None:
+        col = DBManager().connect()['profiles']
+
+    if argv[:1] == ["refresh"]:
+        refresh(col, argv[1:] or ["github"])
+    elif argv[:1] == ["replay"]:
+        print("=== REPLAYING RAW RESPONSE ARCHIVE ===")
+        try:
+            replay_archive(col, os.getenv("RAW_ARCHIVE_DIR", "raw_archive"), argv[1:] or None)
+        except ValueError as e:
+            sys.exit(str(e))
+    else:
+        print("=== STARTING INTEGRATED MASS SCRAPE ===")
+        print_summary(run_sources(col, load_config()))
+        print("=== MASS SCRAPE COMPLETE ===")
+
+
+if __name__ == "__main__":
+    main()
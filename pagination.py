@@ -0,0 +1,51 @@
+import base64
+import binascii
+from bson import json_util
+
+
+def get_path(doc, path):
+    for part in path.split("."):
+        if not isinstance(doc, dict):
+            return None
+        doc = doc.get(part)
+    return doc
+
+
+def encode_cursor(kind, doc, sort):
+    payload = {"k": kind, "v": [get_path(doc, field) for field, _ in sort]}
+    return base64.urlsafe_b64encode(json_util.dumps(payload).encode()).decode()
+
+
+def decode_cursor(token, kind, sort):
+    try:
+        payload = json_util.loads(base64.urlsafe_b64decode(token.encode()))
+    except (ValueError, TypeError, binascii.Error):
+        raise ValueError("Invalid cursor")
+    if not isinstance(payload, dict) or payload.get("k") != kind or len(payload.get("v", [])) != len(sort):
+        raise ValueError("Cursor does not belong to this query")
+    return payload["v"]
+
+
+def after_clause(field, direction, value):
+    # Missing and null values sort lowest, so they come last in a descending scan.
+    if direction < 0:
+        if value is None:
+            return None
+        return {"$or": [{field: {"$lt": value}}, {field: None}]}
+    if value is None:
+        return {field: {"$ne": None}}
+    return {field: {"$gt": value}}
+
+
+def keyset_filter(sort, values):
+    branches = []
+    for i, (field, direction) in enumerate(sort):
+        after = after_clause(field, direction, values[i])
+        if after is None:
+            continue
+        equal = [{f: v} for (f, _), v in zip(sort[:i], values[:i])]
+        branches.append({"$and": equal + [after]} if equal else after)
+    if not branches:
+        return {"_id": {"$exists": False}}
+    return {"$or": branches}
+
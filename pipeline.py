@@ -0,0 +1,163 @@
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+STOP = object()
+
+
+class StageStats:
+    def __init__(self, name):
+        self.name = name
+        self.lock = threading.Lock()
+        self.processed = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self.blocked_seconds = 0.0
+
+    def record(self, busy, ok=True):
+        with self.lock:
+            self.busy_seconds += busy
+            if ok:
+                self.processed += 1
+            else:
+                self.errors += 1
+
+    def blocked(self, seconds):
+        with self.lock:
+            self.blocked_seconds += seconds
+
+    def snapshot(self, elapsed):
+        with self.lock:
+            return {
+                "processed": self.processed, "errors": self.errors,
+                "per_second": round(self.processed / elapsed, 2) if elapsed else 0.0,
+                "busy_seconds": round(self.busy_seconds, 2),
+                # Time spent waiting on a full downstream queue: the stage after
+                # this one is the bottleneck.
+                "blocked_seconds": round(self.blocked_seconds, 2)
+            }
+
+
+class Pipeline:
+    def __init__(self, name, fetch, parse, write, fetch_workers=4, parse_workers=2,
+                 queue_size=64, parse_in_processes=False):
+        self.name = name
+        self.fetch = fetch
+        self.parse = parse
+        self.write = write
+        self.fetch_workers = fetch_workers
+        self.parse_workers = parse_workers
+        self.parse_in_processes = parse_in_processes
+        self.fetch_queue = queue.Queue(maxsize=queue_size)
+        self.parse_queue = queue.Queue(maxsize=queue_size)
+        self.write_queue = queue.Queue(maxsize=queue_size)
+        self.stats = {stage: StageStats(stage) for stage in ("fetch", "parse", "write")}
+        self.stop_event = threading.Event()
+
+    def put(self, target, item, stats):
+        started = time.perf_counter()
+        target.put(item)
+        stats.blocked(time.perf_counter() - started)
+
+    def feed(self, items):
+        try:
+            for item in items:
+                if self.stop_event.is_set():
+                    break
+                self.fetch_queue.put(item)
+        except Exception as e:
+            logger.error(f"{self.name}: reading items failed: {e}")
+        finally:
+            # Without the sentinels the fetchers never exit and run() hangs.
+            for _ in range(self.fetch_workers):
+                self.fetch_queue.put(STOP)
+
+    def fetch_worker(self):
+        stats = self.stats["fetch"]
+        while (item := self.fetch_queue.get()) is not STOP:
+            if self.stop_event.is_set():
+                continue
+            started = time.perf_counter()
+            try:
+                raw = self.fetch(item)
+            except Exception as e:
+                if str(e) == "Rate Limit Exceeded":
+                    self.stop_event.set()
+                logger.error(f"{self.name}: fetch failed for {item}: {e}")
+                raw = None
+            stats.record(time.perf_counter() - started, ok=raw is not None)
+            self.put(self.parse_queue, (item, raw), stats)
+
+    def parse_worker(self, pool):
+        stats = self.stats["parse"]
+        while (entry := self.parse_queue.get()) is not STOP:
+            item, raw = entry
+            doc = None
+            if raw is not None:
+                started = time.perf_counter()
+                try:
+                    if pool:
+                        doc = pool.submit(self.parse, item, raw).result()
+                    else:
+                        doc = self.parse(item, raw)
+                except Exception as e:
+                    logger.error(f"{self.name}: parse failed for {item}: {e}")
+                stats.record(time.perf_counter() - started, ok=doc is not None)
+            self.put(self.write_queue, (item, doc), stats)
+
+    def write_worker(self):
+        stats = self.stats["write"]
+        while (entry := self.write_queue.get()) is not STOP:
+            item, doc = entry
+            started = time.perf_counter()
+            try:
+                ok = self.write(item, doc)
+            except Exception as e:
+                logger.error(f"{self.name}: write failed for {item}: {e}")
+                ok = False
+            stats.record(time.perf_counter() - started, ok=bool(ok))
+
+    def run(self, items):
+        started = time.perf_counter()
+        pool = ProcessPoolExecutor(self.parse_workers) if self.parse_in_processes else None
+        try:
+            feeder = threading.Thread(target=self.feed, args=(items,), daemon=True)
+            fetchers = [threading.Thread(target=self.fetch_worker, daemon=True)
+                        for _ in range(self.fetch_workers)]
+            parsers = [threading.Thread(target=self.parse_worker, args=(pool,), daemon=True)
+                       for _ in range(self.parse_workers)]
+            writer = threading.Thread(target=self.write_worker, daemon=True)
+            for thread in [feeder, *fetchers, *parsers, writer]:
+                thread.start()
+
+            feeder.join()
+            for thread in fetchers:
+                thread.join()
+            for _ in parsers:
+                self.parse_queue.put(STOP)
+            for thread in parsers:
+                thread.join()
+            self.write_queue.put(STOP)
+            writer.join()
+        finally:
+            if pool:
+                pool.shutdown()
+
+        elapsed = time.perf_counter() - started
+        summary = {stage: stats.snapshot(elapsed) for stage, stats in self.stats.items()}
+        logger.info(f"{self.name} pipeline finished in {elapsed:.1f}s: {summary}")
+        return summary
+
+
+def pipeline_from_env(name, fetch, parse, write, parse_in_processes=False, fetch_workers=None):
+    return Pipeline(
+        name, fetch, parse, write,
+        fetch_workers=fetch_workers or int(os.getenv("PIPELINE_FETCH_WORKERS", 4)),
+        parse_workers=int(os.getenv("PIPELINE_PARSE_WORKERS", 2)),
+        queue_size=int(os.getenv("PIPELINE_QUEUE_SIZE", 64)),
+        parse_in_processes=parse_in_processes)
@@ -0,0 +1,185 @@
+import asyncio
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class RetryError(Exception):
+    def __init__(self, message, last_response=None, last_error=None):
+        super().__init__(message)
+        self.last_response = last_response
+        self.last_error = last_error
+
+
+def parse_retry_after(value, now=None):
+    if value is None:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(when.timestamp() - (now if now is not None else time.time()), 0.0)
+
+
+class Backoff:
+    # Decorrelated jitter: each delay is drawn from [base, previous * 3], capped.
+    def __init__(self, base, cap):
+        self.base = base
+        self.cap = cap
+        self.previous = base
+
+    def next(self):
+        self.previous = min(self.cap, random.uniform(self.base, self.previous * 3))
+        return self.previous
+
+    def reset(self):
+        self.previous = self.base
+
+
+class ResilienceMetrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {
+            "attempts": 0, "successes": 0, "retries": 0, "failures": 0,
+            "short_circuits": 0, "breaker_opens": 0, "sleep_seconds": 0.0
+        }
+
+    def incr(self, name, amount=1):
+        with self.lock:
+            self.counters[name] += amount
+
+    def snapshot(self):
+        with self.lock:
+            return dict(self.counters)
+
+
+class CircuitBreaker:
+    # Counts failed logical calls, not attempts: retry_async reports once per
+    # call after its retries are spent.
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, metrics=None):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.metrics = metrics
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self.lock:
+            if self.opened_at is None:
+                return "closed"
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                return "half_open"
+            return "open"
+
+    def before_call(self):
+        with self.lock:
+            if self.opened_at is None:
+                return
+            remaining = self.reset_timeout - (time.monotonic() - self.opened_at)
+            if remaining <= 0 and not self.probing:
+                # Half-open: exactly one caller gets through to probe.
+                self.probing = True
+                return
+        if self.metrics:
+            self.metrics.incr("short_circuits")
+        if remaining > 0:
+            raise CircuitOpenError(f"Circuit open, retry in {remaining:.1f}s")
+        raise CircuitOpenError("Circuit half-open, probe already in flight")
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            # A failed half-open probe re-opens the breaker straight away.
+            if self.failures >= self.failure_threshold or self.opened_at is not None:
+                if self.metrics:
+                    self.metrics.incr("breaker_opens")
+                self.opened_at = time.monotonic()
+            self.probing = False
+
+    def release(self):
+        # A probe that was cancelled proved nothing either way.
+        with self.lock:
+            self.probing = False
+
+
+class RetryPolicy:
+    def __init__(self, max_attempts=5, deadline=60.0, base=0.5, cap=20.0,
+                 retry_statuses=RETRY_STATUSES, exceptions=(Exception,)):
+        self.max_attempts = max_attempts
+        self.deadline = deadline
+        self.base = base
+        self.cap = cap
+        self.retry_statuses = retry_statuses
+        self.exceptions = exceptions
+
+
+async def retry_async(send, policy, breaker=None, metrics=None):
+    metrics = metrics or ResilienceMetrics()
+    deadline = time.monotonic() + policy.deadline
+    backoff = Backoff(policy.base, policy.cap)
+    response = error = None
+
+    if breaker:
+        breaker.before_call()
+    try:
+        for attempt in range(1, policy.max_attempts + 1):
+            metrics.incr("attempts")
+            response = error = None
+            try:
+                response = await asyncio.wait_for(send(), max(deadline - time.monotonic(), 0))
+            except asyncio.TimeoutError as e:
+                error = e
+            except policy.exceptions as e:
+                error = e
+
+            if response is not None and response.status_code not in policy.retry_statuses:
+                if breaker:
+                    breaker.record_success()
+                metrics.incr("successes")
+                return response
+
+            delay = backoff.next()
+            if response is not None:
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                if retry_after is not None:
+                    delay = retry_after
+
+            if attempt == policy.max_attempts or delay > deadline - time.monotonic():
+                break
+            # Other calls may have opened the breaker while this one was retrying.
+            if breaker and breaker.state == "open":
+                break
+            metrics.incr("retries")
+            metrics.incr("sleep_seconds", delay)
+            await asyncio.sleep(delay)
+    except asyncio.CancelledError:
+        # Cancelled mid-request or mid-backoff: a probe frees its slot.
+        if breaker:
+            breaker.release()
+        raise
+
+    if breaker:
+        breaker.record_failure()
+    metrics.incr("failures")
+    status = response.status_code if response is not None else type(error).__name__
+    raise RetryError(f"Gave up after {attempt} attempts ({status})",
+                     last_response=response, last_error=error)
@@ -0,0 +1,119 @@
+from datetime import datetime, timezone
+from pymongo import DESCENDING, ASCENDING, UpdateOne
+from geo import GEO_FIELDS, normalize_location
+
+SKILL_ROLLUP = "skill_rollup"
+GEO_ROLLUP = "geo_rollup"
+GEO_ROLLUP_KEY = GEO_FIELDS + ("raw", "platform")
+
+
+def skill_rollup_pipeline():
+    return [
+        {"$unwind": "$skill_keys"},
+        {"$group": {"_id": "$skill_keys", "count": {"$sum": 1}}}
+    ]
+
+
+def geo_rollup_pipeline():
+    return [
+        {"$group": {
+            "_id": {
+                "city": {"$ifNull": ["$geo.city", ""]},
+                "region": {"$ifNull": ["$geo.region", ""]},
+                "country": {"$ifNull": ["$geo.country", ""]},
+                "raw": {"$ifNull": ["$geo.raw", ""]},
+                "platform": "$source_platform"
+            },
+            "count": {"$sum": 1},
+            "reputation_sum": {"$sum": "$metrics.reputation_score"},
+            "reputation_count": {"$sum": {
+                "$cond": [{"$isNumber": "$metrics.reputation_score"}, 1, 0]}}
+        }},
+        {"$addFields": {field: f"$_id.{field}" for field in GEO_ROLLUP_KEY}}
+    ]
+
+
+def create_rollup_indexes(db):
+    db[SKILL_ROLLUP].create_index([("count", DESCENDING)])
+    if "location_1_platform_1" in db[GEO_ROLLUP].index_information():
+        db[GEO_ROLLUP].drop_index("location_1_platform_1")
+    for field in GEO_FIELDS + ("raw",):
+        db[GEO_ROLLUP].create_index([(field, ASCENDING)])
+
+
+def geo_rollup_id(doc):
+    geo = doc.get("geo") or normalize_location(
+        doc.get("basics", {}).get("location"))
+    values = dict(geo, platform=doc["source_platform"])
+    return tuple(values.get(field) or "" for field in GEO_ROLLUP_KEY)
+
+
+def apply_profile_rollups(db, docs, sign=1):
+    # sign=-1 takes documents back out, e.g. the old version of a refreshed profile.
+    skill_counts = {}
+    geo = {}
+    for doc in docs:
+        for key in doc.get("skill_keys", []):
+            skill_counts[key] = skill_counts.get(key, 0) + sign
+
+        row = geo.setdefault(
+            geo_rollup_id(doc), {"count": 0, "reputation_sum": 0, "reputation_count": 0})
+        row["count"] += sign
+        reputation = doc.get("metrics", {}).get("reputation_score")
+        if isinstance(reputation, (int, float)) and not isinstance(reputation, bool):
+            row["reputation_sum"] += sign * reputation
+            row["reputation_count"] += sign
+
+    if skill_counts:
+        db[SKILL_ROLLUP].bulk_write([
+            UpdateOne({"_id": key}, {"$inc": {"count": n}}, upsert=True)
+            for key, n in skill_counts.items()
+        ], ordered=False)
+    if geo:
+        ops = []
+        for row_id, row in geo.items():
+            key = dict(zip(GEO_ROLLUP_KEY, row_id))
+            ops.append(UpdateOne({"_id": key}, {"$inc": row, "$setOnInsert": key},
+                                 upsert=True))
+        db[GEO_ROLLUP].bulk_write(ops, ordered=False)
+
+
+def refresh_rollups(db):
+    refreshed_at = datetime.now(timezone.utc)
+    for name, pipeline in [(SKILL_ROLLUP, skill_rollup_pipeline()), (GEO_ROLLUP, geo_rollup_pipeline())]:
+        db.profiles.aggregate(pipeline + [
+            {"$addFields": {"refreshed_at": refreshed_at}},
+            {"$merge": {"into": name, "whenMatched": "replace",
+                        "whenNotMatched": "insert"}}
+        ])
+        db[name].delete_many({"$or": [
+            {"refreshed_at": {"$lt": refreshed_at}},
+            {"refreshed_at": {"$exists": False}}
+        ]})
+
+
+def row_key(value):
+    if isinstance(value, dict):
+        return tuple(sorted(value.items()))
+    return value
+
+
+def compare_rollup(db, name, pipeline, fields):
+    expected = {row_key(row["_id"]): row for row in db.profiles.aggregate(pipeline)}
+    actual = {row_key(row["_id"]): row for row in db[name].find()}
+    mismatches = []
+    for key in sorted(set(expected) | set(actual)):
+        want, have = expected.get(key, {}), actual.get(key, {})
+        for field in fields:
+            if want.get(field, 0) != have.get(field, 0):
+                mismatches.append({"_id": (want or have)["_id"], "field": field,
+                                   "expected": want.get(field, 0), "actual": have.get(field, 0)})
+    return {"rows": len(expected), "mismatches": mismatches, "consistent": not mismatches}
+
+
+def check_rollups(db):
+    return {
+        "skills": compare_rollup(db, SKILL_ROLLUP, skill_rollup_pipeline(), ["count"]),
+        "geo": compare_rollup(db, GEO_ROLLUP, geo_rollup_pipeline(),
+                              ["count", "reputation_sum", "reputation_count"])
+    }
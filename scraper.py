@@ -1,15 +1,26 @@
 import requests
+import re
+from requests.adapters import HTTPAdapter
 import time
 import json
 import random
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from bs4 import BeautifulSoup
-from db_manager import DBManager
-from pymongo.errors import DuplicateKeyError
+from itertools import islice
+from pymongo.errors import BulkWriteError, PyMongoError
 import logging
 import os
-import re
-from pymongo import ASCENDING
+import threading
+from datetime import datetime, timedelta, timezone
+from pymongo import ASCENDING, UpdateOne
+from skills import extract_skills, skill_keys
+from rollups import apply_profile_rollups, refresh_rollups
+from geo import normalize_location
+from cache import bump_version
+from archive import archive_from_env, iter_records
+from frontier import CrawlState
+from html_extract import link_hrefs, meta_property, script_json_ld
+from pipeline import pipeline_from_env
+from resilience import Backoff, ResilienceMetrics, parse_retry_after
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -22,13 +33,54 @@ USER_AGENTS = [
     'Mozilla/5.0 (iPhone; CPU iPhone OS 17_1 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.1 Mobile/15E148 Safari/604.1'
 ]
 
-TECH_KEYWORDS = [
-    "Python", "JavaScript", "TypeScript", "React", "Node.js", "Go", "Rust", "C++", "Java", "Kotlin",
-    "Machine Learning", "AI", "Deep Learning", "TensorFlow", "PyTorch", "AWS", "Azure", "GCP",
-    "Docker", "Kubernetes", "SQL", "NoSQL", "MongoDB", "PostgreSQL", "Solidity", "Blockchain",
-    "Data Science", "DevOps", "Cybersecurity", "Terraform", "Ansible", "Vue", "Angular", "Swift"
+GITHUB_TOPICS = [
+    'python', 'javascript', 'machine-learning', 'react', 'go', 'rust',
+    'data-science', 'devops', 'web3', 'cybersecurity', 'android', 'ios'
 ]
 
+ORCID_KEYWORDS = ["Machine Learning", "Quantum",
+                  "Bioinformatics", "Climate", "Cryptography"]
+
+REFRESH_FIELDS = ("basics", "metrics", "skills", "skill_keys", "geo")
+
+SO_USER_FIELDS = ["user.user_id", "user.display_name", "user.location",
+                  "user.website_url", "user.reputation", "user.view_count"]
+SE_WRAPPER_FIELDS = [".items", ".has_more", ".quota_remaining", ".backoff",
+                     ".error_id", ".error_name", ".error_message"]
+SE_MAX_IDS = 100
+
+
+def fetch_meta(response, url, previous=None):
+    previous = previous or {}
+    return {
+        "url": url,
+        "etag": response.headers.get("ETag") or previous.get("etag"),
+        "last_modified": response.headers.get("Last-Modified") or previous.get("last_modified"),
+        "last_fetched_at": datetime.now(timezone.utc)
+    }
+
+
+def conditional_headers(meta):
+    headers = {}
+    if meta and meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if meta and meta.get("last_modified"):
+        headers["If-Modified-Since"] = meta["last_modified"]
+    return headers
+
+
+def changed_fields(old, new, fields=REFRESH_FIELDS):
+    changes = {}
+    for field in fields:
+        before, after = old.get(field), new.get(field)
+        if isinstance(before, dict) and isinstance(after, dict):
+            for key, value in after.items():
+                if before.get(key) != value:
+                    changes[f"{field}.{key}"] = value
+        elif before != after:
+            changes[field] = after
+    return changes
+
 
 class Normalizer:
     @staticmethod
@@ -48,22 +100,92 @@ class Normalizer:
 
     @staticmethod
     def extract_skills(text):
-        if not text:
-            return []
-        found = []
-        for kw in TECH_KEYWORDS:
-            if re.search(rf'\b{re.escape(kw)}\b', text, re.IGNORECASE):
-                found.append(kw)
-        return list(set(found))
+        return extract_skills(text)
+
+
+def orcid_profile(orcid_id, raw):
+    person = raw.get('person', {})
+    name = person.get('name', {})
+    full_name = f"{name.get('given-names', {}).get('value', '')} {name.get('family-name', {}).get('value', '')}".strip()
+    activities = raw.get('activities-summary', {})
+    bio_text = person.get('biography', {}).get('content', '')
+    skills = Normalizer.extract_skills(bio_text)
+
+    return {
+        "source_platform": "ORCID",
+        "source_id": orcid_id,
+        "basics": {
+            "name": full_name, "headline": "Researcher", "location": "",
+            "current_affiliation": "", "website": f"https://orcid.org/{orcid_id}",
+            "email": f"{orcid_id}@no-email.orcid.org"
+        },
+        "metrics": {
+            "publication_count": len(activities.get('works', {}).get('group', [])),
+            "followers": -1, "following": -1, "reputation_score": -1
+        },
+        "skills": skills, "skill_keys": skill_keys(skills),
+        "affiliations": [], "publications": []
+    }
+
+
+def kaggle_profile(username, html):
+    json_ld = script_json_ld(html)
+    data = json.loads(json_ld) if json_ld else {}
+    desc = data.get('description', "")
+    skills = Normalizer.extract_skills(desc)
+
+    return {
+        "source_platform": "Kaggle", "source_id": username,
+        "basics": {
+            "name": data.get('name', username), "headline": desc, "location": "",
+            "current_affiliation": "", "website": f"https://www.kaggle.com/{username}",
+            "email": f"{username}@no-email.kaggle.com"
+        },
+        "metrics": {
+            "tier": "Contributor", "followers": -1, "following": -1, "reputation_score": -1
+        },
+        "skills": skills, "skill_keys": skill_keys(skills),
+        "affiliations": [], "publications": []
+    }
 
 
 class BaseScraper:
+    SOURCE_PLATFORM = None
+
     def __init__(self, db_collection):
         self.collection = db_collection
+        self.state = CrawlState(db_collection.database, self.SOURCE_PLATFORM)
         self.session = requests.Session()
         self.consecutive_429 = 0
+        # Scrapers share the backoff and Retry-After pieces of the resilience
+        # layer but not retry_async: their retries are the callers' own loops,
+        # which also advance checkpoints and honour stop_event. Worker threads
+        # share this state, hence the lock.
+        self.backoff = Backoff(base=60, cap=600)
+        self.rate_limit_lock = threading.Lock()
+        self.metrics = ResilienceMetrics()
+        self.stop_event = threading.Event()
+        self.request_count = 0
+        self.count_lock = threading.Lock()
+        self.session.hooks["response"].append(self.count_request)
         self.consecutive_duplicates = 0
         self.MAX_DUPLICATES_BEFORE_STOP = 50
+        self.WRITE_BATCH_SIZE = 100
+        self.write_buffer = []
+        self.write_lock = threading.RLock()
+        self.inserted_count = 0
+        self.matched_count = 0
+        self.failed_count = 0
+        self.refresh_buffer = []
+        self.archive = archive_from_env()
+        # Replay re-normalizes stored profiles, so it overwrites instead of
+        # only inserting.
+        self.overwrite = False
+        self.refresh_counts = {"not_modified": 0, "changed": 0, "unchanged": 0, "failed": 0}
+
+    def count_request(self, response, *args, **kwargs):
+        with self.count_lock:
+            self.request_count += 1
 
     def get_headers(self, referer=None):
         headers = {
@@ -75,95 +197,501 @@ class BaseScraper:
             headers['Referer'] = referer
         return headers
 
-    def handle_rate_limit(self, response):
-        if response.status_code == 403 or response.status_code == 429:
-            self.consecutive_429 += 1
-            if self.consecutive_429 > 3:
-                logger.critical(
-                    f"Too many Rate Limits ({self.consecutive_429}). Aborting this scraper to protect IP.")
-                raise Exception("Rate Limit Exceeded")
-
-            wait_time = random.randint(60, 120) * self.consecutive_429
-            logger.warning(
-                f"Rate limited (Status {response.status_code}). Sleeping for {wait_time}s...")
-            time.sleep(wait_time)
-            return True
+    def rate_limit_wait(self, response):
+        with self.rate_limit_lock:
+            if response.status_code == 403 or response.status_code == 429:
+                self.consecutive_429 += 1
+                if self.consecutive_429 > 3:
+                    logger.critical(
+                        f"Too many Rate Limits ({self.consecutive_429}). Aborting this scraper to protect IP.")
+                    self.metrics.incr("failures")
+                    raise Exception("Rate Limit Exceeded")
+
+                wait_time = parse_retry_after(response.headers.get('Retry-After'))
+                if wait_time is None:
+                    wait_time = self.backoff.next()
+                self.metrics.incr("retries")
+                self.metrics.incr("sleep_seconds", wait_time)
+                logger.warning(
+                    f"Rate limited (Status {response.status_code}). Sleeping for {wait_time:.0f}s...")
+                return wait_time
+
+            self.consecutive_429 = 0
+            self.backoff.reset()
+            return None
 
-        self.consecutive_429 = 0
-        return False
+    def handle_rate_limit(self, response):
+        wait_time = self.rate_limit_wait(response)
+        if wait_time is None:
+            return False
+        # Interruptible so a shutdown doesn't wait out a multi-minute backoff.
+        self.stop_event.wait(wait_time)
+        return True
 
     def check_duplicate_stop(self):
+        if self.stop_event.is_set():
+            return True
         if self.consecutive_duplicates >= self.MAX_DUPLICATES_BEFORE_STOP:
             logger.info(
                 f"Hit {self.consecutive_duplicates} duplicates in a row. Assuming data is up to date. Stopping.")
             return True
         return False
 
+    @staticmethod
+    def advance(walk, outcome=None):
+        # Steps a checkpointed crawl such as ORCIDScraper.keyword_searches:
+        # sends back the outcome of the last step and returns the next one,
+        # or None once the crawl has finished or stopped.
+        try:
+            return walk.send(outcome)
+        except StopIteration:
+            return None
+
+    def known_source_ids(self, source_ids):
+        return {doc["source_id"] for doc in self.collection.find(
+            {"source_platform": self.SOURCE_PLATFORM, "source_id": {"$in": list(source_ids)}},
+            {"source_id": 1})}
+
+    def claim_new(self, candidates):
+        # candidates maps frontier key -> source_id; profiles we already hold and
+        # keys already in the frontier are dropped before anything is fetched.
+        known = self.known_source_ids(candidates.values())
+        return self.state.claim([k for k, sid in candidates.items() if sid not in known])
+
+    def archive_raw(self, source_id, payload, **extra):
+        if self.archive is not None:
+            self.archive.record(self.SOURCE_PLATFORM, source_id, payload, **extra)
+
+    def write_profile(self, key, doc):
+        # Pipeline writer: the only place that touches Mongo for the scraped
+        # profile and its frontier entry.
+        ok = doc is not None and self.save_to_db(doc)
+        self.state.finish(key, ok)
+        return ok
+
+    def save_to_db(self, doc):
+        doc.setdefault("geo", normalize_location(doc["basics"].get("location")))
+        with self.write_lock:
+            self.write_buffer.append(doc)
+            if len(self.write_buffer) >= self.WRITE_BATCH_SIZE:
+                self.flush()
+        return True
+
+    def flush(self):
+        with self.write_lock:
+            if not self.write_buffer:
+                return 0, 0
+            docs, self.write_buffer = self.write_buffer, []
+            now = datetime.now(timezone.utc)
+            ops = [
+                UpdateOne(
+                    {'source_platform': doc['source_platform'],
+                        'source_id': doc['source_id']},
+                    {'$set': dict(doc, last_seen_at=now)} if self.overwrite else
+                    {'$setOnInsert': doc, '$set': {'last_seen_at': now}}, upsert=True
+                )
+                for doc in docs
+            ]
+            upserted = set()
+            rejected = set()
+            try:
+                upserted = set(self.collection.bulk_write(
+                    ops, ordered=False).upserted_ids)
+            except BulkWriteError as e:
+                upserted = {u['index'] for u in e.details.get('upserted', [])}
+                # A duplicate key means a concurrent writer upserted the same
+                # profile first; anything else never reached the collection.
+                errors = [err for err in e.details.get('writeErrors', []) if err.get('code') != 11000]
+                rejected = {err['index'] for err in errors}
+                for err in errors[:3]:
+                    logger.warning(f"Bulk write rejected profile: {err.get('errmsg')}")
+                if errors:
+                    logger.warning(f"Bulk write rejected {len(errors)} of {len(docs)} profiles.")
+            except PyMongoError as e:
+                rejected = set(range(len(docs)))
+                logger.error(f"Bulk write of {len(docs)} profiles failed: {e}")
+
+            if upserted:
+                try:
+                    apply_profile_rollups(self.collection.database,
+                                          [doc for i, doc in enumerate(docs) if i in upserted])
+                    bump_version(self.collection.database,
+                                 self.collection.name)
+                except PyMongoError as e:
+                    logger.warning(
+                        f"Rollup update failed, run refresh_rollups: {e}")
+
+            inserted = matched = 0
+            for i, doc in enumerate(docs):
+                if i in rejected:
+                    continue
+                if i in upserted:
+                    inserted += 1
+                    self.consecutive_duplicates = 0
+                    print(
+                        f"[NEW]        Saved {doc['source_platform']}: {doc['basics']['name']}")
+                else:
+                    matched += 1
+                    self.consecutive_duplicates += 1
+                    print(
+                        f"[DUPLICATED] Skipping {doc['source_platform']}: {doc['basics']['name']}")
+            self.inserted_count += inserted
+            self.matched_count += matched
+            self.failed_count += len(rejected)
+            return inserted, matched
+
+    def stale_profiles(self, max_age_hours=24, limit=None):
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=max_age_hours)
+        cursor = self.collection.find(
+            {"source_platform": self.SOURCE_PLATFORM, "$or": [
+                {"fetch_meta.last_fetched_at": {"$lt": cutoff}},
+                {"fetch_meta.last_fetched_at": {"$exists": False}}
+            ], "fetch_meta.gone": {"$ne": True}},
+            {"source_platform": 1, "source_id": 1, "fetch_meta": 1,
+             **{field: 1 for field in REFRESH_FIELDS}}
+        ).sort("fetch_meta.last_fetched_at", ASCENDING)
+        return cursor.limit(limit) if limit else cursor
+
+    def queue_refresh(self, old, meta, new=None, failed=False):
+        # A failed fetch only stamps fetch_meta, so the profile goes to the
+        # back of the stale queue instead of being retried first every run.
+        changes = {}
+        if new is not None:
+            new.setdefault("geo", normalize_location(new["basics"].get("location")))
+            changes = changed_fields(old, new)
+        if failed:
+            outcome = "failed"
+        else:
+            outcome = "not_modified" if new is None else "changed" if changes else "unchanged"
+        with self.write_lock:
+            self.refresh_counts[outcome] += 1
+            self.refresh_buffer.append((old, meta, new if changes else None, changes, outcome))
+            if len(self.refresh_buffer) >= self.WRITE_BATCH_SIZE:
+                self.flush_refreshes()
+
+    def flush_refreshes(self):
+        with self.write_lock:
+            if not self.refresh_buffer:
+                return 0
+            pending, self.refresh_buffer = self.refresh_buffer, []
+            now = datetime.now(timezone.utc)
+            ops = []
+            for old, meta, _, changes, outcome in pending:
+                fields = dict(changes, fetch_meta=meta)
+                if outcome != "failed":
+                    fields["last_seen_at"] = now
+                ops.append(UpdateOne({'_id': old['_id']}, {'$set': fields}))
+            rejected = set()
+            try:
+                self.collection.bulk_write(ops, ordered=False)
+            except BulkWriteError as e:
+                # Unordered: everything but the reported ops was applied,
+                # e.g. one refreshed email colliding with another profile's.
+                errors = e.details.get('writeErrors', [])
+                rejected = {err['index'] for err in errors}
+                for err in errors[:3]:
+                    logger.warning(f"Refresh write rejected profile: {err.get('errmsg')}")
+                logger.warning(f"Refresh write rejected {len(rejected)} of {len(ops)} profiles.")
+            except PyMongoError as e:
+                rejected = set(range(len(ops)))
+                logger.error(f"Refresh write of {len(ops)} profiles failed: {e}")
+            for i in rejected:
+                self.refresh_counts[pending[i][4]] -= 1
+                self.refresh_counts["failed"] += 1
+
+            changed = [(old, new) for i, (old, _, new, _, _) in enumerate(pending)
+                       if new is not None and i not in rejected]
+            if changed:
+                try:
+                    db = self.collection.database
+                    apply_profile_rollups(db, [old for old, _ in changed], sign=-1)
+                    apply_profile_rollups(
+                        db, [dict(new, source_platform=old['source_platform']) for old, new in changed])
+                    bump_version(db, self.collection.name)
+                except PyMongoError as e:
+                    logger.warning(
+                        f"Rollup update failed, run refresh_rollups: {e}")
+            for old, new in changed:
+                print(f"[UPDATED]    Refreshed {old['source_platform']}: {new['basics']['name']}")
+            return len(changed)
+
+
+class GitHubRateLimiter:
+    def __init__(self, reserve=5, fallback_wait=60):
+        self.reserve = reserve
+        self.fallback_wait = fallback_wait
+        self.remaining = None
+        self.reset_at = 0.0
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def try_acquire(self):
+        with self.lock:
+            now = time.time()
+            if self.remaining is not None and self.remaining <= self.reserve and now >= self.reset_at:
+                self.remaining = None
+            if now < self.blocked_until:
+                return self.blocked_until - now
+            if self.remaining is None or self.remaining > self.reserve:
+                if self.remaining is not None:
+                    self.remaining -= 1
+                return 0
+            return self.reset_at - now
+
+    def refund(self, response=None):
+        # Conditional requests answered with 304 don't count against the quota.
+        # update() may already have adopted the server's count, which leaves
+        # the request out, so never credit past it.
+        remaining = response.headers.get('X-RateLimit-Remaining') if response is not None else None
+        with self.lock:
+            if self.remaining is not None:
+                self.remaining += 1
+                if remaining is not None:
+                    self.remaining = min(self.remaining, int(remaining))
+
+    def acquire(self, stop_event=None):
+        stop_event = stop_event or threading.Event()
+        while True:
+            wait = self.try_acquire()
+            if wait <= 0:
+                return True
+            logger.warning(
+                f"GitHub quota exhausted. Waiting {wait:.0f}s before the next request...")
+            if stop_event.wait(min(wait, 60)):
+                return False
+
+    def update(self, response):
+        remaining = response.headers.get('X-RateLimit-Remaining')
+        reset = response.headers.get('X-RateLimit-Reset')
+        retry_after = parse_retry_after(response.headers.get('Retry-After'))
+        with self.lock:
+            if remaining is not None and reset is not None:
+                reset_at = float(reset)
+                if reset_at > self.reset_at or self.remaining is None:
+                    self.remaining = int(remaining)
+                else:
+                    self.remaining = min(self.remaining, int(remaining))
+                self.reset_at = max(self.reset_at, reset_at)
+            if response.status_code in (403, 429):
+                if retry_after is not None:
+                    self.blocked_until = max(
+                        self.blocked_until, time.time() + retry_after)
+                elif remaining != '0':
+                    self.blocked_until = max(
+                        self.blocked_until, time.time() + self.fallback_wait)
+
+
+class StackExchangePacer:
+    def __init__(self, min_interval=0.1, quota_reserve=10):
+        self.min_interval = min_interval
+        self.quota_reserve = quota_reserve
+        self.quota_remaining = None
+        self.next_request_at = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self, stop_event):
+        with self.lock:
+            delay = self.next_request_at - time.monotonic()
+        return delay <= 0 or not stop_event.wait(delay)
+
+    def update(self, body):
+        # The API asks callers to honour `backoff` before hitting the same
+        # method again; quota_remaining is the daily budget for this IP/key.
+        backoff = body.get("backoff") or 0
+        if backoff:
+            logger.info(f"StackExchange asked for a {backoff}s backoff.")
+        with self.lock:
+            if body.get("quota_remaining") is not None:
+                self.quota_remaining = body["quota_remaining"]
+            self.next_request_at = time.monotonic() + max(self.min_interval, backoff)
+
+    def block(self, seconds):
+        with self.lock:
+            self.next_request_at = max(self.next_request_at, time.monotonic() + seconds)
+
+    def exhausted(self):
+        with self.lock:
+            return self.quota_remaining is not None and self.quota_remaining <= self.quota_reserve
+
 
 class GitHubScraper(BaseScraper):
-    def __init__(self, db_collection):
+    SOURCE_PLATFORM = "GitHub"
+
+    def __init__(self, db_collection, rate_limiter=None):
         super().__init__(db_collection)
         self.token = os.getenv("SCRAPE_GITHUB_TOKEN")
+        self.MAX_WORKERS = int(os.getenv("GITHUB_FETCH_WORKERS", 8))
+        self.MAX_FETCH_ATTEMPTS = 3
+        self.rate_limiter = rate_limiter or GitHubRateLimiter()
+        adapter = HTTPAdapter(
+            pool_connections=self.MAX_WORKERS, pool_maxsize=self.MAX_WORKERS)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def api_headers(self, referer):
+        headers = self.get_headers(referer=referer)
+        if self.token:
+            headers['Authorization'] = f'token {self.token}'
+        return headers
 
     def discover_active_users(self, target=5000):
-        topics = [
-            'python', 'javascript', 'machine-learning', 'react', 'go', 'rust',
-            'data-science', 'devops', 'web3', 'cybersecurity', 'android', 'ios'
-        ]
-        total_saved = 0
-
-        for topic in topics:
-            if total_saved >= target:
-                break
-            if self.check_duplicate_stop():
-                break
+        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as pool:
+            self.fetch_owner_urls(pool, self.state.pending(max(0, target)))
+            self.flush()
+            searches = self.topic_searches(target)
+            topic = self.advance(searches)
+            while topic is not None:
+                topic = self.advance(searches, self.search_topic(pool, topic, target))
+        self.flush()
+
+    def topic_searches(self, target):
+        # Yields the topics still to search, from the saved topic_index on.
+        # The caller sends back True once a topic's owners are fetched and
+        # flushed, False to skip it and None to stop the crawl.
+        start = self.state.load().get("topic_index", 0)
+        for i in range(start, len(GITHUB_TOPICS)):
+            if self.inserted_count >= target or self.check_duplicate_stop():
+                return
+            logger.info(f"GitHub: Searching topic: {GITHUB_TOPICS[i]}")
+            done = yield GITHUB_TOPICS[i]
+            if done is None:
+                return
+            if done:
+                self.state.save(topic_index=i + 1)
+        self.state.reset()
+
+    def topic_search_url(self, topic):
+        return f"https://api.github.com/search/repositories?q=topic:{topic}&sort=stars&order=desc"
+
+    def search_topic(self, pool, topic, target):
+        try:
+            resp = self.session.get(
+                self.topic_search_url(topic), headers=self.api_headers("https://github.com/search"))
+            if self.handle_rate_limit(resp) or resp.status_code != 200:
+                return False
+            self.fetch_owners(pool, resp.json().get('items', []), target)
+            self.flush()
+            return True
+        except Exception as e:
+            if str(e) == "Rate Limit Exceeded":
+                return None
+            logger.error(f"GitHub Search failed: {e}")
+            return False
 
-            logger.info(f"GitHub: Searching topic: {topic}")
-            search_url = f"https://api.github.com/search/repositories?q=topic:{topic}&sort=stars&order=desc"
+    def new_owner_urls(self, repos, target):
+        # Owners claimed beyond the target stay queued for the next run.
+        urls = self.claim_new(
+            {repo['owner']['url']: str(repo['owner']['id']) for repo in repos})
+        return urls[:max(0, target - self.inserted_count)]
 
-            headers = self.get_headers(referer="https://github.com/search")
-            if self.token:
-                headers['Authorization'] = f'token {self.token}'
+    def fetch_owners(self, pool, repos, target):
+        self.fetch_owner_urls(pool, self.new_owner_urls(repos, target))
 
+    def fetch_owner_urls(self, pool, urls):
+        futures = {pool.submit(self.fetch_user_detail, url): url for url in urls}
+        for future in as_completed(futures):
             try:
-                resp = self.session.get(search_url, headers=headers)
-                if self.handle_rate_limit(resp):
-                    continue
-
-                if resp.status_code == 200:
-                    repos = resp.json().get('items', [])
-                    for repo in repos:
-                        if self.check_duplicate_stop():
-                            break
-
-                        if self.fetch_user_detail(repo['owner']['url']):
-                            total_saved += 1
-                            self.consecutive_duplicates = 0
-                        else:
-                            self.consecutive_duplicates += 1
-
-                        if total_saved >= target:
-                            break
-                        time.sleep(random.uniform(1.0, 2.5))
+                ok = bool(future.result())
             except Exception as e:
-                if str(e) == "Rate Limit Exceeded":
-                    break
-                logger.error(f"GitHub Search failed: {e}")
+                logger.error(f"GitHub: fetching {futures[future]} failed: {e}")
+                ok = False
+            self.state.finish(futures[future], ok)
+            if self.check_duplicate_stop():
+                for f in futures:
+                    f.cancel()
+                break
 
     def fetch_user_detail(self, url):
-        headers = self.get_headers(referer="https://github.com/")
-        if self.token:
-            headers['Authorization'] = f'token {self.token}'
-        try:
-            resp = self.session.get(url, headers=headers)
+        headers = self.api_headers("https://github.com/")
+        for _ in range(self.MAX_FETCH_ATTEMPTS):
+            if not self.rate_limiter.acquire(self.stop_event):
+                return False
+            try:
+                resp = self.session.get(url, headers=headers, timeout=30)
+            except requests.RequestException:
+                return False
+            self.rate_limiter.update(resp)
             if resp.status_code == 200:
-                return self.normalize_and_save(resp.json())
-            self.handle_rate_limit(resp)
-        except Exception:
-            pass
+                return self.normalize_and_save(resp.json(), fetch_meta(resp, url))
+            if resp.status_code not in (403, 429):
+                return False
+            logger.warning(
+                f"GitHub rate limited (Status {resp.status_code}) on {url}. Retrying after reset.")
         return False
 
-    def normalize_and_save(self, raw):
+    def refresh_profiles(self, max_age_hours=24, limit=None):
+        stale = self.stale_profiles(max_age_hours, limit)
+        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as pool:
+            while not self.stop_event.is_set():
+                # Only a few rounds of work are queued at once, not the whole backlog.
+                batch = list(islice(stale, self.MAX_WORKERS * 4))
+                if not batch:
+                    break
+                futures = {pool.submit(self.refresh_profile, doc): doc for doc in batch}
+                for future in as_completed(futures):
+                    try:
+                        future.result()
+                    except Exception as e:
+                        logger.error(f"GitHub: refreshing {futures[future]['source_id']} failed: {e}")
+                        with self.write_lock:
+                            self.refresh_counts["failed"] += 1
+        self.flush_refreshes()
+        logger.info(f"GitHub refresh: {self.refresh_counts}")
+        return self.refresh_counts
+
+    def refresh_profile(self, doc):
+        meta = doc.get("fetch_meta") or {}
+        url = meta.get("url") or f"https://api.github.com/user/{doc['source_id']}"
+        headers = self.api_headers("https://github.com/")
+        headers.update(conditional_headers(meta))
+        for _ in range(self.MAX_FETCH_ATTEMPTS):
+            if not self.rate_limiter.acquire(self.stop_event):
+                break
+            try:
+                resp = self.session.get(url, headers=headers, timeout=30)
+            except requests.RequestException:
+                break
+            self.rate_limiter.update(resp)
+            if resp.status_code == 304:
+                self.rate_limiter.refund(resp)
+                self.queue_refresh(doc, fetch_meta(resp, url, meta))
+                return True
+            if resp.status_code == 200:
+                try:
+                    raw = resp.json()
+                except ValueError:
+                    raw = None
+                if isinstance(raw, dict):
+                    self.archive_raw(doc['source_id'], raw)
+                    self.queue_refresh(doc, fetch_meta(resp, url, meta), self.normalize(raw))
+                    return True
+                logger.warning(f"GitHub: unreadable profile body from {url}")
+                # Keep the old validators: a 304 against this body would
+                # never bring the profile back.
+                self.queue_refresh(doc, dict(meta, url=url, last_fetched_at=datetime.now(timezone.utc)),
+                                   failed=True)
+                return False
+            if resp.status_code in (404, 410):
+                # Deleted or suspended account: stop asking for it.
+                self.queue_refresh(doc, dict(fetch_meta(resp, url, meta), gone=True), failed=True)
+                return False
+            if resp.status_code not in (403, 429):
+                break
+        with self.write_lock:
+            self.refresh_counts["failed"] += 1
+        return False
+
+    def normalize_and_save(self, raw, meta=None):
+        self.archive_raw(str(raw.get("id")), raw)
+        norm = self.normalize(raw)
+        if meta:
+            norm["fetch_meta"] = meta
+        return self.save_to_db(norm)
+
+    def replay(self, record):
+        return self.normalize_and_save(record["payload"])
+
+    def normalize(self, raw):
         username = raw.get("login") or "unknown"
         email = Normalizer.clean_str(raw.get("email"))
         if "@" not in email:
@@ -189,32 +717,69 @@ class GitHubScraper(BaseScraper):
                 "contribution_count": Normalizer.clean_int(raw.get("public_repos")),
                 "reputation_score": -1
             },
-            "skills": skills, "affiliations": [], "publications": []
+            "skills": skills, "skill_keys": skill_keys(skills),
+            "affiliations": [], "publications": []
         }
-        return self.save_to_db(norm)
-
-    def save_to_db(self, doc):
-        try:
-            exists = self.collection.find_one(
-                {'source_platform': doc['source_platform'], 'source_id': doc['source_id']})
-            if exists:
-                print(f"[DUPLICATED] Skipping GitHub: {doc['basics']['name']}")
-                return False
-            self.collection.update_one(
-                {'source_platform': doc['source_platform'],
-                    'source_id': doc['source_id']},
-                {'$set': doc}, upsert=True
-            )
-            print(f"[NEW]        Saved GitHub: {doc['basics']['name']}")
-            return True
-        except Exception:
-            return False
+        return norm
 
 
 class StackOverflowScraper(BaseScraper):
+    SOURCE_PLATFORM = "StackOverflow"
+
     def __init__(self, db_collection):
         super().__init__(db_collection)
-        self.api_url = "https://api.stackexchange.com/2.3/users"
+        self.api_root = os.getenv("STACKEXCHANGE_API_URL", "https://api.stackexchange.com/2.3")
+        self.api_key = os.getenv("STACKEXCHANGE_KEY")
+        self.user_filter = os.getenv("STACKEXCHANGE_FILTER")
+        self.pacer = StackExchangePacer(
+            min_interval=float(os.getenv("STACKEXCHANGE_MIN_INTERVAL", 0.1)),
+            quota_reserve=int(os.getenv("STACKEXCHANGE_QUOTA_RESERVE", 10)))
+
+    def ensure_filter(self):
+        # A custom filter trims every user down to the fields normalize() reads.
+        if self.user_filter:
+            return self.user_filter
+        self.user_filter = self.state.load().get("filter")
+        if not self.user_filter:
+            body = self.request("/filters/create", {
+                "include": ";".join(SO_USER_FIELDS + SE_WRAPPER_FIELDS),
+                "base": "none", "unsafe": "false"
+            })
+            if body is None:
+                return None
+            self.user_filter = body["items"][0]["filter"]
+            self.state.save(filter=self.user_filter)
+        return self.user_filter
+
+    def request(self, path, params):
+        # Every call, filter creation included, goes through the pacer and
+        # feeds its backoff/quota_remaining back into it.
+        if not self.pacer.wait(self.stop_event):
+            return None
+        if self.api_key:
+            params = dict(params, key=self.api_key)
+        resp = self.session.get(f"{self.api_root}{path}", params=params,
+                                headers=self.get_headers(), timeout=30)
+        if self.handle_rate_limit(resp):
+            return None
+        body = resp.json()
+        self.pacer.update(body)
+        if body.get("error_id") == 502:
+            # throttle_violation: "... more requests available in N seconds"
+            match = re.search(r"(\d+) seconds", body.get("error_message") or "")
+            wait = int(match.group(1)) if match else 60
+            logger.warning(f"StackExchange throttled this client for {wait}s.")
+            self.pacer.block(wait)
+            return None
+        if body.get("error_id"):
+            raise Exception(f"StackExchange {body.get('error_name')}: {body.get('error_message')}")
+        return body
+
+    def api_get(self, path, params):
+        user_filter = self.ensure_filter()
+        if user_filter is None:
+            return None
+        return self.request(path, dict(params, site="stackoverflow", filter=user_filter))
 
     def get_lowest_reputation(self):
         try:
@@ -228,77 +793,139 @@ class StackOverflowScraper(BaseScraper):
             pass
         return None
 
-    def scrape_n_users(self, target=3000):
-        last_rep = self.get_lowest_reputation()
+    def known_at_reputation(self, reputation):
+        return {doc["source_id"] for doc in self.collection.find(
+            {"source_platform": self.SOURCE_PLATFORM, "metrics.reputation_score": reputation},
+            {"source_id": 1})}
 
-        page = 1
-        total_saved = 0
+    def scrape_n_users(self, target=3000):
+        # One cursor: an inclusive `max` reputation bound. Each page moves the
+        # bound down to the lowest reputation it returned and skips the users
+        # already seen at that value; `page` only advances while a single
+        # reputation value fills whole pages.
+        checkpoint = self.state.load()
+        if checkpoint.get("last_rep") is not None:
+            last_rep = checkpoint["last_rep"]
+            page = checkpoint.get("page", 1)
+            seen = set(checkpoint.get("seen", []))
+        else:
+            # Carry on below the lowest reputation already stored.
+            last_rep = self.get_lowest_reputation()
+            page = 1
+            seen = self.known_at_reputation(last_rep) if last_rep is not None else set()
 
         logger.info(
-            f"StackOverflow: Starting scrape. Lowest known reputation in DB: {last_rep}")
+            f"StackOverflow: Starting scrape. Reputation bound: {last_rep}")
 
-        while total_saved < target:
+        while self.inserted_count < target:
             if self.check_duplicate_stop():
                 break
+            if self.pacer.exhausted():
+                logger.warning(
+                    f"StackOverflow: Daily quota nearly spent ({self.pacer.quota_remaining} left). Stopping.")
+                break
 
             params = {
-                "site": "stackoverflow",
                 "page": page,
                 "pagesize": 100,
                 "order": "desc",
                 "sort": "reputation"
             }
-            if last_rep:
-                params['max'] = last_rep - 1
+            if last_rep is not None:
+                params['max'] = last_rep
 
             try:
-                resp = self.session.get(
-                    self.api_url, params=params, headers=self.get_headers())
-                if self.handle_rate_limit(resp):
+                body = self.api_get("/users", params)
+                if body is None:
                     continue
 
-                if resp.status_code == 200:
-                    items = resp.json().get('items', [])
-                    if not items:
-                        logger.info(
-                            "StackOverflow: No more users returned (likely hit end of list).")
-                        break
-
-                    page_new_count = 0
-                    for item in items:
-                        if self.normalize_and_save(item):
-                            total_saved += 1
-                            page_new_count += 1
-                            self.consecutive_duplicates = 0
-                        else:
-                            self.consecutive_duplicates += 1
-
-                    if items:
-                        current_min = min(
-                            [x.get('reputation', 999999) for x in items])
-                        if last_rep is None or current_min < last_rep:
-                            last_rep = current_min
-
+                items = body.get('items', [])
+                if not items:
                     logger.info(
-                        f"StackOverflow: Page {page} done. New: {page_new_count}. Total Saved: {total_saved}. Min Rep: {last_rep}")
-
-                    if page_new_count == 0:
-                        logger.warning(
-                            "StackOverflow: Entire page was duplicates. Consider checking DB sync.")
+                        "StackOverflow: No more users returned (likely hit end of list).")
+                    self.finish_listing()
+                    break
 
+                # Pages can auto-flush mid-way, so count from the running total.
+                before = self.inserted_count
+                for item in items:
+                    if str(item.get('user_id')) not in seen:
+                        self.normalize_and_save(
+                            item, {"last_fetched_at": datetime.now(timezone.utc)})
+                self.flush()
+                page_new_count = self.inserted_count - before
+
+                current_min = min(x.get('reputation', 0) for x in items)
+                if current_min == last_rep:
                     page += 1
-                    time.sleep(2.0)
                 else:
-                    time.sleep(10)
+                    last_rep, page = current_min, 1
+                    seen = {str(x.get('user_id')) for x in items if x.get('reputation') == current_min}
+
+                logger.info(
+                    f"StackOverflow: New: {page_new_count}. Total Saved: {self.inserted_count}. Bound: {last_rep} (page {page}). Quota left: {self.pacer.quota_remaining}")
+
+                if page_new_count == 0:
+                    logger.warning(
+                        "StackOverflow: Entire page was duplicates. Consider checking DB sync.")
+
+                if not body.get('has_more', True):
+                    self.finish_listing()
+                    break
+                self.state.save(page=page, last_rep=last_rep, seen=sorted(seen))
             except Exception as e:
                 if str(e) == "Rate Limit Exceeded":
                     break
                 logger.error(f"SO Error: {e}")
                 break
 
-    def normalize_and_save(self, raw):
+    def finish_listing(self):
+        # The listing is exhausted: drop the cursor but keep the filter.
+        self.state.reset()
+        if self.user_filter:
+            self.state.save(filter=self.user_filter)
+
+    def fetch_users(self, user_ids):
+        users = []
+        for i in range(0, len(user_ids), SE_MAX_IDS):
+            if self.check_duplicate_stop() or self.pacer.exhausted():
+                break
+            chunk = user_ids[i:i + SE_MAX_IDS]
+            body = self.api_get(f"/users/{';'.join(chunk)}", {"pagesize": SE_MAX_IDS})
+            if body is not None:
+                users.extend(body.get('items', []))
+        return users
+
+    def refresh_users(self, max_age_hours=24, limit=None):
+        stale = {doc["source_id"]: doc for doc in self.stale_profiles(max_age_hours, limit)}
+        fetched = set()
+        for raw in self.fetch_users(list(stale)):
+            user_id = str(raw.get("user_id"))
+            if user_id not in stale:
+                continue
+            fetched.add(user_id)
+            self.archive_raw(user_id, raw)
+            self.queue_refresh(stale[user_id], {"last_fetched_at": datetime.now(timezone.utc)},
+                               self.normalize(raw))
+        self.refresh_counts["failed"] += len(stale) - len(fetched)
+        self.flush_refreshes()
+        logger.info(f"StackOverflow refresh: {self.refresh_counts}")
+        return self.refresh_counts
+
+    def replay(self, record):
+        return self.normalize_and_save(record["payload"])
+
+    def normalize_and_save(self, raw, meta=None):
+        self.archive_raw(str(raw.get("user_id")), raw)
+        norm = self.normalize(raw)
+        if meta:
+            norm["fetch_meta"] = meta
+        return self.save_to_db(norm)
+
+    def normalize(self, raw):
         user_id = str(raw.get("user_id"))
-        norm = {
+        skills = ["Software Development"]
+        return {
             "source_platform": "StackOverflow",
             "source_id": user_id,
             "basics": {
@@ -314,133 +941,122 @@ class StackOverflowScraper(BaseScraper):
                 "profile_views": Normalizer.clean_int(raw.get("view_count")),
                 "followers": -1, "following": -1, "contribution_count": -1
             },
-            "skills": ["Software Development"], "affiliations": [], "publications": []
+            "skills": skills, "skill_keys": skill_keys(skills),
+            "affiliations": [], "publications": []
         }
-        return self.save_to_db(norm)
-
-    def save_to_db(self, doc):
-        try:
-            exists = self.collection.find_one(
-                {'source_platform': doc['source_platform'], 'source_id': doc['source_id']})
-            if exists:
-                print(f"[DUPLICATED] Skipping SO: {doc['basics']['name']}")
-                return False
-            self.collection.update_one({'source_platform': doc['source_platform'], 'source_id': doc['source_id']}, {
-                                       '$set': doc}, upsert=True)
-            print(f"[NEW]        Saved SO: {doc['basics']['name']}")
-            return True
-        except Exception:
-            return False
 
 
 class ORCIDScraper(BaseScraper):
+    SOURCE_PLATFORM = "ORCID"
+
     def __init__(self, db_collection):
         super().__init__(db_collection)
         self.search_url = "https://pub.orcid.org/v3.0/search"
         self.base_url = "https://pub.orcid.org/v3.0"
 
-    def scrape_by_keywords(self, target=2000):
-        keywords = ["Machine Learning", "Quantum",
-                    "Bioinformatics", "Climate", "Cryptography"]
-        total = 0
-        for kw in keywords:
-            if total >= target:
-                break
-            if self.check_duplicate_stop():
-                break
+    def detail_pipeline(self):
+        return pipeline_from_env("ORCID", self.fetch_record, orcid_profile, self.write_profile)
 
+    def scrape_by_keywords(self, target=2000):
+        self.detail_pipeline().run(self.state.pending(max(0, target)))
+        self.flush()
+        searches = self.keyword_searches(target)
+        search = self.advance(searches)
+        while search is not None:
+            search = self.advance(searches, self.search_page(*search))
+        self.flush()
+
+    def keyword_searches(self, target):
+        # Yields the (keyword, start) pages still to search, resuming from the
+        # saved checkpoint. The caller sends back each page's results: [] ends
+        # the keyword and None stops the crawl.
+        checkpoint = self.state.load()
+        for i in range(checkpoint.get("keyword_index", 0), len(ORCID_KEYWORDS)):
+            if self.inserted_count >= target or self.check_duplicate_stop():
+                return
+            kw = ORCID_KEYWORDS[i]
             logger.info(f"ORCID: Querying {kw}")
-            start = 0
+            start = checkpoint.get("start", 0) if i == checkpoint.get("keyword_index") else 0
             while start < 400:
-                params = {"q": kw, "rows": 50, "start": start}
-                try:
-                    resp = self.session.get(
-                        self.search_url, headers=self.get_headers(), params=params)
-                    if self.handle_rate_limit(resp):
-                        continue
+                if self.inserted_count >= target or self.stop_event.is_set():
+                    # Stopped mid-keyword: the next run resumes from the
+                    # (keyword_index, start) saved after the last full page.
+                    return
+                results = yield kw, start
+                if results is None:
+                    return
+                if not results:
+                    break
+                start += 50
+                self.state.save(keyword_index=i, start=start)
+            self.state.save(keyword_index=i + 1, start=0)
+        self.state.reset()
 
-                    results = resp.json().get('result', [])
-                    if not results:
-                        break
+    def claim_results(self, results):
+        ids = [r['orcid-identifier']['path'] for r in results]
+        return self.claim_new({oid: oid for oid in ids})
 
-                    found_new_on_page = False
-                    for r in results:
-                        oid = r['orcid-identifier']['path']
-                        if self.fetch_details(oid):
-                            total += 1
-                            self.consecutive_duplicates = 0
-                            found_new_on_page = True
-                        else:
-                            self.consecutive_duplicates += 1
-
-                        if total >= target:
-                            break
-
-                    if not found_new_on_page and len(results) > 0:
-                        logger.info("ORCID: Page contained only duplicates.")
-
-                    start += 50
-                    time.sleep(1)
-                except Exception as e:
-                    if str(e) == "Rate Limit Exceeded":
-                        break
+    def search_page(self, kw, start):
+        params = {"q": kw, "rows": 50, "start": start}
+        try:
+            while True:
+                resp = self.session.get(self.search_url, headers=self.get_headers(), params=params)
+                if not self.handle_rate_limit(resp):
                     break
-
-    def fetch_details(self, orcid_id):
+                if self.stop_event.is_set():
+                    return None
+
+            results = resp.json().get('result') or []
+            if results:
+                before = self.inserted_count
+                self.detail_pipeline().run(self.claim_results(results))
+                self.flush()
+                if self.inserted_count == before:
+                    logger.info("ORCID: Page contained only duplicates.")
+                time.sleep(1)
+            return results
+        except Exception as e:
+            if str(e) != "Rate Limit Exceeded":
+                logger.error(f"ORCID Error: {e}")
+            return None
+
+    def fetch_record(self, orcid_id):
         headers = self.get_headers(referer="https://orcid.org/")
         headers['Accept'] = 'application/json'
-        try:
-            resp = self.session.get(
-                f"{self.base_url}/{orcid_id}", headers=headers)
-            if resp.status_code == 200:
-                return self.normalize_and_save(resp.json(), orcid_id)
-            self.handle_rate_limit(resp)
-        except Exception:
-            pass
-        return False
-
-    def normalize_and_save(self, raw, orcid_id):
-        person = raw.get('person', {})
-        name = person.get('name', {})
-        full_name = f"{name.get('given-names', {}).get('value', '')} {name.get('family-name', {}).get('value', '')}".strip()
-        activities = raw.get('activities-summary', {})
-        bio_text = person.get('biography', {}).get('content', '')
-        skills = Normalizer.extract_skills(bio_text)
+        resp = self.session.get(
+            f"{self.base_url}/{orcid_id}", headers=headers, timeout=30)
+        if resp.status_code == 200:
+            raw = resp.json()
+            self.archive_raw(orcid_id, raw)
+            return raw
+        self.handle_rate_limit(resp)
+        return None
 
-        norm = {
-            "source_platform": "ORCID",
-            "source_id": orcid_id,
-            "basics": {
-                "name": full_name, "headline": "Researcher", "location": "",
-                "current_affiliation": "", "website": f"https://orcid.org/{orcid_id}",
-                "email": f"{orcid_id}@no-email.orcid.org"
-            },
-            "metrics": {
-                "publication_count": len(activities.get('works', {}).get('group', [])),
-                "followers": -1, "following": -1, "reputation_score": -1
-            },
-            "skills": skills, "affiliations": [], "publications": []
-        }
-        return self.save_to_db(norm)
+    def replay(self, record):
+        return self.normalize_and_save(record["payload"], record["source_id"])
 
-    def save_to_db(self, doc):
-        try:
-            exists = self.collection.find_one(
-                {'source_platform': doc['source_platform'], 'source_id': doc['source_id']})
-            if exists:
-                print(f"[DUPLICATED] Skipping ORCID: {doc['basics']['name']}")
-                return False
-            self.collection.update_one({'source_platform': doc['source_platform'], 'source_id': doc['source_id']}, {
-                                       '$set': doc}, upsert=True)
-            print(f"[NEW]        Saved ORCID: {doc['basics']['name']}")
-            return True
-        except Exception:
-            return False
+    def normalize_and_save(self, raw, orcid_id):
+        self.archive_raw(orcid_id, raw)
+        return self.save_to_db(orcid_profile(orcid_id, raw))
 
 
 class KaggleScraper(BaseScraper):
+    SOURCE_PLATFORM = "Kaggle"
+
     def __init__(self, db_collection):
         super().__init__(db_collection)
+        self.WRITE_BATCH_SIZE = 10
+        self.next_request_at = 0.0
+        self.pace_lock = threading.Lock()
+
+    def wait_turn(self):
+        # Fetch workers share one 4-7s cadence: extra workers overlap parsing
+        # and network time, they don't raise the request rate.
+        with self.pace_lock:
+            now = time.monotonic()
+            wait = self.next_request_at - now
+            self.next_request_at = max(now, self.next_request_at) + random.uniform(4, 7)
+        return wait <= 0 or not self.stop_event.wait(wait)
 
     def discover_and_scrape(self, limit=500):
         logger.info("Kaggle: Discovering users...")
@@ -451,77 +1067,53 @@ class KaggleScraper(BaseScraper):
             if self.handle_rate_limit(resp):
                 return
 
-            soup = BeautifulSoup(resp.text, 'html.parser')
-            users = set()
-            for a in soup.find_all('a', href=True):
-                href = a['href']
-                if href.startswith('/') and href.count('/') == 1:
-                    u = href.strip('/')
-                    if len(u) > 3 and u not in ['code', 'learn', 'terms']:
-                        users.add(u)
-
-            count = 0
-            for u in list(users)[:limit]:
-                if self.check_duplicate_stop():
-                    break
-                if self.scrape_profile(u):
-                    count += 1
-                    self.consecutive_duplicates = 0
-                else:
-                    self.consecutive_duplicates += 1
-                time.sleep(random.uniform(4, 7))
-        except Exception:
-            pass
+            users = self.state.pending(max(0, limit))
+            users += self.claim_new({u: u for u in self.extract_usernames(resp.text)})
+            # Parsing is the CPU-heavy part here, so it runs in worker processes
+            # while fetchers keep the (deliberately slow) request cadence.
+            pipeline_from_env(
+                "Kaggle", self.fetch_profile_html, kaggle_profile, self.write_profile,
+                parse_in_processes=True,
+                fetch_workers=int(os.getenv("KAGGLE_FETCH_WORKERS", 2))
+            ).run(u for u in users[:limit] if not self.check_duplicate_stop())
+        except Exception as e:
+            logger.error(f"Kaggle Error: {e}")
+        self.flush()
+
+    def extract_usernames(self, html):
+        users = set()
+        for href in link_hrefs(html):
+            if href.startswith('/') and href.count('/') == 1:
+                u = href.strip('/')
+                if len(u) > 3 and u not in ['code', 'learn', 'terms']:
+                    users.add(u)
+        return users
+
+    def fetch_profile_html(self, username):
+        if not self.wait_turn():
+            return None
+        resp = self.session.get(
+            f"https://www.kaggle.com/{username}", headers=self.get_headers(), timeout=30)
+        if resp.status_code == 200:
+            self.archive_raw(username, resp.text)
+            return resp.text
+        self.handle_rate_limit(resp)
+        return None
 
-    def scrape_profile(self, username):
-        url = f"https://www.kaggle.com/{username}"
-        try:
-            resp = self.session.get(url, headers=self.get_headers())
-            if resp.status_code == 200:
-                return self.parse_html(resp.text, username)
-            self.handle_rate_limit(resp)
-        except Exception:
-            pass
-        return False
+    def replay(self, record):
+        return self.parse_html(record["payload"], record["source_id"])
 
     def parse_html(self, html, username):
-        soup = BeautifulSoup(html, 'html.parser')
-        json_ld = soup.find('script', {'type': 'application/ld+json'})
-        data = json.loads(json_ld.string) if json_ld else {}
-        desc = data.get('description', "")
-
-        norm = {
-            "source_platform": "Kaggle", "source_id": username,
-            "basics": {
-                "name": data.get('name', username), "headline": desc, "location": "",
-                "current_affiliation": "", "website": f"https://www.kaggle.com/{username}",
-                "email": f"{username}@no-email.kaggle.com"
-            },
-            "metrics": {
-                "tier": "Contributor", "followers": -1, "following": -1, "reputation_score": -1
-            },
-            "skills": Normalizer.extract_skills(desc), "affiliations": [], "publications": []
-        }
-        return self.save_to_db(norm)
-
-    def save_to_db(self, doc):
-        try:
-            exists = self.collection.find_one(
-                {'source_platform': doc['source_platform'], 'source_id': doc['source_id']})
-            if exists:
-                print(f"[DUPLICATED] Skipping Kaggle: {doc['basics']['name']}")
-                return False
-            self.collection.update_one({'source_platform': doc['source_platform'], 'source_id': doc['source_id']}, {
-                                       '$set': doc}, upsert=True)
-            print(f"[NEW]        Saved Kaggle: {doc['basics']['name']}")
-            return True
-        except Exception:
-            return False
+        self.archive_raw(username, html)
+        return self.save_to_db(kaggle_profile(username, html))
 
 
 class LinkedInScraper(BaseScraper):
+    SOURCE_PLATFORM = "LinkedIn"
+
     def __init__(self, db_collection):
         super().__init__(db_collection)
+        self.WRITE_BATCH_SIZE = 5
         self.cookie = os.getenv("LINKEDIN_COOKIE")
         if not self.cookie:
             logger.warning(
@@ -537,9 +1129,11 @@ class LinkedInScraper(BaseScraper):
     def search_and_scrape(self, keywords, limit=50):
         if not self.cookie:
             return
-        total_scraped = 0
+        done = self.state.load().get("keywords_done", [])
         for keyword in keywords:
-            if total_scraped >= limit:
+            if keyword in done:
+                continue
+            if self.inserted_count >= limit:
                 break
             if self.check_duplicate_stop():
                 break
@@ -557,29 +1151,32 @@ class LinkedInScraper(BaseScraper):
                         "LinkedIn Auth Wall detected! Stopping LinkedIn scrape.")
                     return
 
-                soup = BeautifulSoup(resp.text, 'html.parser')
                 profiles = set()
-                for a in soup.find_all('a', href=True):
-                    href = a['href']
+                for href in link_hrefs(resp.text):
                     if '/in/' in href and 'miniProfile' not in href:
                         profiles.add(href.split('?')[0])
 
-                for purl in list(profiles):
-                    if total_scraped >= limit:
+                profiles = self.state.pending() + self.claim_new(
+                    {p: p.split('/in/')[-1].strip('/') for p in profiles})
+                for purl in profiles:
+                    if self.inserted_count + len(self.write_buffer) >= limit:
                         break
                     if self.check_duplicate_stop():
                         break
 
                     time.sleep(random.uniform(25, 60))
-                    if self.scrape_profile(purl):
-                        total_scraped += 1
-                        self.consecutive_duplicates = 0
-                    else:
-                        self.consecutive_duplicates += 1
+                    self.state.finish(purl, self.scrape_profile(purl))
+                self.flush()
+                if self.inserted_count < limit:
+                    done.append(keyword)
+                    self.state.save(keywords_done=done)
             except Exception as e:
                 if str(e) == "Rate Limit Exceeded":
                     break
                 logger.error(f"LinkedIn error: {e}")
+        else:
+            self.state.reset()
+        self.flush()
 
     def scrape_profile(self, profile_url):
         full_url = f"https://www.linkedin.com{profile_url}" if profile_url.startswith(
@@ -592,10 +1189,12 @@ class LinkedInScraper(BaseScraper):
             pass
         return False
 
+    def replay(self, record):
+        return self.parse_and_save(record["payload"], record["url"])
+
     def parse_and_save(self, html, url):
-        soup = BeautifulSoup(html, 'html.parser')
-        name = soup.find('meta', property='og:title')
-        name = name['content'] if name else "Unknown"
+        self.archive_raw(url.split('/in/')[-1].strip('/'), html, url=url)
+        name = meta_property(html, 'og:title') or "Unknown"
         public_id = url.split('/in/')[-1].strip('/')
         skills = Normalizer.extract_skills(html)
 
@@ -611,41 +1210,52 @@ class LinkedInScraper(BaseScraper):
             "metrics": {
                 "followers": -1, "following": -1, "reputation_score": 100, "tier": "Professional"
             },
-            "skills": skills, "affiliations": [], "publications": []
+            "skills": skills, "skill_keys": skill_keys(skills),
+            "affiliations": [], "publications": []
         }
         return self.save_to_db(norm)
 
-    def save_to_db(self, doc):
-        try:
-            exists = self.collection.find_one(
-                {'source_platform': doc['source_platform'], 'source_id': doc['source_id']})
-            if exists:
-                print(
-                    f"[DUPLICATED] Skipping LinkedIn: {doc['basics']['name']}")
-                return False
-            self.collection.update_one({'source_platform': doc['source_platform'], 'source_id': doc['source_id']}, {
-                                       '$set': doc}, upsert=True)
-            print(f"[NEW]        Saved LinkedIn: {doc['basics']['name']}")
-            return True
-        except Exception:
-            return False
-
 
-if __name__ == "__main__":
-    db = DBManager().connect()
-    col = db['profiles']
-    print("=== STARTING INTEGRATED MASS SCRAPE ===")
-
-    GitHubScraper(col).discover_active_users(5000)
-    ORCIDScraper(col).scrape_by_keywords(2000)
-    KaggleScraper(col).discover_and_scrape(500)
-
-    if os.getenv("LINKEDIN_COOKIE"):
-        print("=== STARTING LINKEDIN SCRAPE ===")
-        li = LinkedInScraper(col)
-        li.search_and_scrape(
-            ["Python", "Data Science", "React", "DevOps"], limit=50)
-    else:
-        logger.warning("Skipping LinkedIn: LINKEDIN_COOKIE not set.")
+SCRAPERS = {
+    "GitHub": GitHubScraper, "StackOverflow": StackOverflowScraper, "ORCID": ORCIDScraper,
+    "Kaggle": KaggleScraper, "LinkedIn": LinkedInScraper
+}
+
+
+def archive_platforms(names):
+    # Archive directories use the platform names; accept them in any case,
+    # like the lowercase source names the orchestrator takes elsewhere.
+    by_key = {name.lower(): name for name in SCRAPERS}
+    unknown = [name for name in names if name.lower() not in by_key]
+    if unknown:
+        raise ValueError(
+            f"Unknown platform(s) {', '.join(unknown)}, choose from {', '.join(sorted(by_key))}")
+    return [by_key[name.lower()] for name in names]
+
+
+def replay_archive(col, root, platforms=None):
+    if not os.path.isdir(root):
+        raise ValueError(f"Raw archive directory {root} does not exist, set RAW_ARCHIVE_DIR")
+    platforms = archive_platforms(platforms) if platforms else None
+    scrapers = {}
+    replayed = 0
+    for record in iter_records(root, platforms):
+        scraper = scrapers.get(record["platform"])
+        if scraper is None:
+            scraper = scrapers[record["platform"]] = SCRAPERS[record["platform"]](col)
+            scraper.archive = None
+            scraper.overwrite = True
+        try:
+            scraper.replay(record)
+            replayed += 1
+        except Exception as e:
+            logger.error(
+                f"Replay failed for {record['platform']} {record['source_id']}: {e}")
+    for scraper in scrapers.values():
+        scraper.flush()
+    # Overwrites can move profiles between rollup rows, so rebuild them once.
+    refresh_rollups(col.database)
+    bump_version(col.database, col.name)
+    logger.info(f"Replayed {replayed} archived responses from {root}")
+    return replayed
 
-    print("=== MASS SCRAPE COMPLETE ===")
@@ -0,0 +1,73 @@
+import json
+import os
+import re
+
+TAXONOMY_PATH = os.getenv(
+    "SKILL_TAXONOMY_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "skills_taxonomy.json"))
+
+
+def skill_key(skill):
+    return " ".join(str(skill).lower().split())
+
+
+def load_taxonomy(path=TAXONOMY_PATH):
+    with open(path, encoding="utf-8") as f:
+        entries = json.load(f)["skills"]
+
+    names, categories, aliases = [], {}, {}
+    for entry in entries:
+        name = entry["name"]
+        names.append(name)
+        categories[skill_key(name)] = entry.get("category", "Other")
+        for alias in [name] + entry.get("aliases", []):
+            key = skill_key(alias)
+            if aliases.get(key, name) != name:
+                raise ValueError(
+                    f"Skill alias '{alias}' maps to both {aliases[key]} and {name}")
+            aliases[key] = name
+    return names, categories, aliases
+
+
+def compile_skill_pattern(terms):
+    # Longest first so "Java" never shadows "JavaScript" at the same offset.
+    # Lookarounds instead of \b so keywords ending in symbols (C++) still match.
+    # Matched against lowercased text, which is much cheaper than re.IGNORECASE.
+    alternation = "|".join(
+        re.escape(skill_key(t)) for t in sorted(terms, key=len, reverse=True))
+    return re.compile(rf"(?<!\w)(?:{alternation})(?!\w)")
+
+
+TECH_KEYWORDS, SKILL_CATEGORIES, SKILL_ALIASES = load_taxonomy()
+CANONICAL_SKILLS = {skill_key(name): name for name in TECH_KEYWORDS}
+KNOWN_SKILL_KEYS = set(CANONICAL_SKILLS)
+SKILL_PATTERN = compile_skill_pattern(SKILL_ALIASES)
+
+
+def resolve_skill(skill):
+    return SKILL_ALIASES.get(skill_key(skill))
+
+
+def canonical_skill_key(skill):
+    name = resolve_skill(skill)
+    return skill_key(name if name else skill)
+
+
+def skill_keys(skills):
+    return sorted({canonical_skill_key(s) for s in skills if s})
+
+
+def skill_label(key):
+    return CANONICAL_SKILLS.get(key, key)
+
+
+def skill_category(key):
+    return SKILL_CATEGORIES.get(key, "Other")
+
+
+def extract_skills(text):
+    if not text:
+        return []
+    found = {SKILL_ALIASES[m.group(0)]
+             for m in SKILL_PATTERN.finditer(text.lower())}
+    return [name for name in TECH_KEYWORDS if name in found]
@@ -0,0 +1,97 @@
+import csv
+import io
+import json
+import os
+
+# Rough bytes-per-token for English/JSON text; good enough for budgeting.
+BYTES_PER_TOKEN = 4
+TOOL_RESULT_TOKEN_BUDGET = int(os.getenv("TOOL_RESULT_TOKEN_BUDGET", 1500))
+MAX_VALUE_CHARS = int(os.getenv("TOOL_RESULT_MAX_VALUE_CHARS", 120))
+DISTRIBUTION_TOP_K = int(os.getenv("TOOL_RESULT_TOP_K", 20))
+
+
+def encoded_size(value):
+    return len(json.dumps(value, separators=(',', ':')).encode())
+
+
+def flatten(doc, prefix=""):
+    row = {}
+    for key, value in doc.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            row.update(flatten(value, f"{name}."))
+        elif isinstance(value, list):
+            row[name] = ";".join(str(v) for v in value)
+        else:
+            row[name] = value
+    return row
+
+
+def truncate(value, max_chars):
+    if isinstance(value, str) and len(value) > max_chars:
+        return value[:max_chars - 1] + "…"
+    return value
+
+
+def is_distribution(rows):
+    return all(set(row) >= {"_id", "count"} for row in rows)
+
+
+def to_csv(columns, rows):
+    out = io.StringIO()
+    writer = csv.writer(out, lineterminator="\n")
+    writer.writerow(columns)
+    writer.writerows(rows)
+    return out.getvalue()
+
+
+def tabulate(docs, budget_bytes, max_chars, report):
+    if docs and is_distribution(docs):
+        docs = sorted(docs, key=lambda d: d.get("count") or 0, reverse=True)
+        docs = docs[:DISTRIBUTION_TOP_K]
+
+    flat = [flatten(doc) for doc in docs]
+    columns = []
+    for row in flat:
+        columns += [c for c in row if c not in columns]
+    rows = [[truncate(row.get(c, ""), max_chars) for c in columns] for row in flat]
+
+    # Rows are dropped from the end, so ranked results keep their best entries.
+    # The table is measured as sent, i.e. JSON-encoded with escaped newlines.
+    table = to_csv(columns, rows)
+    while rows and encoded_size(table) > budget_bytes:
+        keep = max(len(rows) * budget_bytes // encoded_size(table), 1)
+        rows = rows[:min(keep, len(rows) - 1)]
+        table = to_csv(columns, rows)
+    report["rows_kept"] = len(rows)
+    report["rows_dropped"] = report["rows_total"] - len(rows)
+    report["truncated_values"] = sum(
+        isinstance(value, str) and len(value) > max_chars
+        for row in flat[:len(rows)] for value in row.values())
+    return table
+
+
+def summarize_result(result, token_budget=TOOL_RESULT_TOKEN_BUDGET, max_chars=MAX_VALUE_CHARS):
+    budget_bytes = token_budget * BYTES_PER_TOKEN
+    if isinstance(result, dict) and isinstance(result.get("results"), list):
+        docs, extra = result["results"], {k: v for k, v in result.items() if k != "results"}
+    elif isinstance(result, list) and all(isinstance(doc, dict) for doc in result):
+        docs, extra = result, {}
+    else:
+        if encoded_size(result) <= budget_bytes:
+            return result
+        text = json.dumps(result, separators=(',', ':'))
+        return {"text": text[:budget_bytes], "truncated_bytes": len(text) - budget_bytes}
+
+    report = {"rows_total": len(docs), "rows_kept": 0, "rows_dropped": 0, "truncated_values": 0}
+    table_budget = budget_bytes - encoded_size(dict(extra, table="", report=report))
+    while True:
+        summary = {"table": tabulate(docs, max(table_budget, 0), max_chars, report)}
+        summary.update(extra)
+        summary["report"] = report
+        # The report's counts only grow once the table is built; give back
+        # the difference and retry.
+        excess = encoded_size(summary) - budget_bytes
+        if excess <= 0 or not report["rows_kept"]:
+            return summary
+        table_budget -= excess
@@ -0,0 +1,208 @@
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+
+import ai_query_client
+import mcp_server
+from cache import bump_version
+from resilience import CircuitBreaker, RetryPolicy
+
+
+def model_reply(*parts):
+    return {"candidates": [{"content": {"role": "model", "parts": list(parts)}}]}
+
+
+def tool_call(name, **args):
+    return {"functionCall": {"name": name, "args": args}}
+
+
+@pytest.fixture
+def tools(db, monkeypatch):
+    monkeypatch.setattr(mcp_server.db_manager, "db", db)
+    monkeypatch.setattr(mcp_server.profiles_version, "check_interval", 0)
+    calls = []
+
+    def distribution():
+        calls.append("get_skill_distribution")
+        return [{"_id": "Python", "count": 3}]
+
+    monkeypatch.setitem(ai_query_client.TOOLS, "get_skill_distribution", distribution)
+    return calls
+
+
+def stub_model(replies):
+    requests = []
+
+    def handler(request):
+        requests.append(json.loads(request.content))
+        return httpx.Response(200, json=replies.pop(0))
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://model")
+    return client, requests
+
+
+def ask(conversation, client, text):
+    return asyncio.run(conversation.ask(client, text))
+
+
+def test_blocked_prompt_is_reported_and_rolled_back(tools, capsys):
+    client, _ = stub_model([{"candidates": [], "promptFeedback": {"blockReason": "SAFETY"}}])
+    conversation = ai_query_client.Conversation()
+
+    assert ask(conversation, client, "something unsafe") is None
+    assert conversation.contents == []
+    assert "SAFETY" in capsys.readouterr().out
+
+
+def test_missing_candidates_after_tool_round(tools):
+    client, _ = stub_model([model_reply(tool_call("get_skill_distribution")), {}])
+    conversation = ai_query_client.Conversation()
+
+    assert ask(conversation, client, "top skills?") is None
+    assert conversation.contents == []
+
+
+def test_results_are_reused_until_the_collection_changes(tools, db):
+    client, requests = stub_model([
+        model_reply(tool_call("get_skill_distribution")), model_reply({"text": "Python"}),
+        model_reply(tool_call("get_skill_distribution")), model_reply({"text": "Still Python"}),
+        model_reply(tool_call("get_skill_distribution")), model_reply({"text": "Changed"}),
+    ])
+    conversation = ai_query_client.Conversation()
+
+    assert ask(conversation, client, "top skills?") == "Python"
+    assert ask(conversation, client, "and again?") == "Still Python"
+    assert tools == ["get_skill_distribution"]
+    assert conversation.stats["reused_results"] == 1
+
+    bump_version(db, "profiles")
+    assert ask(conversation, client, "after a scrape?") == "Changed"
+    assert len(tools) == 2
+    # The reused result is still sent back in full, not as a bare reference.
+    response = requests[3]["contents"][-1]["parts"][0]["functionResponse"]["response"]
+    assert "Python" in response["result"]["table"]
+
+
+def test_results_store_is_bounded(tools, monkeypatch):
+    monkeypatch.setenv("CONVERSATION_MAX_RESULTS", "2")
+    conversation = ai_query_client.Conversation()
+    for i in range(5):
+        conversation.results.set(str(i), 0, i)
+    assert conversation.results.stats()["entries"] == 2
+
+
+@pytest.fixture
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(ai_query_client, "GEMINI_RETRY", RetryPolicy(
+        max_attempts=3, deadline=5, base=0.01, cap=0.02, exceptions=(httpx.HTTPError,)))
+    monkeypatch.setattr(ai_query_client, "gemini_breaker", CircuitBreaker(failure_threshold=5))
+
+
+def test_call_gemini_retries_transient_failures(fast_retries):
+    statuses = [503, 429, 200]
+
+    def handler(request):
+        assert request.url.path.endswith(f"/models/{ai_query_client.MODEL_NAME}:generateContent")
+        return httpx.Response(statuses.pop(0), json=model_reply({"text": "hi"}))
+
+    async def main():
+        stats = {"llm_calls": 0, "payload_bytes": 0}
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://model") as client:
+            return await ai_query_client.call_gemini(client, "hello", stats=stats), stats
+
+    resp, stats = asyncio.run(main())
+    assert ai_query_client.extract_text(resp) == "hi"
+    assert statuses == []
+    assert stats["llm_calls"] == 1 and stats["payload_bytes"] > 0
+
+
+def test_call_gemini_gives_up_with_none(fast_retries, capsys):
+    def handler(request):
+        raise httpx.ConnectError("refused")
+
+    async def main():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://model") as client:
+            return await ai_query_client.call_gemini(client, "hello")
+
+    assert asyncio.run(main()) is None
+    assert "Gemini request failed" in capsys.readouterr().out
+
+
+def test_tools_run_off_the_event_loop(monkeypatch):
+    monkeypatch.setitem(ai_query_client.TOOLS, "slow", lambda: time.sleep(0.3) or "done")
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        call = await ai_query_client.run_tool("slow", {})
+        task.cancel()
+        return call, ticks
+
+    call, ticks = asyncio.run(main())
+    assert call["result"] == "done" and call["elapsed_ms"] >= 300
+    assert ticks >= 10
+
+
+def test_compacted_history_keeps_row_counts_and_cursor(db, monkeypatch):
+    monkeypatch.setattr(mcp_server.db_manager, "db", db)
+    monkeypatch.setattr(mcp_server.profiles_version, "check_interval", 0)
+    mcp_server.tool_cache.clear()
+    db["profiles"].insert_many([
+        {"source_platform": "GitHub", "source_id": str(i), "skill_keys": ["python"],
+         "basics": {"name": f"dev {i}"}, "metrics": {"reputation_score": i}}
+        for i in range(8)])
+    client, requests = stub_model([
+        model_reply(tool_call("find_top_experts", skill="python", limit=5)),
+        model_reply({"text": "Here are five."}),
+        model_reply({"text": "Sure."}),
+    ])
+    conversation = ai_query_client.Conversation()
+
+    assert ask(conversation, client, "python experts?") == "Here are five."
+    response = conversation.contents[2]["parts"][0]["functionResponse"]["response"]
+    assert response["summary"]["rows"] == 5
+    assert response["summary"]["next_cursor"]
+
+    ask(conversation, client, "next page please")
+    # The follow-up turn still carries the cursor the model needs to page.
+    sent = requests[2]["contents"][2]["parts"][0]["functionResponse"]["response"]
+    assert sent["summary"] == response["summary"]
+
+
+def test_function_calls_in_one_reply_run_concurrently(tools, monkeypatch):
+    spans = {}
+
+    def slow(name):
+        def tool(**args):
+            started = time.monotonic()
+            time.sleep(0.3)
+            spans[name] = (started, time.monotonic())
+            return [{"_id": name, "count": 1}]
+        return tool
+
+    monkeypatch.setitem(ai_query_client.TOOLS, "slow_a", slow("a"))
+    monkeypatch.setitem(ai_query_client.TOOLS, "slow_b", slow("b"))
+    client, requests = stub_model([
+        model_reply(tool_call("slow_a"), tool_call("no_such_tool"), tool_call("slow_b")),
+        model_reply({"text": "done"}),
+    ])
+    conversation = ai_query_client.Conversation()
+
+    assert ask(conversation, client, "both please") == "done"
+    assert len(requests) == 2
+    (a_start, a_end), (b_start, b_end) = spans["a"], spans["b"]
+    assert a_start < b_end and b_start < a_end
+    parts = requests[1]["contents"][-1]["parts"]
+    assert [p["functionResponse"]["name"] for p in parts] == ["slow_a", "no_such_tool", "slow_b"]
+    assert "a" in parts[0]["functionResponse"]["response"]["result"]["table"]
+    assert "Unknown tool" in parts[1]["functionResponse"]["response"]["error"]
+    assert "b" in parts[2]["functionResponse"]["response"]["result"]["table"]
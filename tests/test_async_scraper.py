@@ -0,0 +1,114 @@
+import asyncio
+import threading
+import time
+from urllib.parse import urlsplit
+
+import httpx
+
+import scraper
+from archive import RawArchive, iter_records
+from async_scraper import AsyncORCIDScraper, HostLimits
+from frontier import CrawlState
+from scraper import ORCID_KEYWORDS, KaggleScraper
+
+
+def orcid_handler(path, query, headers):
+    if path == "/search":
+        if query["q"] != ORCID_KEYWORDS[0] or query["start"] != "0":
+            return 200, {}, {"result": []}
+        return 200, {}, {"result": [{"orcid-identifier": {"path": f"0000-{i:04d}"}} for i in range(20)]}
+    oid = path.rsplit("/", 1)[1]
+    if oid == "0000-0013":
+        return 404, {}, {}
+    return 200, {}, {"person": {"name": {"given-names": {"value": oid}}}}
+
+
+def run_orcid(db, server, archive=None, stop=False, target=100):
+    async def main():
+        async with httpx.AsyncClient() as client:
+            limits = HostLimits({urlsplit(server.url).netloc: (8, 0)})
+            s = AsyncORCIDScraper(db.profiles, client, limits)
+            s.search_url = f"{server.url}/search"
+            s.base_url = server.url
+            s.archive = archive
+            if stop:
+                s.stop_event.set()
+            await s.scrape_by_keywords(target=target)
+            return s
+    return asyncio.run(main())
+
+
+def test_async_orcid_uses_the_staged_fetch_parse_write_path(db, stub_server, tmp_path):
+    server = stub_server(orcid_handler)
+    archive = RawArchive(str(tmp_path), compression="gzip")
+
+    s = run_orcid(db, server, archive)
+    archive.close()
+
+    assert s.inserted_count == 19
+    assert db.profiles.find_one({"source_id": "0000-0001"})["basics"]["name"] == "0000-0001"
+    archived = {r["source_id"] for r in iter_records(str(tmp_path), ["ORCID"])}
+    assert len(archived) == 19 and "0000-0013" not in archived
+    frontier = {d["_id"]: d["status"] for d in db.crawl_frontier.find()}
+    assert frontier["ORCID:0000-0001"] == "done"
+    assert frontier["ORCID:0000-0013"] == "queued"
+
+
+def test_async_orcid_honours_stop_event(db, stub_server):
+    server = stub_server(orcid_handler)
+    run_orcid(db, server, stop=True)
+    assert [p for p, _, _ in server.requests if p != "/search"] == []
+    assert CrawlState(db, "ORCID").load() == {}
+
+
+def test_kaggle_fetch_workers_share_one_cadence(db, monkeypatch):
+    monkeypatch.setattr(scraper.random, "uniform", lambda low, high: 0.05)
+    s = KaggleScraper(db.profiles)
+    stamps = []
+
+    def worker():
+        for _ in range(3):
+            s.wait_turn()
+            stamps.append(time.monotonic())
+
+    threads = [threading.Thread(target=worker) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    stamps.sort()
+    gaps = [b - a for a, b in zip(stamps, stamps[1:])]
+    assert len(stamps) == 6
+    assert min(gaps) >= 0.04
+
+
+def test_host_limiter_caps_concurrency_and_spaces_starts():
+    async def main():
+        limits = HostLimits({"a.test": (2, 0.05), "b.test": (4, 0)})
+        active = {"a.test": 0, "b.test": 0}
+        peak = dict(active)
+        starts = []
+
+        async def request(host):
+            async with limits.for_url(f"https://{host}/x"):
+                active[host] += 1
+                peak[host] = max(peak[host], active[host])
+                if host == "a.test":
+                    starts.append(time.monotonic())
+                await asyncio.sleep(0.15)
+                active[host] -= 1
+
+        await asyncio.gather(*(request(host) for host in ["a.test"] * 6 + ["b.test"] * 8))
+        assert limits.for_url("https://a.test/y") is limits.for_url("https://a.test/z")
+        assert limits.for_url("https://other.test/").semaphore._value == 2
+        return peak, starts
+
+    peak, starts = asyncio.run(main())
+    assert peak == {"a.test": 2, "b.test": 4}
+    assert all(later - earlier >= 0.04 for earlier, later in zip(starts, starts[1:]))
+
+
+def test_async_orcid_checkpoints_like_the_sync_crawl(db, stub_server):
+    run_orcid(db, stub_server(orcid_handler), target=10)
+    # The target was reached on the first page, mid-keyword.
+    assert CrawlState(db, "ORCID").load() == {"keyword_index": 0, "start": 50}
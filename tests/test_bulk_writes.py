@@ -0,0 +1,108 @@
+from types import SimpleNamespace
+
+import pytest
+from pymongo.errors import AutoReconnect, BulkWriteError
+
+from cache import META_COLLECTION
+from rollups import SKILL_ROLLUP
+from scraper import StackOverflowScraper
+
+
+def user(i, reputation=100):
+    return {"user_id": i, "display_name": f"u{i}", "reputation": reputation, "location": "Berlin"}
+
+
+class FailingCollection:
+    # Stands in for the profiles collection when bulk_write raises.
+    def __init__(self, collection, error):
+        self.collection = collection
+        self.database = collection.database
+        self.name = collection.name
+        self.error = error
+
+    def bulk_write(self, ops, ordered=True):
+        raise self.error
+
+
+class OpIndexedCollection:
+    # mongomock numbers upserted_ids by upsert rather than by op index the
+    # way the server does, which breaks batches mixing new and known profiles.
+    def __init__(self, collection):
+        self.collection = collection
+        self.database = collection.database
+        self.name = collection.name
+
+    def bulk_write(self, ops, ordered=True):
+        upserted = {}
+        for i, op in enumerate(ops):
+            upserted.update({i: _id for _id in self.collection.bulk_write([op]).upserted_ids.values()})
+        return SimpleNamespace(upserted_ids=upserted)
+
+    def __getattr__(self, name):
+        return getattr(self.collection, name)
+
+
+@pytest.fixture
+def scraper(db):
+    scraper = StackOverflowScraper(db["profiles"])
+    scraper.collection = OpIndexedCollection(db["profiles"])
+    return scraper
+
+
+def save(scraper, *users):
+    for raw in users:
+        scraper.save_to_db(scraper.normalize(raw))
+
+
+def test_flush_counts_new_and_existing_profiles(db, scraper):
+    save(scraper, user(1), user(2), user(3))
+    assert scraper.flush() == (3, 0)
+
+    save(scraper, user(1), user(2), user(3), user(4))
+    assert scraper.flush() == (1, 3)
+    assert (scraper.inserted_count, scraper.matched_count, scraper.failed_count) == (4, 3, 0)
+    assert scraper.consecutive_duplicates == 0
+    assert db["profiles"].count_documents({}) == 4
+    # Only the newly inserted profiles reach the rollups.
+    assert db[SKILL_ROLLUP].find_one({"_id": "software development"})["count"] == 4
+    assert db[META_COLLECTION].find_one({"_id": "profiles"})["version"] == 2
+
+
+def test_duplicates_do_not_overwrite_by_default(db, scraper):
+    save(scraper, user(1, reputation=100))
+    scraper.flush()
+    save(scraper, user(1, reputation=999))
+    assert scraper.flush() == (0, 1)
+    assert scraper.consecutive_duplicates == 1
+    doc = db["profiles"].find_one({"source_id": "1"})
+    assert doc["metrics"]["reputation_score"] == 100
+
+
+def test_save_flushes_once_the_batch_is_full(db, scraper):
+    scraper.WRITE_BATCH_SIZE = 3
+    save(scraper, user(1), user(2))
+    assert db["profiles"].count_documents({}) == 0
+    save(scraper, user(3))
+    assert db["profiles"].count_documents({}) == 3
+    assert scraper.write_buffer == []
+
+
+def test_duplicate_key_errors_count_as_matched(db, scraper):
+    save(scraper, user(1), user(2), user(3))
+    scraper.collection = FailingCollection(db["profiles"], BulkWriteError({
+        "writeErrors": [
+            {"index": 0, "code": 121, "errmsg": "Document failed validation"},
+            {"index": 1, "code": 11000, "errmsg": "E11000 duplicate key"},
+        ],
+        "upserted": [{"index": 2, "_id": "x"}],
+    }))
+    assert scraper.flush() == (1, 1)
+    assert (scraper.inserted_count, scraper.matched_count, scraper.failed_count) == (1, 1, 1)
+
+
+def test_failed_bulk_write_rejects_the_whole_batch(db, scraper):
+    save(scraper, user(1), user(2))
+    scraper.collection = FailingCollection(db["profiles"], AutoReconnect("connection reset"))
+    assert scraper.flush() == (0, 0)
+    assert (scraper.inserted_count, scraper.matched_count, scraper.failed_count) == (0, 0, 2)
+    assert scraper.consecutive_duplicates == 0
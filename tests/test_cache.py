@@ -0,0 +1,110 @@
+import pytest
+
+import cache
+from cache import META_COLLECTION, CollectionVersion, TTLCache, bump_version, cached_tool
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class Version:
+    def __init__(self):
+        self.value = 0
+
+    def current(self):
+        return self.value
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache.time, "monotonic", clock)
+    return clock
+
+
+def test_entries_expire_after_the_ttl(clock):
+    store = TTLCache(maxsize=4, ttl=10)
+    store.set("k", 0, "v")
+    clock.now += 9.9
+    assert store.get("k", 0) == (True, "v")
+    clock.now += 0.2
+    assert store.get("k", 0) == (False, None)
+    assert store.stats()["entries"] == 0
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    store = TTLCache(maxsize=2, ttl=10)
+    store.set("a", 0, 1)
+    store.set("b", 0, 2)
+    store.get("a", 0)
+    store.set("c", 0, 3)
+    assert store.get("b", 0) == (False, None)
+    assert store.get("a", 0) == (True, 1) and store.get("c", 0) == (True, 3)
+    stats = store.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (3, 1, 1)
+    assert stats["hit_rate"] == 0.75
+
+
+def test_version_change_invalidates(clock):
+    store = TTLCache()
+    store.set("k", 1, "v")
+    assert store.get("k", 2) == (False, None)
+    assert store.get("k", 1) == (False, None)
+
+
+def test_collection_version_is_rechecked_after_the_interval(db, clock):
+    version = CollectionVersion(lambda: db[META_COLLECTION], "profiles", check_interval=1.0)
+    assert version.current() == 0
+    bump_version(db, "profiles")
+    assert version.current() == 0
+    clock.now += 1.0
+    assert version.current() == 1
+
+
+@pytest.fixture
+def tool(clock):
+    calls = []
+    version = Version()
+
+    @cached_tool(TTLCache(), version, verbatim=("cursor",))
+    def search(query, limit=5, cursor=None):
+        calls.append((query, limit, cursor))
+        return {"results": [{"name": query}], "next_cursor": cursor}
+
+    search.calls = calls
+    search.version = version
+    return search
+
+
+def test_arguments_are_normalized_except_verbatim_ones(tool):
+    tool("Python  Dev")
+    tool("python dev", 5)
+    tool(query=" PYTHON dev ", limit=5, cursor=None)
+    assert len(tool.calls) == 1
+
+    tool("python dev", cursor="AbC")
+    tool("python dev", cursor="abc")
+    tool("python dev", limit=6)
+    assert len(tool.calls) == 4
+
+
+def test_version_bump_reruns_the_tool(tool):
+    tool("python")
+    tool.version.value += 1
+    tool("python")
+    assert len(tool.calls) == 2
+
+
+def test_callers_get_their_own_copies(tool):
+    first = tool("python")
+    first["results"].clear()
+    second = tool("python")
+    assert second["results"] == [{"name": "python"}]
+    second["results"][0]["name"] = "changed"
+    assert tool("python")["results"] == [{"name": "python"}]
+    assert len(tool.calls) == 1
@@ -0,0 +1,50 @@
+import json
+from datetime import datetime, timezone
+
+from bson import Decimal128, ObjectId
+
+import mcp_server
+from serialization import to_json_safe
+
+
+def test_default_projection_is_the_card_plus_sort_keys():
+    projection = mcp_server.build_projection(sort=mcp_server.TOP_EXPERTS_SORT)
+    assert projection["_id"] == 1
+    assert set(projection) - {"_id"} == set(mcp_server.CARD_FIELDS)
+
+
+def test_projection_keeps_the_outermost_requested_field():
+    projection = mcp_server.build_projection(["basics", "basics.name", "skills"])
+    assert projection == {"_id": 0, "basics": 1, "skills": 1}
+
+
+def test_cards_drop_ids_unless_asked_for(db, monkeypatch):
+    db["profiles"].insert_one({
+        "source_platform": "GitHub", "source_id": "1", "skill_keys": ["python"],
+        "basics": {"name": "Ada", "email": "ada@example.com", "headline": "Engineer"},
+        "skills": ["Python"], "metrics": {"reputation_score": 5, "followers": 2},
+        "publications": ["x" * 1000]})
+    monkeypatch.setattr(mcp_server.db_manager, "db", db)
+    monkeypatch.setattr(mcp_server.profiles_version, "check_interval", 0)
+    mcp_server.tool_cache.clear()
+
+    card = mcp_server.find_top_experts("python")["results"][0]
+    assert "_id" not in card and "publications" not in card
+    assert "email" not in card["basics"]
+    assert card["metrics"]["reputation_score"] == 5
+
+    card = mcp_server.find_top_experts("python", fields=["_id", "basics.email"])["results"][0]
+    assert set(card) == {"_id", "basics", "metrics"}
+    assert card["basics"] == {"email": "ada@example.com"}
+    assert isinstance(card["_id"], str)
+
+
+def test_to_json_safe_handles_bson_and_special_values():
+    oid = ObjectId()
+    when = datetime(2024, 5, 1, tzinfo=timezone.utc)
+    value = {"_id": oid, "at": when, "score": float("nan"), "ratio": 0.5,
+             "tags": ("a", 1, None, True), "amount": Decimal128("1.5")}
+    safe = to_json_safe(value)
+    assert safe == {"_id": str(oid), "at": "2024-05-01T00:00:00+00:00", "score": None,
+                    "ratio": 0.5, "tags": ["a", 1, None, True], "amount": "1.5"}
+    json.dumps(safe, allow_nan=False)
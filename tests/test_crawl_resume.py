@@ -0,0 +1,78 @@
+import pytest
+
+import scraper
+from frontier import CrawlState
+from scraper import GITHUB_TOPICS, ORCID_KEYWORDS, GitHubScraper, ORCIDScraper
+
+PAGES = 3
+
+
+@pytest.fixture
+def orcid(stub_server, monkeypatch):
+    monkeypatch.setattr(scraper.time, "sleep", lambda seconds: None)
+    state = {"stop_after": None, "scraper": None}
+
+    def handler(path, query, headers):
+        if path == "/search":
+            start = int(query["start"])
+            if state["stop_after"] == (query["q"], start):
+                state["scraper"].stop_event.set()
+            if query["q"] != ORCID_KEYWORDS[0] or start >= PAGES * 50:
+                return 200, {}, {"result": []}
+            ids = [f"0000-{start + j:04d}" for j in range(50)]
+            return 200, {}, {"result": [{"orcid-identifier": {"path": oid}} for oid in ids]}
+        oid = path.rsplit("/", 1)[1]
+        return 200, {}, {"person": {"name": {"given-names": {"value": oid}}}}
+    server = stub_server(handler)
+
+    def make(db):
+        s = ORCIDScraper(db.profiles)
+        s.search_url = f"{server.url}/search"
+        s.base_url = server.url
+        state["scraper"] = s
+        return s
+    return server, state, make
+
+
+def searches(server):
+    return [(q["q"], int(q["start"])) for path, q, _ in server.requests if path == "/search"]
+
+
+def test_interrupted_keyword_resumes_at_its_last_page(db, orcid):
+    server, state, make = orcid
+    kw = ORCID_KEYWORDS[0]
+
+    state["stop_after"] = (kw, 50)
+    make(db).scrape_by_keywords(target=1000)
+    assert searches(server) == [(kw, 0), (kw, 50)]
+    assert CrawlState(db, "ORCID").load() == {"keyword_index": 0, "start": 100}
+    assert db.profiles.count_documents({}) == 100
+
+    server.requests.clear()
+    state["stop_after"] = None
+    make(db).scrape_by_keywords(target=1000)
+    assert searches(server)[:2] == [(kw, 100), (kw, 150)]
+    assert [q for q, _ in searches(server)[2:]] == ORCID_KEYWORDS[1:]
+    assert db.profiles.count_documents({}) == PAGES * 50
+    # Only the new page's records were fetched on resume.
+    assert len([p for p, _, _ in server.requests if p != "/search"]) == 50
+    assert CrawlState(db, "ORCID").load() == {}
+
+
+def test_target_reached_mid_keyword_keeps_its_offset(db, orcid):
+    server, state, make = orcid
+    make(db).scrape_by_keywords(target=50)
+    assert CrawlState(db, "ORCID").load() == {"keyword_index": 0, "start": 50}
+
+
+def test_topic_checkpoint_only_moves_past_searched_topics(db):
+    github = GitHubScraper(db.profiles)
+    searches = github.topic_searches(target=100)
+    assert github.advance(searches) == GITHUB_TOPICS[0]
+    assert github.advance(searches, True) == GITHUB_TOPICS[1]
+    # A skipped topic (rate limited or a failed search) keeps the checkpoint.
+    assert github.advance(searches, False) == GITHUB_TOPICS[2]
+    assert github.advance(searches, None) is None
+    assert CrawlState(db, "GitHub").load() == {"topic_index": 1}
+
+    assert github.advance(github.topic_searches(target=100)) == GITHUB_TOPICS[1]
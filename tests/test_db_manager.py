@@ -0,0 +1,58 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import mongomock
+import pytest
+from pymongo.errors import ConnectionFailure
+
+import db_manager
+from db_manager import DBManager
+
+
+@pytest.fixture
+def clients(monkeypatch):
+    created = []
+
+    class Client(mongomock.MongoClient):
+        def __init__(self, uri, **options):
+            super().__init__()
+            self.options = options
+            self.closed = False
+            created.append(self)
+
+        def close(self):
+            self.closed = True
+
+    monkeypatch.setattr(db_manager, "MongoClient", Client)
+    return created
+
+
+def test_tool_calls_share_one_client(clients, monkeypatch):
+    monkeypatch.setenv("MONGO_MAX_POOL_SIZE", "7")
+    manager = DBManager()
+    threads = threading.active_count()
+    with ThreadPoolExecutor(8) as pool:
+        collections = list(pool.map(lambda _: manager.get_collection("profiles"), range(1000)))
+    assert len(clients) == 1
+    assert clients[0].options["maxPoolSize"] == 7
+    assert {c.database.name for c in collections} == {manager.db_name}
+    assert threading.active_count() == threads
+
+
+def test_close_releases_the_client_and_reconnects_lazily(clients):
+    manager = DBManager()
+    manager.get_collection("profiles")
+    manager.close()
+    assert clients[0].closed and manager.client is None and manager.db is None
+    manager.get_collection("profiles")
+    assert len(clients) == 2
+
+
+def test_failed_ping_closes_the_client(clients, monkeypatch):
+    def ping(self, *args, **kwargs):
+        raise ConnectionFailure("no server")
+    monkeypatch.setattr(mongomock.database.Database, "command", ping)
+    manager = DBManager()
+    with pytest.raises(ConnectionFailure):
+        manager.connect()
+    assert clients[0].closed and manager.client is None
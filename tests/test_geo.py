@@ -0,0 +1,55 @@
+import pytest
+
+from geo import geo_filter, normalize_location
+
+
+def geo(text):
+    place = normalize_location(text)
+    return place["city"], place["region"], place["country"]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("SF", ("san francisco", "california", "united states")),
+    ("Bay Area, CA", ("san francisco", "california", "united states")),
+    ("München, Deutschland", ("munich", "bavaria", "germany")),
+    ("I live in Toronto", ("toronto", "ontario", "canada")),
+    ("USA", ("", "", "united states")),
+    ("", ("", "", "")),
+])
+def test_aliases_resolve_to_canonical_places(text, expected):
+    assert geo(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("London", ("london", "england", "united kingdom")),
+    ("London, UK", ("london", "england", "united kingdom")),
+    ("London, Ontario", ("london", "ontario", "canada")),
+    ("Vancouver", ("vancouver", "british columbia", "canada")),
+    ("Vancouver, WA", ("vancouver", "washington state", "united states")),
+    ("Cambridge, MA", ("cambridge", "massachusetts", "united states")),
+])
+def test_qualifiers_pick_the_matching_city(text, expected):
+    assert geo(text) == expected
+
+
+def test_conflicting_qualifier_wins_over_default_city():
+    # No Berlin in Canada in the gazetteer: keep the name, trust the country.
+    assert geo("Berlin, Canada") == ("berlin", "", "canada")
+    assert geo("Paris, Texas") == ("paris", "texas", "united states")
+
+
+def test_filter_uses_every_resolved_field():
+    assert geo_filter("London, Ontario") == {"city": "london", "region": "ontario", "country": "canada"}
+    assert geo_filter("London") != geo_filter("London, Ontario")
+    assert geo_filter("Germany") == {"country": "germany"}
+
+
+def test_unknown_location_falls_back_to_anchored_prefix():
+    assert geo_filter("Springfield (Home)") == {"raw": {"$regex": r"^springfield \(home\)"}}
+
+
+def test_filter_separates_same_named_cities(db):
+    for i, location in enumerate(["London", "London, UK", "London, Ontario"]):
+        db.geo_rollup.insert_one(dict(normalize_location(location), platform="GitHub", count=1, _id=i))
+    assert db.geo_rollup.count_documents(geo_filter("London")) == 2
+    assert db.geo_rollup.count_documents(geo_filter("London, Ontario")) == 1
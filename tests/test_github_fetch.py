@@ -0,0 +1,62 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from frontier import CRAWL_FRONTIER
+from scraper import GitHubRateLimiter, GitHubScraper
+
+
+def user(uid):
+    return {"id": uid, "login": f"user{uid}", "name": f"User {uid}", "location": "Berlin",
+            "bio": "Go developer", "followers": uid, "following": 0, "public_repos": 1}
+
+
+@pytest.fixture
+def github(stub_server):
+    calls = {}
+
+    def handler(path, query, headers):
+        uid = int(path.rsplit("/", 1)[1])
+        calls[uid] = calls.get(uid, 0) + 1
+        limits = {"X-RateLimit-Remaining": "4000", "X-RateLimit-Reset": str(int(time.time()) + 3600)}
+        if uid == 2 and calls[uid] == 1:
+            return 429, {**limits, "Retry-After": "1"}, {}
+        if uid == 3:
+            # Secondary rate limit: blocked on every attempt.
+            return 403, {**limits, "Retry-After": "0"}, {}
+        if uid == 4:
+            return 404, limits, {}
+        if uid == 5:
+            return 200, limits, b"not json"
+        return 200, limits, user(uid)
+    server = stub_server(handler)
+    server.calls = calls
+    return server
+
+
+def test_owner_fetches_settle_every_frontier_entry(db, github):
+    scraper = GitHubScraper(db["profiles"])
+    urls = [f"{github.url}/users/{uid}" for uid in range(1, 6)]
+    assert scraper.state.claim(urls) == urls
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(4) as pool:
+        scraper.fetch_owner_urls(pool, urls)
+    scraper.flush()
+
+    assert sorted(doc["source_id"] for doc in db["profiles"].find()) == ["1", "2"]
+    # The 429 retried once after its Retry-After; the 403 spent all attempts.
+    assert github.calls == {1: 1, 2: 2, 3: scraper.MAX_FETCH_ATTEMPTS, 4: 1, 5: 1}
+    assert time.monotonic() - started >= 1
+    frontier = {doc["key"]: doc for doc in db[CRAWL_FRONTIER].find()}
+    assert [frontier[u]["status"] for u in urls[:2]] == ["done", "done"]
+    assert [frontier[u]["attempts"] for u in urls[2:]] == [1, 1, 1]
+    assert scraper.state.pending() == urls[2:]
+
+
+def test_limiter_holds_back_the_reserve():
+    limiter = GitHubRateLimiter(reserve=2)
+    limiter.remaining, limiter.reset_at = 4, time.time() + 30
+    assert [limiter.try_acquire() for _ in range(2)] == [0, 0]
+    assert limiter.try_acquire() > 25
@@ -0,0 +1,109 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from cache import META_COLLECTION
+from db_schemas import create_indexes
+from rollups import check_rollups
+from scraper import GitHubRateLimiter, GitHubScraper
+
+
+def user(uid, name, location="Berlin"):
+    return {"id": uid, "login": f"user{uid}", "name": name, "location": location,
+            "bio": "Python developer", "followers": 1, "following": 1, "public_repos": 1}
+
+
+@pytest.fixture
+def github(stub_server):
+    def handler(path, query, headers):
+        uid = int(path.rsplit("/", 1)[1])
+        limits = {"X-RateLimit-Remaining": "4000", "X-RateLimit-Reset": "9999999999"}
+        if uid == 1:
+            if headers.get("If-None-Match") == '"v1"':
+                return 304, limits, b""
+            return 200, dict(limits, ETag='"v1"'), user(1, "Unchanged")
+        if uid == 2:
+            return 200, dict(limits, ETag='"v2"'), user(2, "Renamed", "London")
+        if uid == 3:
+            return 200, limits, b"not json"
+        return 404, limits, {}
+    return stub_server(handler)
+
+
+def seed(scraper, github, uids):
+    stale = datetime.now(timezone.utc) - timedelta(days=2)
+    for uid in uids:
+        doc = scraper.normalize(user(uid, f"Old {uid}"))
+        doc["fetch_meta"] = {"url": f"{github.url}/users/{uid}", "etag": f'"v{uid}"',
+                             "last_fetched_at": stale}
+        scraper.save_to_db(doc)
+    scraper.flush()
+
+
+def test_refresh_handles_each_profile_on_its_own(db, github):
+    scraper = GitHubScraper(db.profiles)
+    scraper.MAX_WORKERS = 2
+    seed(scraper, github, range(1, 12))
+
+    counts = scraper.refresh_profiles(max_age_hours=24)
+
+    # 1 answers 304, 2 changed, 3 sends a broken body, the rest are gone.
+    assert counts == {"not_modified": 1, "changed": 1, "unchanged": 0, "failed": 9}
+    renamed = db.profiles.find_one({"source_id": "2"})
+    assert renamed["basics"]["name"] == "Renamed"
+    assert renamed["geo"]["city"] == "london"
+    assert renamed["fetch_meta"]["etag"] == '"v2"'
+    assert db.profiles.find_one({"source_id": "1"})["basics"]["name"] == "Old 1"
+    assert len(github.requests) == 11
+
+
+def test_failed_profiles_are_not_refetched_first(db, github):
+    scraper = GitHubScraper(db.profiles)
+    seed(scraper, github, [3, 4])
+    scraper.refresh_profiles(max_age_hours=24)
+
+    broken = db.profiles.find_one({"source_id": "3"})
+    assert broken["basics"]["name"] == "Old 3"
+    assert broken["fetch_meta"]["etag"] == '"v3"' and not broken["fetch_meta"].get("gone")
+    assert db.profiles.find_one({"source_id": "4"})["fetch_meta"]["gone"] is True
+
+    # The broken body is retried once it is stale again; the 404 never is.
+    assert list(scraper.stale_profiles(max_age_hours=24)) == []
+    assert [doc["source_id"] for doc in scraper.stale_profiles(max_age_hours=0)] == ["3"]
+
+
+def test_refresh_only_returns_what_was_charged():
+    limiter = GitHubRateLimiter()
+    limiter.remaining = 100
+    assert limiter.try_acquire() == 0
+
+    class NotModified:
+        status_code = 304
+        headers = {"X-RateLimit-Remaining": "99", "X-RateLimit-Reset": "9999999999"}
+
+    limiter.update(NotModified)
+    limiter.refund(NotModified)
+    assert limiter.remaining == 99
+
+    limiter.refund()
+    assert limiter.remaining == 100
+
+
+def test_partially_rejected_refresh_still_corrects_rollups(db, github):
+    create_indexes(db)
+    scraper = GitHubScraper(db.profiles)
+    seed(scraper, github, [1, 2, 3])
+    old = {doc["source_id"]: doc for doc in db.profiles.find()}
+
+    scraper.queue_refresh(old["1"], {"url": "x"}, scraper.normalize(user(1, "Old 1", "London")))
+    # Collides with profile 3's email on the unique index.
+    scraper.queue_refresh(old["2"], {"url": "x"}, scraper.normalize(
+        dict(user(2, "Old 2"), email=old["3"]["basics"]["email"])))
+    assert scraper.flush_refreshes() == 1
+
+    assert db.profiles.find_one({"source_id": "1"})["geo"]["city"] == "london"
+    assert db.profiles.find_one({"source_id": "2"})["basics"]["email"] == old["2"]["basics"]["email"]
+    report = check_rollups(db)
+    assert report["geo"]["consistent"] and report["skills"]["consistent"]
+    assert db[META_COLLECTION].find_one({"_id": "profiles"})["version"] == 2
+    assert scraper.refresh_counts == {"not_modified": 0, "changed": 1, "unchanged": 0, "failed": 1}
@@ -0,0 +1,51 @@
+import json
+
+import pytest
+
+import html_extract
+from scraper import KaggleScraper, kaggle_profile
+
+PROFILE = {"name": "Ada Lovelace", "description": "Kaggle grandmaster, Python and PyTorch"}
+PAGE = f"""<!DOCTYPE html>
+<html><head>
+<meta property="og:image" content="https://img.test/ada.png">
+<meta property="og:title" content="Ada &amp; Co">
+<script type="text/javascript">var x = "<a href='/not-a-link'>";</script>
+<script type="application/ld+json">{json.dumps(PROFILE)}</script>
+<script type="application/ld+json">{{"name": "second"}}</script>
+</head><body>
+<a href="/ada-lovelace"><span>Ada</span></a>
+<a href="/code">Code</a>
+<a>no href</a><a href="">empty</a>
+<div><a href="/grace-hopper" class="user">Grace</a></div>
+<a href="https://www.kaggle.com/learn">Learn</a>
+</body></html>"""
+
+
+@pytest.fixture(params=["selectolax", "lxml", "stdlib"])
+def backend(request):
+    if request.param not in html_extract.AVAILABLE_BACKENDS:
+        pytest.skip(f"{request.param} is not installed")
+    return request.param
+
+
+def test_backends_extract_the_same_fields(backend):
+    assert json.loads(html_extract.script_json_ld(PAGE, backend)) == PROFILE
+    assert html_extract.meta_property(PAGE, "og:title", backend) == "Ada & Co"
+    assert html_extract.meta_property(PAGE, "og:description", backend) is None
+    assert html_extract.link_hrefs(PAGE, backend) == [
+        "/ada-lovelace", "/code", "/grace-hopper", "https://www.kaggle.com/learn"]
+
+
+def test_backends_handle_pages_without_matches(backend):
+    page = "<html><body><p>nothing here</p></body></html>"
+    assert html_extract.script_json_ld(page, backend) is None
+    assert html_extract.meta_property(page, "og:title", backend) is None
+    assert html_extract.link_hrefs(page, backend) == []
+
+
+def test_kaggle_parsing_uses_the_extracted_fields(db):
+    doc = kaggle_profile("ada-lovelace", PAGE)
+    assert doc["basics"]["name"] == "Ada Lovelace"
+    assert doc["skills"] == ["Python", "PyTorch"]
+    assert KaggleScraper(db["profiles"]).extract_usernames(PAGE) == {"ada-lovelace", "grace-hopper"}
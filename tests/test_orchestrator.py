@@ -0,0 +1,48 @@
+import signal
+import threading
+
+import pytest
+
+import orchestrator
+from scraper import BaseScraper
+
+
+class IdleScraper(BaseScraper):
+    SOURCE_PLATFORM = "Idle"
+
+    def work(self, cfg):
+        self.stop_event.wait(cfg.get("max_seconds", 5))
+
+
+@pytest.fixture
+def sources(monkeypatch):
+    job = (IdleScraper, lambda s, cfg: s.work(cfg))
+    monkeypatch.setattr(orchestrator, "SOURCES", {"fast": job, "slow": job})
+
+
+def test_sigint_after_a_spent_budget_still_stops_gracefully(db, sources):
+    config = {"fast": {"time_budget_seconds": 0.1}, "slow": {}}
+    threading.Timer(0.5, signal.raise_signal, args=(signal.SIGINT,)).start()
+
+    summaries = {row["source"]: row for row in orchestrator.run_sources(db.profiles, config)}
+
+    assert summaries["fast"]["status"] == "budget"
+    assert summaries["slow"]["status"] == "stopped"
+
+
+def test_second_sigint_aborts(db, sources):
+    config = {"slow": {}}
+    # More than a join timeout apart, so the handler runs between them.
+    for delay in (0.2, 1.0):
+        threading.Timer(delay, signal.raise_signal, args=(signal.SIGINT,)).start()
+
+    orchestrator.SOURCES["slow"] = (IdleScraper, lambda s, cfg: threading.Event().wait(3))
+    with pytest.raises(KeyboardInterrupt):
+        orchestrator.run_sources(db.profiles, config)
+
+
+def test_load_config_rejects_unknown_sources(tmp_path):
+    path = tmp_path / "scrape.json"
+    path.write_text('{"myspace": {"target": 1}}')
+    with pytest.raises(ValueError):
+        orchestrator.load_config(str(path))
@@ -0,0 +1,69 @@
+import pytest
+
+import mcp_server
+from pagination import decode_cursor, encode_cursor
+
+
+def profile(i):
+    metrics = {"reputation_score": (i * 7) % 5, "contribution_count": i % 3}
+    if i % 4:
+        metrics["followers"] = i % 2
+    return {"_id": i, "source_platform": "github", "source_id": str(i),
+            "basics": {"name": f"Python dev {i}", "headline": "Engineer"},
+            "skills": ["Python"], "skill_keys": ["python"], "metrics": metrics}
+
+
+@pytest.fixture
+def profiles(db, monkeypatch):
+    # Ties on every metric and missing followers on a quarter of the rows.
+    db["profiles"].insert_many([profile(i) for i in range(23)])
+    monkeypatch.setattr(mcp_server.db_manager, "db", db)
+    monkeypatch.setattr(mcp_server.profiles_version, "check_interval", 0)
+    mcp_server.tool_cache.clear()
+    return db["profiles"]
+
+
+def collect(tool, **kwargs):
+    seen, cursor, pages = [], None, 0
+    while True:
+        page = tool(limit=4, cursor=cursor, **kwargs)
+        seen += [card["source_id"] for card in page["results"]]
+        pages += 1
+        cursor = page["next_cursor"]
+        if not cursor:
+            return seen, pages
+
+
+def test_top_experts_pages_without_gaps_or_repeats(profiles):
+    expected = [doc["source_id"] for doc in profiles.find({"skill_keys": "python"}).sort(
+        mcp_server.TOP_EXPERTS_SORT)]
+    seen, pages = collect(mcp_server.find_top_experts, skill="python")
+    assert seen == expected
+    assert pages == 6
+
+
+def test_substring_search_pages_without_gaps_or_repeats(profiles):
+    seen, _ = collect(mcp_server.search_profiles, query="python dev", substring=True)
+    assert seen == [str(i) for i in range(22, -1, -1)]
+
+
+def test_cursor_round_trips_sort_values():
+    sort = mcp_server.TOP_EXPERTS_SORT
+    doc = profile(3)
+    token = encode_cursor("experts", doc, sort)
+    assert decode_cursor(token, "experts", sort) == [1, 0, 1, 3]
+
+
+@pytest.mark.parametrize("token", ["not-a-cursor", encode_cursor("text", {}, mcp_server.TEXT_SORT)])
+def test_foreign_or_garbled_cursors_are_rejected(token):
+    with pytest.raises(ValueError):
+        decode_cursor(token, "experts", mcp_server.TOP_EXPERTS_SORT)
+
+
+def test_page_size_is_clamped_and_the_rest_is_paged(profiles, monkeypatch):
+    monkeypatch.setattr(mcp_server, "MAX_PAGE_SIZE", 10)
+    page = mcp_server.find_top_experts("python", limit=5000)
+    assert len(page["results"]) == 10 and page["next_cursor"]
+    page = mcp_server.search_profiles("python dev", limit=5000, substring=True)
+    assert len(page["results"]) == 10 and page["next_cursor"]
+    assert len(mcp_server.find_top_experts("python", limit=0)["results"]) == 1
@@ -0,0 +1,24 @@
+import threading
+
+from pipeline import Pipeline
+
+
+def test_run_finishes_when_the_items_iterable_raises(caplog):
+    written = []
+
+    def items():
+        yield from range(3)
+        raise RuntimeError("cursor died")
+
+    pipeline = Pipeline("test", fetch=lambda item: item, parse=lambda item, raw: raw,
+                        write=lambda item, doc: written.append(doc) or True,
+                        fetch_workers=2, parse_workers=2)
+    summary = {}
+    runner = threading.Thread(target=lambda: summary.update(pipeline.run(items())), daemon=True)
+    runner.start()
+    runner.join(timeout=10)
+
+    assert not runner.is_alive()
+    assert sorted(written) == [0, 1, 2]
+    assert summary["write"]["processed"] == 3
+    assert "cursor died" in caplog.text
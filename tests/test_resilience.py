@@ -0,0 +1,127 @@
+import asyncio
+import time
+
+import pytest
+
+from resilience import (Backoff, CircuitBreaker, CircuitOpenError, RetryError, RetryPolicy,
+                        ResilienceMetrics, parse_retry_after, retry_async)
+
+
+class Response:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+def failing_send(counter):
+    async def send():
+        counter.append(1)
+        return Response(503)
+    return send
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+FAST = RetryPolicy(max_attempts=5, deadline=5, base=0.001, cap=0.002)
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("12") == 12.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:10 GMT", now=1445412480.0) == 10.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_backoff_stays_within_bounds_and_resets():
+    backoff = Backoff(base=1, cap=8)
+    delays = [backoff.next() for _ in range(20)]
+    assert all(1 <= d <= 8 for d in delays)
+    backoff.reset()
+    assert backoff.previous == 1
+
+
+def test_breaker_counts_exhausted_calls_not_attempts():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    attempts = []
+    with pytest.raises(RetryError):
+        run(retry_async(failing_send(attempts), FAST, breaker))
+    assert len(attempts) == 5
+    assert breaker.state == "closed"
+
+    with pytest.raises(RetryError):
+        run(retry_async(failing_send(attempts), FAST, breaker))
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        run(retry_async(failing_send(attempts), FAST, breaker))
+    assert len(attempts) == 10
+
+
+def test_half_open_lets_a_single_probe_through():
+    metrics = ResilienceMetrics()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01, metrics=metrics)
+    breaker.record_failure()
+    time.sleep(0.02)
+    assert breaker.state == "half_open"
+
+    async def slow_ok():
+        await asyncio.sleep(0.05)
+        return Response(200)
+
+    async def probe_and_follow():
+        probe = asyncio.ensure_future(retry_async(slow_ok, FAST, breaker))
+        await asyncio.sleep(0)
+        with pytest.raises(CircuitOpenError):
+            await retry_async(slow_ok, FAST, breaker)
+        return await probe
+
+    assert run(probe_and_follow()).status_code == 200
+    assert breaker.state == "closed"
+    assert metrics.snapshot()["short_circuits"] == 1
+
+
+def test_failed_probe_reopens():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=0.01)
+    for _ in range(3):
+        breaker.record_failure()
+    time.sleep(0.02)
+    with pytest.raises(RetryError):
+        run(retry_async(failing_send([]), FAST, breaker))
+    assert breaker.state == "open"
+
+
+@pytest.mark.parametrize("cancel_during", ["send", "backoff"])
+def test_cancelled_probe_frees_the_half_open_slot(cancel_during):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+    policy = RetryPolicy(max_attempts=3, deadline=5, base=1, cap=1)
+
+    async def send():
+        if cancel_during == "send":
+            await asyncio.sleep(1)
+        return Response(503)
+
+    async def cancel_probe():
+        probe = asyncio.ensure_future(retry_async(send, policy, breaker))
+        await asyncio.sleep(0.05)
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+
+    run(cancel_probe())
+    assert not breaker.probing
+    assert run(retry_async(lambda: asyncio.sleep(0, Response(200)), FAST, breaker)).status_code == 200
+    assert breaker.state == "closed"
+
+
+def test_retry_after_header_sets_delay():
+    metrics = ResilienceMetrics()
+    responses = [Response(429, {"Retry-After": "0"}), Response(200)]
+
+    async def send():
+        return responses.pop(0)
+
+    assert run(retry_async(send, RetryPolicy(base=5, cap=5), metrics=metrics)).status_code == 200
+    assert metrics.snapshot()["sleep_seconds"] == 0
@@ -0,0 +1,65 @@
+import pytest
+
+import mcp_server
+from geo import normalize_location
+from rollups import GEO_ROLLUP, apply_profile_rollups, check_rollups
+
+
+def profile(source_id, location, skills, reputation, platform="StackOverflow"):
+    return {"source_platform": platform, "source_id": source_id,
+            "basics": {"name": source_id, "location": location},
+            "geo": normalize_location(location), "skill_keys": skills,
+            "metrics": {"reputation_score": reputation}}
+
+
+PROFILES = [
+    profile("a", "Berlin, Germany", ["python", "go"], 120),
+    profile("b", "berlin", ["python"], 80),
+    profile("c", "Paris", ["rust"], None),
+    profile("d", "", ["python"], 10, platform="GitHub"),
+]
+
+
+@pytest.fixture
+def rolled_up(db):
+    db.profiles.insert_many([dict(p) for p in PROFILES])
+    apply_profile_rollups(db, PROFILES)
+    return db
+
+
+def test_incremental_rollups_match_a_full_recount(rolled_up):
+    report = check_rollups(rolled_up)
+    assert report["skills"]["consistent"] and report["geo"]["consistent"]
+    assert report["skills"]["rows"] == 3
+
+
+def test_refreshed_profile_moves_between_rollup_rows(rolled_up):
+    old = rolled_up.profiles.find_one({"source_id": "b"})
+    new = profile("b", "Paris, France", ["rust", "kubernetes"], 95)
+    rolled_up.profiles.update_one({"_id": old["_id"]}, {"$set": {
+        field: new[field] for field in ("basics", "geo", "skill_keys", "metrics")}})
+    apply_profile_rollups(rolled_up, [old], sign=-1)
+    apply_profile_rollups(rolled_up, [new])
+
+    report = check_rollups(rolled_up)
+    assert report["skills"]["consistent"] and report["geo"]["consistent"]
+
+
+def test_drift_is_reported_per_row(rolled_up):
+    rolled_up[GEO_ROLLUP].update_one({"raw": PROFILES[1]["geo"]["raw"]}, {"$inc": {"count": 1}})
+    report = check_rollups(rolled_up)
+    assert report["skills"]["consistent"]
+    assert [(m["_id"]["city"], m["field"], m["expected"], m["actual"])
+            for m in report["geo"]["mismatches"]] == [("berlin", "count", 1, 2)]
+
+
+def test_tools_read_from_the_rollups(rolled_up, monkeypatch):
+    monkeypatch.setattr(mcp_server.db_manager, "db", rolled_up)
+    monkeypatch.setattr(mcp_server.profiles_version, "check_interval", 0)
+    mcp_server.tool_cache.clear()
+
+    assert mcp_server.get_geo_density("Berlin") == [
+        {"_id": "StackOverflow", "total_count": 2, "avg_reputation": 100.0}]
+    distribution = mcp_server.get_skill_distribution()
+    assert distribution[0] == {"_id": "Python", "count": 3, "category": "Languages"}
+    assert {row["_id"] for row in distribution} == {"Python", "Go", "Rust"}
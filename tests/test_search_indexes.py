@@ -0,0 +1,102 @@
+import os
+import uuid
+
+import pytest
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+import mcp_server
+from db_schemas import create_indexes
+
+PROFILES = [
+    {"source_platform": "github", "source_id": str(i),
+     "basics": {"name": f"Dev {i}", "email": f"dev{i}@example.com",
+                "headline": "Python engineer" if i % 2 else "Rust engineer",
+                "location": "Berlin"},
+     "skills": ["Python"] if i % 2 else ["Rust"],
+     "skill_keys": ["python"] if i % 2 else ["rust"],
+     "metrics": {"reputation_score": i, "contribution_count": i * 2, "followers": i}}
+    for i in range(200)
+]
+
+
+@pytest.fixture
+def mongo():
+    # Query plans need a real server: set MONGO_TEST_URI to run these.
+    uri = os.getenv("MONGO_TEST_URI")
+    if not uri:
+        pytest.skip("MONGO_TEST_URI not set")
+    client = MongoClient(uri, serverSelectionTimeoutMS=2000)
+    try:
+        client.admin.command("ping")
+    except PyMongoError as e:
+        client.close()
+        pytest.skip(f"MongoDB not reachable: {e}")
+    name = f"profile_test_{uuid.uuid4().hex[:8]}"
+    db = client[name]
+    create_indexes(db)
+    db.profiles.insert_many([dict(p) for p in PROFILES])
+    yield db
+    client.drop_database(name)
+    client.close()
+
+
+def plan_stages(plan):
+    stages = [plan.get("stage")]
+    for child in [plan.get("inputStage")] + plan.get("inputStages", []):
+        if child:
+            stages += plan_stages(child)
+    return stages
+
+
+def winning_stages(explain):
+    # Servers using the slot-based engine nest the classic plan under queryPlan.
+    plan = explain["queryPlanner"]["winningPlan"]
+    return plan_stages(plan.get("queryPlan", plan))
+
+
+def test_text_search_uses_search_index(mongo):
+    explain = mongo.profiles.find(mcp_server.search_filter("python", False)).explain()
+    stages = winning_stages(explain)
+    assert "IXSCAN" in stages
+    assert "COLLSCAN" not in stages
+
+
+def test_top_experts_serves_sort_from_index(mongo):
+    explain = mongo.profiles.find(mcp_server.experts_filter("Python")).sort(
+        mcp_server.TOP_EXPERTS_SORT).limit(5).explain()
+    stages = winning_stages(explain)
+    assert "IXSCAN" in stages
+    assert "COLLSCAN" not in stages
+    assert "SORT" not in stages
+
+
+def test_search_filter_only_uses_regex_for_substring():
+    assert mcp_server.search_filter("python dev", False) == {"$text": {"$search": "python dev"}}
+    substring = mcp_server.search_filter("py.", True)
+    assert all(clause[field]["$regex"] == r"py\." for clause in substring["$or"]
+               for field in clause)
+
+
+def test_search_profiles_defaults_to_text_index(db, monkeypatch):
+    pipelines = []
+
+    class Profiles:
+        def aggregate(self, pipeline):
+            pipelines.append(pipeline)
+            return iter([])
+
+    monkeypatch.setattr(mcp_server.db_manager, "db", db)
+    monkeypatch.setattr(mcp_server, "get_db", Profiles)
+    mcp_server.tool_cache.clear()
+    assert mcp_server.search_profiles("python") == {"results": [], "next_cursor": None}
+    assert pipelines[0][0] == {"$match": {"$text": {"$search": "python"}}}
+    assert {"$addFields": {"score": {"$meta": "textScore"}}} in pipelines[0]
+
+
+def test_create_indexes_builds_search_and_experts_indexes(db):
+    create_indexes(db)
+    indexes = db.profiles.index_information()
+    assert [field for field, _ in indexes["search_index"]["key"]] == [
+        "basics.headline", "skills", "basics.name", "basics.location"]
+    assert indexes["top_experts_keyset_index"]["key"][0] == ("skill_keys", 1)
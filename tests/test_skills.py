@@ -0,0 +1,92 @@
+import json
+import random
+import re
+
+import pytest
+
+from skills import (canonical_skill_key, compile_skill_pattern, extract_skills, load_taxonomy,
+                    skill_category, skill_key, skill_keys, skill_label)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Senior C++ developer", ["C++"]),
+    ("Backend in Node.js and Go", ["Go", "Node.js"]),
+    ("Java, not JavaScript", ["JavaScript", "Java"]),
+    ("PYTHON and pytorch", ["Python", "PyTorch"]),
+    ("Google, gopher, Javanese, reactor", []),
+    ('<div class="ml-auto mt-2"><a href="/js/app.js">', []),
+    ("", []),
+    (None, []),
+])
+def test_extract_skills(text, expected):
+    assert extract_skills(text) == expected
+
+
+def test_extract_skills_reports_each_skill_once_in_taxonomy_order():
+    assert extract_skills("go go golang Python python3") == ["Python", "Go"]
+
+
+@pytest.mark.parametrize("alias, key", [
+    ("k8s", "kubernetes"), ("golang", "go"), ("NodeJS", "node.js"),
+    ("  React.js ", "react"), ("Rust", "rust"), ("Some Framework", "some framework"),
+])
+def test_aliases_resolve_to_canonical_keys(alias, key):
+    assert canonical_skill_key(alias) == key
+
+
+def test_skill_keys_merge_aliases():
+    assert skill_keys(["Node.js", "nodejs", "node js", "k8s", "", None]) == ["kubernetes", "node.js"]
+
+
+def test_labels_and_categories_come_from_the_taxonomy():
+    assert skill_label("node.js") == "Node.js"
+    assert skill_category("kubernetes") == "DevOps"
+    assert skill_label("some framework") == "some framework"
+    assert skill_category("some framework") == "Other"
+
+
+def test_taxonomy_rejects_an_alias_claimed_twice(tmp_path):
+    path = tmp_path / "taxonomy.json"
+    path.write_text(json.dumps({"skills": [
+        {"name": "Go", "aliases": ["golang"]},
+        {"name": "Golang Tools", "aliases": ["golang"]},
+    ]}))
+    with pytest.raises(ValueError):
+        load_taxonomy(str(path))
+
+
+BASELINE_KEYWORDS = [
+    "Python", "JavaScript", "TypeScript", "React", "Node.js", "Go", "Rust", "C++", "Java", "Kotlin",
+    "Machine Learning", "AI", "Deep Learning", "TensorFlow", "PyTorch", "AWS", "Azure", "GCP",
+    "Docker", "Kubernetes", "SQL", "NoSQL", "MongoDB", "PostgreSQL", "Solidity", "Blockchain",
+    "Data Science", "DevOps", "Cybersecurity", "Terraform", "Ansible", "Vue", "Angular", "Swift"
+]
+
+
+def baseline_extract(text):
+    # The per-keyword loop Normalizer.extract_skills used to run.
+    return {kw for kw in BASELINE_KEYWORDS if re.search(rf'\b{re.escape(kw)}\b', text, re.IGNORECASE)}
+
+
+def single_pass_extract(text):
+    names = {skill_key(kw): kw for kw in BASELINE_KEYWORDS}
+    return {names[m.group(0)] for m in compile_skill_pattern(BASELINE_KEYWORDS).finditer(text.lower())}
+
+
+def corpus():
+    rng = random.Random(3)
+    words = BASELINE_KEYWORDS + ["Google", "gopher", "Javanese", "NoSQL-ish", "AIs", "Go-to",
+                                 "Node.jsx", "react.", "(Rust)", "data-science", "PYTHON", "swiftly",
+                                 "and", "engineer", "<div class=\"ml-auto\">", "/js/app.js", "x_go"]
+    words.remove("C++")
+    return [" ".join(rng.choices(words, k=rng.randint(1, 40))) for _ in range(2000)]
+
+
+def test_single_pass_matches_the_baseline_loop():
+    assert [t for t in corpus() if single_pass_extract(t) != baseline_extract(t)] == []
+
+
+def test_cpp_is_the_one_intended_difference():
+    # \bC\+\+\b needs a word character after the '+', so the loop missed it.
+    assert baseline_extract("C++ developer") == set()
+    assert single_pass_extract("C++ developer") == {"C++"}
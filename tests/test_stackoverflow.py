@@ -0,0 +1,148 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from frontier import CrawlState
+from scraper import StackOverflowScraper
+
+# 150 users share one reputation value, more than fits on a page.
+USERS = ([{"user_id": i, "display_name": f"u{i}", "reputation": 10000 - i * 10} for i in range(1, 61)]
+         + [{"user_id": i, "display_name": f"u{i}", "reputation": 500} for i in range(61, 211)]
+         + [{"user_id": i, "display_name": f"u{i}", "reputation": 300 - i} for i in range(211, 251)])
+
+
+class StackExchangeStub:
+    def __init__(self, quota=1000):
+        self.quota = quota
+        self.backoff_on = None
+        self.stop = None
+        self.scraper = None
+
+    def __call__(self, path, query, headers):
+        self.quota -= 1
+        wrapper = {"quota_remaining": self.quota}
+        if path.endswith("/filters/create"):
+            assert "user.reputation" in query["include"] and query["base"] == "none"
+            return 200, {}, dict(wrapper, items=[{"filter": "!stub"}])
+        assert query["filter"] == "!stub" and query["site"] == "stackoverflow"
+        if path.endswith("/users"):
+            page, size = int(query["page"]), int(query["pagesize"])
+            pool = sorted((u for u in USERS if u["reputation"] <= int(query.get("max", 10 ** 9))),
+                          key=lambda u: (-u["reputation"], u["user_id"]))
+            items = pool[(page - 1) * size:page * size]
+            body = dict(wrapper, items=items, has_more=len(pool) > page * size)
+            if self.backoff_on == len(self.requests_seen(path)):
+                body["backoff"] = 1
+            if self.stop and self.stop == len(self.requests_seen(path)):
+                self.scraper.stop_event.set()
+            return 200, {}, body
+        ids = path.rsplit("/", 1)[1].split(";")
+        assert len(ids) <= 100
+        items = [dict(u, display_name="renamed") for u in USERS if str(u["user_id"]) in ids and u["user_id"] != 5]
+        return 200, {}, dict(wrapper, items=items, has_more=False)
+
+    def requests_seen(self, path):
+        return [p for p, _, _ in self.server.requests if p == path]
+
+
+@pytest.fixture
+def stackexchange(stub_server, monkeypatch):
+    stub = StackExchangeStub()
+    stub.server = stub_server(stub)
+    monkeypatch.setenv("STACKEXCHANGE_API_URL", stub.server.url)
+    monkeypatch.setenv("STACKEXCHANGE_MIN_INTERVAL", "0")
+
+    def make(db):
+        stub.scraper = StackOverflowScraper(db.profiles)
+        return stub.scraper
+    stub.make = make
+    return stub
+
+
+def user_pages(stub):
+    return [q for p, q, _ in stub.server.requests if p == "/users"]
+
+
+def test_ingests_every_user_once_across_tied_reputations(db, stackexchange):
+    s = stackexchange.make(db)
+    s.scrape_n_users(target=1000)
+
+    assert s.inserted_count == len(USERS)
+    assert s.matched_count == 0
+    assert db.profiles.count_documents({}) == len(USERS)
+    # Filter creation is one request; the listing takes a handful of pages.
+    assert [p for p, _, _ in stackexchange.server.requests].count("/filters/create") == 1
+    assert len(user_pages(stackexchange)) <= 5
+    # The exhausted listing drops its cursor but keeps the filter.
+    assert CrawlState(db, "StackOverflow").load() == {"filter": "!stub"}
+    assert s.pacer.quota_remaining == stackexchange.quota
+
+
+def test_resume_continues_from_the_saved_bound(db, stackexchange):
+    stackexchange.stop = 2
+    first = stackexchange.make(db)
+    first.scrape_n_users(target=1000)
+    cursor = CrawlState(db, "StackOverflow").load()
+    assert cursor["last_rep"] == 500 and first.inserted_count == 160
+
+    stackexchange.stop = None
+    stackexchange.server.requests.clear()
+    second = stackexchange.make(db)
+    second.scrape_n_users(target=1000)
+
+    assert int(user_pages(stackexchange)[0]["max"]) == 500
+    assert db.profiles.count_documents({}) == len(USERS)
+    assert second.matched_count == 0
+    assert "/filters/create" not in [p for p, _, _ in stackexchange.server.requests]
+
+
+def test_new_run_starts_below_the_lowest_stored_reputation(db, stackexchange):
+    stackexchange.make(db).scrape_n_users(target=1000)
+    CrawlState(db, "StackOverflow").reset()
+    stackexchange.server.requests.clear()
+
+    again = stackexchange.make(db)
+    again.scrape_n_users(target=1000)
+    assert int(user_pages(stackexchange)[0]["max"]) == USERS[-1]["reputation"]
+    assert again.consecutive_duplicates == 0
+
+
+def test_stops_at_the_quota_reserve(db, stackexchange, monkeypatch):
+    monkeypatch.setenv("STACKEXCHANGE_QUOTA_RESERVE", "10")
+    stackexchange.quota = 13
+    s = stackexchange.make(db)
+    s.scrape_n_users(target=1000)
+    assert len(user_pages(stackexchange)) == 2
+    assert s.pacer.quota_remaining == 10
+
+
+def test_backoff_is_honoured(db, stackexchange):
+    stackexchange.backoff_on = 1
+    stamps = []
+    handler = stackexchange.server.handler
+
+    def timed(path, query, headers):
+        stamps.append(time.monotonic())
+        return handler(path, query, headers)
+    stackexchange.server.handler = timed
+
+    stackexchange.make(db).scrape_n_users(target=1000)
+    # [filter, page 1 (asks for a 1s backoff), page 2, ...]
+    assert stamps[2] - stamps[1] >= 1
+    assert stamps[3] - stamps[2] < 1
+
+
+def test_refresh_looks_up_stale_users_in_batches_of_100(db, stackexchange):
+    s = stackexchange.make(db)
+    s.scrape_n_users(target=1000)
+    db.profiles.update_many({}, {"$set": {
+        "fetch_meta.last_fetched_at": datetime.now(timezone.utc) - timedelta(days=2)}})
+    stackexchange.server.requests.clear()
+
+    counts = stackexchange.make(db).refresh_users(max_age_hours=24)
+
+    lookups = [p for p, _, _ in stackexchange.server.requests if p.startswith("/users/")]
+    assert [len(p.rsplit("/", 1)[1].split(";")) for p in lookups] == [100, 100, 50]
+    assert counts == {"not_modified": 0, "changed": 249, "unchanged": 0, "failed": 1}
+    assert db.profiles.count_documents({"basics.name": "renamed"}) == 249
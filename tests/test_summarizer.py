@@ -0,0 +1,40 @@
+import csv
+import io
+
+from summarizer import BYTES_PER_TOKEN, DISTRIBUTION_TOP_K, encoded_size, summarize_result
+
+
+def table_rows(summary):
+    return list(csv.reader(io.StringIO(summary["table"])))
+
+
+def test_cards_are_cut_to_the_budget_best_first():
+    docs = [{"source_id": str(i), "basics": {"name": "n" * 300}, "skills": ["Go", "Rust"]}
+            for i in range(100)]
+    summary = summarize_result({"results": docs, "next_cursor": "abc"}, token_budget=200)
+
+    assert encoded_size(summary) <= 200 * BYTES_PER_TOKEN
+    assert summary["next_cursor"] == "abc"
+    header, *rows = table_rows(summary)
+    assert header == ["source_id", "basics.name", "skills"]
+    assert [row[0] for row in rows] == [str(i) for i in range(len(rows))]
+    assert rows[0][2] == "Go;Rust" and rows[0][1].endswith("…")
+    report = summary["report"]
+    assert report["rows_kept"] == len(rows) > 0
+    assert report["rows_kept"] + report["rows_dropped"] == report["rows_total"] == 100
+    assert report["truncated_values"] == len(rows)
+
+
+def test_distributions_keep_the_largest_counts():
+    rows = [{"_id": f"skill{i}", "count": i} for i in range(50)]
+    summary = summarize_result(rows, token_budget=1000)
+    kept = [int(count) for _, count in table_rows(summary)[1:]]
+    assert kept == list(range(49, 49 - DISTRIBUTION_TOP_K, -1))
+    assert summary["report"]["rows_dropped"] == 50 - DISTRIBUTION_TOP_K
+
+
+def test_other_results_pass_through_or_are_clipped():
+    assert summarize_result({"status": "ok"}) == {"status": "ok"}
+    clipped = summarize_result("x" * 5000, token_budget=100)
+    assert len(clipped["text"]) == 100 * BYTES_PER_TOKEN
+    assert clipped["truncated_bytes"] == 5002 - 100 * BYTES_PER_TOKEN